@@ -0,0 +1,222 @@
+"""
+Gemini REST generateContent 엔드포인트를 흉내 내는 로컬 서버입니다.
+지연 시간, 오류(429/500/503), 잘못된 JSON 응답을 설정한 비율로 섞으며,
+분류 결과는 태그 이름의 해시로 정해지므로 같은 입력에는 항상 같은 응답을 돌려줍니다.
+
+클라이언트는 REST 전송과 엔드포인트 재정의로 연결합니다:
+    GEMINI_TRANSPORT=rest GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GEMINI_API_KEY=dummy python main.py
+
+사용법:
+    python benchmarks/mock_gemini_server.py --port 8765 --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.prompt_classifier.gemini_classifier import CATEGORIES, estimate_tokens
+from src.prompt_classifier.tag_utils import normalize_tag, split_tags
+
+PATH_PATTERN = re.compile(r'^/v1(?:beta)?/models/([^/:]+):generateContent')
+
+
+def classify_deterministic(prompt: str) -> dict:
+    """태그마다 정규화된 이름의 crc32로 카테고리를 정해 9개 카테고리 결과를 만듭니다."""
+    result = {category: [] for category in CATEGORIES}
+    for tag in split_tags(prompt):
+        normalized = normalize_tag(tag)[0]
+        if normalized:
+            result[CATEGORIES[zlib.crc32(normalized.encode('utf-8')) % len(CATEGORIES)]].append(tag)
+    return result
+
+
+def build_response_text(texts) -> str:
+    """
+    요청 내용에 맞는 응답 JSON 문자열을 만듭니다.
+    마지막 부분이 {"id", "prompt"} 배열이면 배치 요청으로 보고 같은 id의 배열을 돌려줍니다.
+    """
+    payload = texts[-1] if texts else ""
+    try:
+        items = json.loads(payload)
+    except ValueError:
+        items = None
+    if isinstance(items, list) and all(isinstance(item, dict) and "id" in item for item in items):
+        return json.dumps([dict(classify_deterministic(item.get("prompt", "")), id=item["id"]) for item in items],
+                          ensure_ascii=False)
+    return json.dumps(classify_deterministic(payload), ensure_ascii=False)
+
+
+class MockGeminiServer:
+    """
+    Args:
+        latency_ms (float): 요청마다 기본 지연 시간
+        jitter_ms (float): 지연 시간에 더할 무작위 편차의 최댓값
+        ms_per_output_token (float): 응답 토큰 수에 비례해 더할 지연 시간 (실제 API는 출력이 길수록 느림)
+        error_rate (float): 500/503을 돌려줄 비율
+        rate_limit_rate (float): 429를 돌려줄 비율
+        malformed_rate (float): JSON이 아닌 응답을 돌려줄 비율
+        requests_per_minute (int): 지정하면 최근 60초 요청 수가 이를 넘을 때 429
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=50.0, jitter_ms=10.0, ms_per_output_token=0.5,
+                 error_rate=0.0, rate_limit_rate=0.0, malformed_rate=0.0, requests_per_minute=None, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.requests_per_minute = requests_per_minute
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = []
+        self.reset_stats()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "server_errors": 0, "malformed": 0,
+                          "input_tokens": 0, "output_tokens": 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def _decide(self):
+        """이번 요청에 돌려줄 결과 종류, 지연 시간(초), 오류일 때의 HTTP 상태를 정합니다."""
+        with self._lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.requests_per_minute:
+                self._recent = [t for t in self._recent if now - t < 60]
+                if len(self._recent) >= self.requests_per_minute:
+                    self.stats["rate_limited"] += 1
+                    return "rate_limited", 0.0, 429
+                self._recent.append(now)
+            roll = self._random.random()
+            jitter = self._random.uniform(0, self.jitter_ms)
+            error_status = 503 if self._random.random() < 0.5 else 500
+        if roll < self.rate_limit_rate:
+            outcome = "rate_limited"
+        elif roll < self.rate_limit_rate + self.error_rate:
+            outcome = "server_errors"
+        elif roll < self.rate_limit_rate + self.error_rate + self.malformed_rate:
+            outcome = "malformed"
+        else:
+            outcome = "ok"
+        with self._lock:
+            self.stats[outcome] += 1
+        return outcome, (self.latency_ms + jitter) / 1000.0, error_status
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # 클라이언트가 연결을 재사용할 수 있도록 keep-alive 지원
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not PATH_PATTERN.match(self.path):
+                    self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                    return
+                try:
+                    request = json.loads(body)
+                except ValueError:
+                    self._send_json(400, {"error": {"code": 400, "message": "Invalid JSON", "status": "INVALID_ARGUMENT"}})
+                    return
+
+                texts = [part.get("text", "") for content in request.get("contents", [])
+                         for part in content.get("parts", [])]
+                system_texts = [part.get("text", "") for part in
+                                (request.get("systemInstruction") or {}).get("parts", [])]
+                input_tokens = sum(estimate_tokens(text) for text in texts + system_texts)
+
+                with server._lock:
+                    server.stats["input_tokens"] += input_tokens # 실패한 요청도 보낸 토큰에 포함
+
+                outcome, delay, status = server._decide()
+                if outcome == "rate_limited":
+                    self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted",
+                                                    "status": "RESOURCE_EXHAUSTED"}})
+                    return
+                if outcome == "server_errors":
+                    time.sleep(delay)
+                    self._send_json(status, {"error": {"code": status, "message": "Mock server error",
+                                                       "status": "UNAVAILABLE" if status == 503 else "INTERNAL"}})
+                    return
+
+                text = "{not valid json" if outcome == "malformed" else build_response_text(texts)
+                output_tokens = estimate_tokens(text)
+                time.sleep(delay + output_tokens * server.ms_per_output_token / 1000.0)
+                with server._lock:
+                    server.stats["output_tokens"] += output_tokens
+                self._send_json(200, {
+                    "candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                                    "finishReason": "STOP", "index": 0}],
+                    "usageMetadata": {"promptTokenCount": input_tokens, "candidatesTokenCount": output_tokens,
+                                      "totalTokenCount": input_tokens + output_tokens},
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--ms-per-output-token', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500/503 비율")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="무작위 429 비율")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="JSON이 아닌 응답 비율")
+    parser.add_argument('--rpm', type=int, help="분당 요청 한도 (넘으면 429)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.ms_per_output_token,
+                              args.error_rate, args.rate_limit_rate, args.malformed_rate, args.rpm, args.seed)
+    print(f"Mock Gemini 서버 실행 중: {server.url} (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n종료. 통계: {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
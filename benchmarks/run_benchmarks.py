@@ -0,0 +1,227 @@
+"""
+로컬 Mock Gemini 서버를 띄워 분류 경로별 처리량을 측정하고, 결과를 커밋별로 기록합니다.
+
+측정 시나리오:
+    single  프롬프트마다 classify_prompt_with_gemini 호출
+    batch   classify_prompts_batch로 여러 프롬프트를 한 요청에 묶어 분류
+    cached  태그 분류 캐시(비어 있는 상태)를 거쳐 처음 보는 태그만 분류
+    queue   비동기 분류 작업 큐 (동시 요청 + 토큰 버킷 + 재시도)
+
+결과는 benchmarks/results/history.jsonl에 한 줄씩 추가되며 --compare로 커밋별로 비교할 수 있습니다.
+
+사용법:
+    python benchmarks/run_benchmarks.py --prompts 300 --latency-ms 80 --error-rate 0.05
+    python benchmarks/run_benchmarks.py --scenarios batch,queue --label "큐 동시성 8" --concurrency 8
+    python benchmarks/run_benchmarks.py --compare
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+# src 모듈을 불러오기 전에 임시 DB와 REST 전송을 설정 (실제 DB와 API 할당량을 건드리지 않도록)
+_temp_dir = tempfile.TemporaryDirectory()
+os.environ["PROMPT_GALLERY_DB"] = os.path.join(_temp_dir.name, "benchmark.db")
+os.environ["GEMINI_TRANSPORT"] = "rest"
+os.environ["GEMINI_API_KEY"] = "benchmark-placeholder-key"
+
+from mock_gemini_server import MockGeminiServer
+from src.prompt_classifier import classification_queue, gemini_classifier, tag_cache
+from src.prompt_classifier.database import initialize_database
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'history.jsonl')
+SCENARIOS = ("single", "batch", "cached", "queue")
+
+COLORS = ["blue", "red", "silver", "black", "white", "green", "pink", "purple", "blonde", "brown", "orange", "grey"]
+PARTS = ["hair", "eyes", "dress", "shirt", "skirt", "gloves", "ribbon", "boots", "flower", "background"]
+COMMON = ["masterpiece", "best quality", "1girl", "solo", "looking at viewer", "smile", "outdoors", "sky",
+          "long hair", "upper body", "cowboy shot", "from side", "sitting", "standing", "day", "night",
+          "absurdres", "highres", "cinematic lighting", "depth of field"]
+
+
+def generate_corpus(count: int, seed: int = 0) -> dict:
+    """자주 쓰이는 태그와 색상 조합 태그, 가중치 구문이 섞인 합성 프롬프트를 만듭니다."""
+    rng = random.Random(seed)
+    vocabulary = COMMON + [f"{color} {part}" for color in COLORS for part in PARTS]
+    prompts = {}
+    for i in range(count):
+        tags = rng.sample(vocabulary, rng.randint(12, 30))
+        tags = [f"({tag}:{rng.choice([1.1, 1.2, 1.3])})" if rng.random() < 0.15 else tag for tag in tags]
+        if rng.random() < 0.3:
+            tags.append(f"<lora:style_{rng.randint(1, 20)}:0.{rng.randint(5, 9)}>")
+        prompts[f"bench://{i:06d}"] = ", ".join(tags)
+    return prompts
+
+
+def run_single(prompts, args):
+    return {item_id: gemini_classifier.classify_prompt_with_gemini(prompt) for item_id, prompt in prompts.items()}
+
+
+def run_batch(prompts, args):
+    return gemini_classifier.classify_prompts_batch(prompts)
+
+
+def run_cached(prompts, args):
+    tag_cache.invalidate_tag_cache()
+    return tag_cache.classify_prompts_cached(prompts)
+
+
+def run_queue(prompts, args):
+    classification_queue.enqueue_jobs(prompts.items())
+    results = {}
+    queue = classification_queue.ClassificationQueue(concurrency=args.concurrency,
+                                                     requests_per_minute=args.client_rpm)
+    queue.run(on_result=results.__setitem__,
+              on_error=lambda item_id, message: results.__setitem__(item_id, {"error": message}))
+    return results
+
+
+RUNNERS = {"single": run_single, "batch": run_batch, "cached": run_cached, "queue": run_queue}
+
+
+def run_scenario(name, prompts, server, args) -> dict:
+    gemini_classifier.close_services() # 시나리오마다 새 서비스와 통계로 시작
+    service = gemini_classifier.get_service()
+    server.reset_stats()
+
+    start = time.perf_counter()
+    results = RUNNERS[name](prompts, args)
+    wall_sec = time.perf_counter() - start
+
+    calls = service.call_stats()
+    stats = dict(server.stats)
+    failed = sum(1 for result in results.values() if "error" in result)
+    return {
+        "prompts": len(prompts),
+        "wall_sec": round(wall_sec, 3),
+        "prompts_per_sec": round(len(prompts) / wall_sec, 2),
+        "requests": stats["requests"],
+        "requests_per_sec": round(stats["requests"] / wall_sec, 2),
+        "p50_ms": round(calls["p50_sec"] * 1000, 1),
+        "p95_ms": round(calls["p95_sec"] * 1000, 1),
+        "tokens_sent": stats["input_tokens"],
+        "tokens_received": stats["output_tokens"],
+        # 오류 응답을 받은 요청은 클라이언트가 다시 보냈거나 실패로 처리한 요청
+        "retried_requests": stats["rate_limited"] + stats["server_errors"] + stats["malformed"],
+        "failed_prompts": failed,
+    }
+
+
+def git_revision():
+    """현재 커밋의 짧은 해시와 작업 트리 변경 여부를 반환합니다."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def save_result(record, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def print_table(rows, title=None):
+    columns = ["prompts_per_sec", "requests", "requests_per_sec", "p50_ms", "p95_ms",
+               "tokens_sent", "retried_requests", "failed_prompts"]
+    if title:
+        print(f"\n== {title} ==")
+    print(f"{'':<22}" + "".join(f"{column:>17}" for column in columns))
+    for label, metrics in rows:
+        print(f"{label:<22}" + "".join(f"{metrics.get(column, ''):>17}" for column in columns))
+
+
+def compare(path=RESULTS_PATH, last=10):
+    """기록된 결과를 시나리오별로 최근 커밋 순서대로 보여 줍니다."""
+    if not os.path.exists(path):
+        print(f"기록된 결과가 없습니다: {path}")
+        return
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()][-last:]
+    for scenario in SCENARIOS:
+        rows = []
+        for record in records:
+            if scenario in record["results"]:
+                label = record["commit"] + ("*" if record.get("dirty") else "")
+                if record.get("label"):
+                    label += f" {record['label']}"
+                rows.append((label[:21], record["results"][scenario]))
+        if rows:
+            print_table(rows, scenario)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--prompts', type=int, default=200, help="합성 프롬프트 수")
+    parser.add_argument('--scenarios', default=",".join(SCENARIOS))
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--ms-per-output-token', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', type=int, default=classification_queue.DEFAULT_CONCURRENCY)
+    parser.add_argument('--client-rpm', type=float, default=6000, help="작업 큐의 분당 요청 한도")
+    parser.add_argument('--backoff-base', type=float, help="작업 큐 재시도 백오프 기본 시간(초)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', default="", help="결과 기록에 붙일 설명")
+    parser.add_argument('--no-save', action='store_true', help="결과를 기록하지 않음")
+    parser.add_argument('--compare', action='store_true', help="기록된 결과를 비교해서 보여 주고 종료")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare()
+        return
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    if args.backoff_base is not None:
+        classification_queue.BACKOFF_BASE_SEC = args.backoff_base
+
+    server = MockGeminiServer(latency_ms=args.latency_ms, ms_per_output_token=args.ms_per_output_token,
+                              error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                              malformed_rate=args.malformed_rate, seed=args.seed).start()
+    os.environ["GEMINI_API_ENDPOINT"] = server.url
+    initialize_database()
+    prompts = generate_corpus(args.prompts, args.seed)
+
+    results = {}
+    try:
+        for name in scenarios:
+            print(f"\n[{name}] 실행 중...")
+            results[name] = run_scenario(name, prompts, server, args)
+    finally:
+        gemini_classifier.close_services()
+        server.stop()
+
+    print_table(list(results.items()), f"프롬프트 {args.prompts}개, 지연 {args.latency_ms}ms")
+
+    commit, dirty = git_revision()
+    record = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+        "label": args.label,
+        "config": {key: value for key, value in vars(args).items() if key not in ("compare", "no_save", "label")},
+        "results": results,
+    }
+    if not args.no_save:
+        save_result(record)
+        print(f"\n결과를 기록했습니다: {RESULTS_PATH} ({commit}{'*' if dirty else ''})")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,8 @@ import sys
 from PyQt6.QtWidgets import QApplication
 
 from src.prompt_classifier.database import initialize_database
+from src.prompt_classifier.db_manager import close_db_connection
+from src.prompt_classifier.gemini_classifier import close_services
 from src.prompt_classifier.ui.main_window import MainWindow
 
 if __name__ == '__main__':
@@ -12,4 +14,7 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    exit_code = app.exec()
+    close_services() # Gemini 컨텍스트 캐시 정리
+    close_db_connection() # WAL 내용을 DB 파일에 반영하고 닫음
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+태그 통계(analytics)의 행렬 구성, 많이 쓰인 태그/연관 태그 질의, 증분 갱신 속도를 측정합니다.
+
+태그 빈도가 지프 분포를 따르는 합성 프롬프트로 TagMatrix를 만들고,
+연관 태그 질의 결과를 파이썬으로 모든 이미지를 훑는 방식과 비교합니다.
+
+사용법:
+    python scripts/bench_analytics.py --images 100000 --vocabulary 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from src.prompt_classifier.analytics import TagMatrix
+
+
+def make_rows(count, vocabulary, seed=1):
+    """[(이미지 경로, 태그 목록), ...]. 앞쪽 태그일수록 자주 나옵니다."""
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, vocabulary + 1)
+    weights /= weights.sum()
+    rows = []
+    for i in range(count):
+        tags = rng.choice(vocabulary, size=rng.integers(15, 45), p=weights)
+        rows.append((f"/images/{i:06d}.png", [f"tag_{t}" for t in tags]))
+    return rows
+
+
+def brute_force(rows, tag):
+    together = {}
+    for _, tags in rows:
+        tags = set(tags)
+        if tag in tags:
+            for other in tags:
+                together[other] = together.get(other, 0) + 1
+    return together
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=100_000)
+    parser.add_argument('--vocabulary', type=int, default=20_000)
+    parser.add_argument('--updates', type=int, default=500, help="증분 갱신으로 바꿀 이미지 수")
+    args = parser.parse_args()
+
+    print(f"합성 프롬프트 {args.images}개 생성 중...")
+    rows = make_rows(args.images, args.vocabulary)
+
+    matrix = TagMatrix()
+    start = time.perf_counter()
+    for offset in range(0, len(rows), 5000):
+        matrix.update(rows[offset:offset + 5000])
+    print(f"행렬 구성: {time.perf_counter() - start:.2f}s, 태그 {matrix.column_count()}개")
+
+    start = time.perf_counter()
+    top = matrix.top_k(100)
+    print(f"많이 쓰인 태그 100개: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    matrix.associations(top[0][0])
+    print(f"첫 연관 질의 (CSR/CSC 배열 생성 포함): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    probes = [tag for tag, _ in top[::10]] + [tag for tag, _ in matrix.top_k(2000)[-10:]]
+    start = time.perf_counter()
+    for tag in probes:
+        matrix.associations(tag)
+    print(f"연관 태그 질의: 평균 {(time.perf_counter() - start) * 1000 / len(probes):.1f}ms "
+          f"(가장 흔한 태그부터 드문 태그까지 {len(probes)}개)")
+
+    # 일부 이미지의 태그를 바꾼 뒤 배열을 다시 만들지 않고 보정해서 질의
+    rng = random.Random(2)
+    changed = make_rows(args.updates, args.vocabulary, seed=3)
+    changed = [(rows[rng.randrange(len(rows))][0], tags) for _, tags in changed]
+    start = time.perf_counter()
+    matrix.update(changed)
+    update_ms = (time.perf_counter() - start) * 1000
+    lookup = dict(rows)
+    lookup.update(changed)
+    rows = list(lookup.items())
+    start = time.perf_counter()
+    matrix.associations(top[0][0])
+    print(f"이미지 {args.updates}개 갱신: {update_ms:.1f}ms, 갱신 후 질의 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    tag = top[5][0]
+    start = time.perf_counter()
+    expected = brute_force(rows, tag)
+    print(f"파이썬으로 모든 이미지를 훑는 연관 질의: {(time.perf_counter() - start) * 1000:.1f}ms")
+    print(f"결과 일치: {matrix.cooccurrence(tag) == expected}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+MinHash/LSH 중복 묶음 인덱스의 기록/조회 속도와 묶음 정확도를 측정합니다.
+
+합성 프롬프트 묶음을 만들어 (묶음마다 시드만 다른 재생성 + 태그 한두 개를 바꾼 변형)
+prompt_index가 하는 것처럼 배치 단위로 서명을 기록하고, 모든 쌍을 비교하는 방식과 결과를 비교합니다.
+
+사용법:
+    python scripts/bench_dedup.py --groups 2000 --size 10
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_temp_db_dir = tempfile.TemporaryDirectory()
+os.environ["PROMPT_GALLERY_DB"] = os.path.join(_temp_db_dir.name, "dedup_bench.db")
+
+from src.prompt_classifier import dedup
+from src.prompt_classifier.database import initialize_database
+from src.prompt_classifier.db_manager import get_db_connection
+
+VOCABULARY = [f"tag_{i}" for i in range(5000)]
+BATCH_SIZE = 500
+
+
+def make_corpus(groups, size, seed=1):
+    """[(이미지 경로, 태그 목록, 묶음 번호), ...]를 만듭니다. 묶음 안의 1/3은 태그 한두 개를 바꾼 변형입니다."""
+    rng = random.Random(seed)
+    items = []
+    for group in range(groups):
+        base = rng.sample(VOCABULARY, rng.randint(15, 35))
+        for n in range(size):
+            tags = list(base)
+            if n % 3 == 2:
+                tags[rng.randrange(len(tags))] = rng.choice(VOCABULARY)
+            items.append((f"/images/{group:05d}_{n:03d}.png", tags, group))
+    rng.shuffle(items)
+    return items
+
+
+def pairwise_groups(items):
+    """모든 쌍의 자카드 유사도를 비교해 묶습니다. (이전 방식에 해당하는 O(n^2) 기준선)"""
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    sets = [set(tags) for _, tags, _ in items]
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            if len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= dedup.SIMILARITY_THRESHOLD:
+                parent[find(i)] = find(j)
+    return len({find(i) for i in range(len(items))})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--groups', type=int, default=2000, help="프롬프트 묶음 수")
+    parser.add_argument('--size', type=int, default=10, help="묶음당 이미지 수")
+    parser.add_argument('--pairwise-limit', type=int, default=3000, help="모든 쌍 비교 기준선에 쓸 이미지 수")
+    args = parser.parse_args()
+
+    initialize_database()
+    conn = get_db_connection()
+    items = make_corpus(args.groups, args.size)
+
+    start = time.perf_counter()
+    for offset in range(0, len(items), BATCH_SIZE):
+        with conn:
+            dedup.update_signatures(conn, [(path, tags) for path, tags, _ in items[offset:offset + BATCH_SIZE]])
+    elapsed = time.perf_counter() - start
+    print(f"서명 기록: 이미지 {len(items)}개 {elapsed:.2f}s ({len(items) / elapsed:,.0f}/s)")
+
+    paths = [path for path, _, _ in items]
+    start = time.perf_counter()
+    groups = dedup.group_duplicates(paths)
+    print(f"묶음 조회: {(time.perf_counter() - start) * 1000:.1f}ms, 묶음 {len(groups)}개 (실제 {args.groups}개)")
+
+    # 묶음 정확도: 같은 묶음으로 만든 이미지가 한 묶음에 들어갔는지 (재현율), 다른 묶음과 섞이지 않았는지 (정밀도)
+    truth = {path: group for path, _, group in items}
+    mixed = sum(1 for group in groups if len({truth[path] for path in group}) > 1)
+    largest = {}
+    for group in groups:
+        label = truth[group[0]]
+        largest[label] = max(largest.get(label, 0), len(group))
+    recall = sum(largest.values()) / len(items)
+    print(f"섞인 묶음 {mixed}개, 재현율 {recall:.3f}")
+
+    start = time.perf_counter()
+    for path in paths[:1000]:
+        dedup.find_duplicates(path)
+    print(f"이미지 하나의 중복 찾기: 평균 {(time.perf_counter() - start):.3f}ms")
+
+    sample = items[:args.pairwise_limit]
+    start = time.perf_counter()
+    pairwise_groups(sample)
+    elapsed = time.perf_counter() - start
+    scale = (len(items) / len(sample)) ** 2
+    print(f"모든 쌍 비교 ({len(sample)}개): {elapsed:.2f}s, {len(items)}개로 늘리면 약 {elapsed * scale:.0f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+즐겨찾기 DB 작업의 초당 처리량을 호출마다 연결을 열고 닫던 이전 방식과 비교합니다.
+
+이전: 호출마다 sqlite3.connect → 쿼리 → commit → close (기본 저널 모드, synchronous=FULL)
+이후: 스레드별로 유지되는 WAL 연결 + 준비된 문장 재사용, 그리고 한 트랜잭션으로 처리하는 일괄 API
+
+각 방식은 임시 폴더의 별도 DB 파일에서 측정하므로 실제 DB는 건드리지 않습니다.
+
+사용법:
+    python scripts/bench_favorites_db.py --items 500
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_temp_dir = tempfile.TemporaryDirectory()
+os.environ["PROMPT_GALLERY_DB"] = os.path.join(_temp_dir.name, "after.db")
+
+from src.prompt_classifier import db_manager
+from src.prompt_classifier.database import initialize_database
+
+LEGACY_DB = os.path.join(_temp_dir.name, "before.db")
+# 이전 방식은 분류 결과를 JSON 문자열 열에 저장하던 스키마에서 측정
+LEGACY_SCHEMA = """
+CREATE TABLE favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    image_path TEXT NOT NULL UNIQUE,
+    full_prompt TEXT,
+    classified_data TEXT,
+    favorited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+CLASSIFIED = {"subject": ["1girl", "solo"], "background_props": ["outdoors", "sky"]}
+CLASSIFIED_JSON = json.dumps(CLASSIFIED)
+
+
+def legacy_is_favorited(image_path):
+    conn = sqlite3.connect(LEGACY_DB)
+    conn.row_factory = sqlite3.Row
+    result = conn.execute("SELECT 1 FROM favorites WHERE image_path = ?", (image_path,)).fetchone()
+    conn.close()
+    return result is not None
+
+
+def legacy_add_favorite(image_path, full_prompt):
+    conn = sqlite3.connect(LEGACY_DB)
+    try:
+        conn.execute("INSERT INTO favorites (image_path, full_prompt) VALUES (?, ?)", (image_path, full_prompt))
+        conn.commit()
+    except sqlite3.IntegrityError:
+        pass
+    finally:
+        conn.close()
+
+
+def legacy_update_classified_data(image_path, classified_data):
+    conn = sqlite3.connect(LEGACY_DB)
+    conn.execute("UPDATE favorites SET classified_data = ? WHERE image_path = ?", (classified_data, image_path))
+    conn.commit()
+    conn.close()
+
+
+def legacy_remove_favorite(image_path):
+    conn = sqlite3.connect(LEGACY_DB)
+    conn.execute("DELETE FROM favorites WHERE image_path = ?", (image_path,))
+    conn.commit()
+    conn.close()
+
+
+def measure(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    ops = count / elapsed if elapsed > 0 else float('inf')
+    print(f"  {label:<34} {ops:12,.0f} ops/s  ({elapsed * 1000:9.1f}ms)")
+    return ops
+
+
+def run(items):
+    paths = [f"/bench/images/{i:06d}.png" for i in range(len(items))]
+    rows = list(zip(paths, items))
+    results = {}
+
+    print("\n[이전] 호출마다 연결")
+    results["before_add"] = measure("add_favorite", lambda: [legacy_add_favorite(p, t) for p, t in rows], len(rows))
+    results["before_check"] = measure("is_favorited", lambda: [legacy_is_favorited(p) for p in paths], len(paths))
+    results["before_update"] = measure("update_classified_data",
+                                       lambda: [legacy_update_classified_data(p, CLASSIFIED_JSON) for p in paths],
+                                       len(paths))
+    results["before_remove"] = measure("remove_favorite", lambda: [legacy_remove_favorite(p) for p in paths],
+                                       len(paths))
+
+    print("\n[이후] 유지되는 WAL 연결")
+    db_manager.print = lambda *args, **kwargs: None # 항목별 로그 출력이 측정값에 섞이지 않도록
+    results["after_add"] = measure("add_favorite", lambda: [db_manager.add_favorite(p, t) for p, t in rows],
+                                   len(rows))
+    results["after_check"] = measure("is_favorited", lambda: [db_manager.is_favorited(p) for p in paths],
+                                     len(paths))
+    results["after_update"] = measure("update_classified_data",
+                                      lambda: [db_manager.update_classified_data(p, CLASSIFIED) for p in paths],
+                                      len(paths))
+    results["after_remove"] = measure("remove_favorite", lambda: [db_manager.remove_favorite(p) for p in paths],
+                                      len(paths))
+
+    print("\n[이후] 일괄 API")
+    results["bulk_add"] = measure("add_favorites_many", lambda: db_manager.add_favorites_many(rows), len(rows))
+    results["bulk_check"] = measure("is_favorited_many", lambda: db_manager.is_favorited_many(paths), len(paths))
+    results["bulk_update"] = measure("update_classified_data_many",
+                                     lambda: db_manager.update_classified_data_many(
+                                         [(p, CLASSIFIED) for p in paths]), len(paths))
+    results["bulk_remove"] = measure("remove_favorites_many", lambda: db_manager.remove_favorites_many(paths),
+                                     len(paths))
+
+    print("\n속도 향상 (이전 대비)")
+    for op in ("add", "check", "update", "remove"):
+        print(f"  {op:<8} 단건 x{results[f'after_{op}'] / results[f'before_{op}']:7.1f}"
+              f"   일괄 x{results[f'bulk_{op}'] / results[f'before_{op}']:8.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=300, help="작업마다 처리할 즐겨찾기 수")
+    args = parser.parse_args()
+
+    initialize_database()
+    # 이전 방식은 별도 파일에서 측정 (기본 저널 모드 그대로)
+    conn = sqlite3.connect(LEGACY_DB)
+    conn.execute(LEGACY_SCHEMA)
+    conn.close()
+
+    items = [f"masterpiece, best quality, 1girl, solo, image {i}" for i in range(args.items)]
+    run(items)
+    db_manager.close_db_connection()
+
+
+if __name__ == '__main__':
+    main()
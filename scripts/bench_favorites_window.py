@@ -0,0 +1,92 @@
+"""
+즐겨찾기가 많을 때 즐겨찾기 창을 여는 시간과 목록을 끝까지 스크롤하는(페이지를 모두 읽는) 시간을 측정합니다.
+
+페이지 조회는 (favorited_at, id) 키셋 페이지네이션과 OFFSET 방식의 뒤쪽 페이지 조회 시간을 비교합니다.
+임시 DB에 합성 즐겨찾기를 넣어 측정하므로 실제 DB는 건드리지 않습니다. (화면 없이 offscreen으로 실행)
+
+사용법:
+    python scripts/bench_favorites_window.py --favorites 50000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+_temp_dir = tempfile.TemporaryDirectory()
+os.environ["PROMPT_GALLERY_DB"] = os.path.join(_temp_dir.name, "bench.db")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from src.prompt_classifier import db_manager
+from src.prompt_classifier.database import initialize_database
+
+
+def fill_favorites(count):
+    rng = random.Random(1)
+    conn = db_manager.get_db_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO favorites (image_path, full_prompt, favorited_at) VALUES (?, ?, ?)",
+            [(f"/images/{i:06d}.png", "1girl, solo, outdoors",
+              f"2024-{1 + rng.randrange(12):02d}-{1 + rng.randrange(28):02d} "
+              f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}")
+             for i in range(count)])
+
+
+def bench_pages(count):
+    conn = db_manager.get_db_connection()
+    page = db_manager.FAVORITES_PAGE
+    last = conn.execute("SELECT favorited_at, id FROM favorites ORDER BY favorited_at DESC, id DESC "
+                        "LIMIT 1 OFFSET ?", (count - page - 1,)).fetchone()
+    repeats = 20
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        db_manager.get_favorites_page(tuple(last))
+    keyset_ms = (time.perf_counter() - start) * 1000 / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        conn.execute("SELECT id, image_path, full_prompt, favorited_at, classified_at FROM favorites "
+                     "ORDER BY favorited_at DESC, id DESC LIMIT ? OFFSET ?", (page, count - page)).fetchall()
+    offset_ms = (time.perf_counter() - start) * 1000 / repeats
+    print(f"마지막 페이지 조회: 키셋 {keyset_ms:.2f}ms, OFFSET {offset_ms:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--favorites', type=int, default=50_000)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    initialize_database()
+    print(f"합성 즐겨찾기 {args.favorites}개 생성 중...")
+    fill_favorites(args.favorites)
+
+    from src.prompt_classifier.ui.favorites_window import FavoritesWindow
+    start = time.perf_counter()
+    window = FavoritesWindow()
+    app.processEvents()
+    print(f"창 열기: {(time.perf_counter() - start) * 1000:.1f}ms (처음 읽은 행 {window.favorites_model.rowCount()}개)")
+
+    model = window.favorites_model
+    start = time.perf_counter()
+    pages = 0
+    while model.canFetchMore():
+        model.fetchMore()
+        pages += 1
+    elapsed = time.perf_counter() - start
+    print(f"끝까지 스크롤: {elapsed * 1000:.0f}ms (페이지 {pages}개, 평균 {elapsed * 1000 / max(pages, 1):.2f}ms)")
+
+    bench_pages(args.favorites)
+    window.close()
+    db_manager.close_db_connection()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+분류 호출마다 API 키 로딩/genai.configure/모델 생성을 반복하던 방식과
+한 번 설정한 GeminiClassifierService를 재사용하는 방식의 호출당 부가 비용을 비교합니다.
+
+기본은 네트워크 없이 호출 전 준비 비용만 측정하며, --live를 주면 실제 API로 분류 호출 시간까지 측정합니다.
+
+사용법:
+    python scripts/bench_gemini_overhead.py --calls 200
+    python scripts/bench_gemini_overhead.py --live 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+
+from src.prompt_classifier import gemini_classifier
+from src.prompt_classifier.utils import load_api_key
+
+SAMPLE_PROMPT = ("masterpiece, best quality, 1girl, solo, long hair, (blue eyes:1.2), looking at viewer, "
+                 "white dress, outdoors, sky, <lora:detail_tweaker:0.8>")
+
+
+def legacy_setup(model_name):
+    """변경 전 classify_prompt_with_gemini가 호출마다 하던 준비 과정입니다."""
+    genai.configure(api_key=load_api_key())
+    model = genai.GenerativeModel(model_name, generation_config=gemini_classifier.GENERATION_CONFIG)
+    # configure가 내부 클라이언트를 비우므로 첫 호출 때 클라이언트(채널)를 다시 만듦
+    genai_client.get_default_generative_client()
+    return model
+
+
+def service_setup(model_name):
+    service = gemini_classifier.get_service(model_name)
+    genai_client.get_default_generative_client()
+    return service
+
+
+def measure(label, func, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    print(f"{label:<22} 평균 {statistics.mean(samples) * 1000:8.3f}ms  "
+          f"중앙값 {statistics.median(samples) * 1000:8.3f}ms  ({calls}회)")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200, help="준비 비용 측정 반복 횟수")
+    parser.add_argument('--live', type=int, metavar='N', help="실제 API로 N번씩 분류 호출 시간 측정")
+    parser.add_argument('--model', default=gemini_classifier.DEFAULT_MODEL)
+    args = parser.parse_args()
+
+    if not args.live:
+        # 준비 비용만 측정할 때는 키가 없어도 되도록 가짜 키 사용 (네트워크 호출 없음)
+        os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder-key")
+
+    measure("호출마다 설정 (이전)", lambda: legacy_setup(args.model), args.calls)
+    # 서비스는 최초 한 번만 설정 비용이 들고 이후에는 재사용
+    setup_start = time.perf_counter()
+    service = gemini_classifier.get_service(args.model)
+    print(f"서비스 최초 설정: {(time.perf_counter() - setup_start) * 1000:.3f}ms "
+          f"(지시문: {service.instruction_mode})")
+    measure("서비스 재사용 (이후)", lambda: service_setup(args.model), args.calls)
+
+    if args.live:
+        legacy = lambda: legacy_setup(args.model).generate_content(
+            [gemini_classifier.INSTRUCTION_PROMPT, gemini_classifier.preprocess_prompt(SAMPLE_PROMPT)])
+        measure("실제 호출 (이전)", legacy, args.live)
+        gemini_classifier.close_services() # legacy_setup의 configure로 비워진 클라이언트를 다시 만들도록
+        measure("실제 호출 (이후)", lambda: gemini_classifier.classify_prompt_with_gemini(SAMPLE_PROMPT), args.live)
+        print(gemini_classifier.get_service(args.model).call_stats())
+        gemini_classifier.close_services()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+지각 해시(pHash/dHash) 계산 속도와 비슷한 이미지 조회 속도를 측정합니다.
+
+1) 해시 계산: 원본 크기로 디코딩하는 방식과 축소 디코딩(draft)하는 방식의 처리량,
+   그리고 크기를 줄이거나 JPEG로 다시 저장한 사본과의 해밍 거리 (같은 이미지로 찾아지는지)
+2) 조회: 무작위 해시 N개를 HashIndex에 넣고, 파이썬으로 하나씩 비교하는 방식과 질의 시간을 비교
+
+사용법:
+    python scripts/bench_image_hash.py --images 40 --hashes 100000
+    python scripts/bench_image_hash.py --folder D:/outputs
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+from src.prompt_classifier import image_hash
+from src.prompt_classifier.scanner import find_image_files
+
+
+def make_test_images(folder, count, width=1024, height=1536):
+    """무작위 색 도형을 겹쳐 그린 서로 다른 이미지를 만들고, 절반은 JPEG로 저장합니다."""
+    rng = random.Random(7)
+    paths = []
+    for i in range(count):
+        image = Image.new('RGB', (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            box = (x0, y0, x0 + rng.randint(100, width // 2), y0 + rng.randint(100, height // 2))
+            color = tuple(rng.randrange(256) for _ in range(3))
+            (draw.ellipse if rng.random() < 0.5 else draw.rectangle)(box, fill=color)
+        image = image.filter(ImageFilter.GaussianBlur(4))
+        ext = '.jpg' if i % 2 else '.png'
+        path = os.path.join(folder, f"{i:04d}{ext}")
+        image.save(path, quality=92) if ext == '.jpg' else image.save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def hash_full_decode(image_path):
+    """축소 디코딩 없이 원본 해상도로 읽어 해시를 계산합니다. (비교용)"""
+    with Image.open(image_path) as img:
+        gray = img.convert('L')
+    return image_hash.phash(gray), image_hash.dhash(gray)
+
+
+def bench_hashing(paths, temp_dir):
+    for label, func in (("원본 디코딩", hash_full_decode), ("축소 디코딩", image_hash.compute_hashes)):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {len(paths) / elapsed:8.1f} images/s (프로세스 1개)")
+
+    # 축소/재압축한 사본이 가까운 해시를 갖는지 확인
+    same, other = [], []
+    hashes = [image_hash.compute_hashes(path) for path in paths]
+    for i, path in enumerate(paths[:20]):
+        with Image.open(path) as img:
+            copy = img.convert('RGB').resize((img.width // 3, img.height // 3))
+        copy_path = os.path.join(temp_dir, f"copy_{i}.jpg")
+        copy.save(copy_path, quality=70)
+        copy_hash = image_hash.compute_hashes(copy_path)
+        same.append(image_hash.hamming(hashes[i][0], copy_hash[0]))
+        other.extend(image_hash.hamming(hashes[j][0], copy_hash[0]) for j in range(len(paths)) if j != i)
+    print(f"pHash 거리: 축소+JPEG 사본 평균 {np.mean(same):.1f} (최대 {max(same)}), "
+          f"다른 이미지 평균 {np.mean(other):.1f} (최소 {min(other)})")
+
+
+def bench_lookup(count, queries, max_distance):
+    rng = random.Random(3)
+    index = image_hash.HashIndex()
+    values = [rng.getrandbits(64) for _ in range(count)]
+    start = time.perf_counter()
+    index.update((f"/images/{i:06d}.png", value, value) for i, value in enumerate(values))
+    print(f"\n인덱스 구성: 해시 {count}개 {time.perf_counter() - start:.2f}s")
+
+    # 절반은 저장된 해시에서 몇 비트만 바꾼 질의 (비슷한 이미지가 있는 경우)
+    probes = []
+    for n in range(queries):
+        value = values[rng.randrange(count)] if n % 2 == 0 else rng.getrandbits(64)
+        for bit in rng.sample(range(64), rng.randint(0, max_distance)):
+            value ^= 1 << bit
+        probes.append(value)
+
+    start = time.perf_counter()
+    indexed_results = [index.search(value, max_distance=max_distance) for value in probes]
+    indexed_ms = (time.perf_counter() - start) * 1000 / queries
+
+    sample = probes[:50]
+    start = time.perf_counter()
+    python_results = [sum(1 for stored in values if (stored ^ value).bit_count() <= max_distance)
+                      for value in sample]
+    python_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+    agree = sum(len(found) == expected for found, expected in zip(indexed_results, python_results))
+    hits = sum(1 for found in indexed_results if found)
+    print(f"HashIndex (NumPy)  {indexed_ms:8.3f}ms/질의, 결과가 있는 질의 {hits}/{queries}")
+    print(f"파이썬 하나씩 비교 {python_ms:8.3f}ms/질의")
+    print(f"결과 일치 {agree}/{len(sample)} (거리 {max_distance} 이하)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--folder', help="해시 계산에 쓸 이미지 폴더 (없으면 생성)")
+    parser.add_argument('--images', type=int, default=40, help="생성하거나 사용할 이미지 수")
+    parser.add_argument('--hashes', type=int, default=100_000, help="조회 측정에 쓸 해시 수")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--max-distance', type=int, default=image_hash.DEFAULT_MAX_DISTANCE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.folder:
+            paths = find_image_files(args.folder)[:args.images]
+        else:
+            print(f"테스트 이미지 {args.images}장 생성 중...")
+            paths = make_test_images(temp_dir, args.images)
+        bench_hashing(paths, temp_dir)
+    bench_lookup(args.hashes, args.queries, args.max_distance)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+헤더 전용 메타데이터 리더와 기존 PIL 방식의 생성 정보 읽기 속도를 비교합니다.
+
+사용법:
+    python scripts/bench_metadata_reader.py <이미지 폴더>
+    python scripts/bench_metadata_reader.py --generate 3000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.prompt_classifier import metadata_reader
+from src.prompt_classifier.prompt_extractor import read_generation_text_pil
+from src.prompt_classifier.scanner import find_image_files
+
+SAMPLE_PARAMETERS = (
+    "masterpiece, best quality, (blue eyes:1.2), 1girl, solo, long hair, looking at viewer, "
+    "<lora:detail_tweaker:0.8>, outdoors, {idx}\n"
+    "Negative prompt: lowres, bad anatomy, bad hands, text, error\n"
+    "Steps: 28, Sampler: DPM++ 2M Karras, CFG scale: 7, Seed: {idx}, Size: 1024x1536, Model hash: 1a2b3c4d"
+)
+
+
+def generate_corpus(folder, count, width=1024, height=1536):
+    """PNG(tEXt/iTXt/zTXt)와 JPEG(UTF-16 UserComment)가 섞인 합성 코퍼스를 만듭니다."""
+    from PIL import Image, PngImagePlugin
+
+    # 무작위 픽셀이라 압축이 잘 되지 않아 실제 출력물과 비슷한 크기가 됨
+    base = Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
+    for idx in range(count):
+        text = SAMPLE_PARAMETERS.format(idx=idx)
+        if idx % 4 == 3:
+            exif = Image.Exif()
+            exif[0x8769] = {0x9286: b'UNICODE\x00' + text.encode('utf-16-be')}
+            base.save(os.path.join(folder, f"{idx:06d}.jpg"), exif=exif, quality=90)
+        else:
+            info = PngImagePlugin.PngInfo()
+            if idx % 4 == 1:
+                info.add_itxt('parameters', text)
+            elif idx % 4 == 2:
+                info.add_text('parameters', text, zip=True)
+            else:
+                info.add_text('parameters', text)
+            base.save(os.path.join(folder, f"{idx:06d}.png"), pnginfo=info, compress_level=1)
+
+
+def run(label, reader, image_paths):
+    start = time.perf_counter()
+    results = [reader(path) for path in image_paths]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.3f}s  {len(image_paths) / elapsed:10.1f} files/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', nargs='?', help="측정할 이미지 폴더")
+    parser.add_argument('--generate', type=int, metavar='N', help="N개의 합성 이미지를 임시 폴더에 만들어 측정")
+    args = parser.parse_args()
+
+    if args.generate:
+        temp_dir = tempfile.TemporaryDirectory()
+        folder = temp_dir.name
+        print(f"합성 코퍼스 {args.generate}개 생성 중... ({folder})")
+        generate_corpus(folder, args.generate)
+    elif args.folder:
+        folder = args.folder
+    else:
+        parser.error("폴더 경로 또는 --generate N 을 지정하세요.")
+
+    image_paths = find_image_files(folder)
+    print(f"대상 파일: {len(image_paths)}개")
+
+    # 두 번째 실행부터는 OS 페이지 캐시 영향이 같도록 한 번씩 미리 읽음
+    for path in image_paths:
+        with open(path, 'rb') as f:
+            f.read(65536)
+
+    pil_results = run("PIL", read_generation_text_pil, image_paths)
+    header_results = run("header-only", metadata_reader.read_generation_text, image_paths)
+
+    # PIL은 JPEG UserComment의 문자 코드 지정자를 그대로 남기므로 PNG만 일치 여부 비교
+    mismatches = [path for path, a, b in zip(image_paths, pil_results, header_results)
+                  if path.lower().endswith('.png') and a != b]
+    print(f"PNG 결과 불일치: {len(mismatches)}개")
+    for path in mismatches[:5]:
+        print(f"  {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+이미지 뷰어에서 다음 이미지로 넘어가는 데 걸리는 시간을 측정합니다.
+
+이전: 넘길 때마다 QPixmap(경로)로 원본을 읽고 화면 크기로 SmoothTransformation 축소
+이후: ImageViewer (진행 방향으로 미리 읽은 FrameCache에서 표시)
+
+키를 누르고 있는 상황을 흉내 내어 --interval-ms 간격으로 넘기며, 그 사이에 이벤트 루프를 돌려
+백그라운드 미리 읽기가 진행되도록 합니다. 이미지를 주지 않으면 임시 폴더에 4K 이미지를 만들어 사용합니다.
+
+사용법:
+    python scripts/bench_viewer_navigation.py --count 20
+    python scripts/bench_viewer_navigation.py --folder D:/outputs --interval-ms 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# 뷰어가 즐겨찾기 상태를 조회하므로 실제 DB 대신 임시 DB 사용
+_temp_db_dir = tempfile.TemporaryDirectory()
+os.environ["PROMPT_GALLERY_DB"] = os.path.join(_temp_db_dir.name, "viewer_bench.db")
+
+from PyQt6.QtWidgets import QApplication, QLabel
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QColor, QLinearGradient
+from PyQt6.QtCore import Qt
+
+from src.prompt_classifier.database import initialize_database
+from src.prompt_classifier.scanner import find_image_files
+from src.prompt_classifier.ui.image_viewer import ImageViewer
+
+FRAME_MS = 1000 / 60
+
+
+def make_test_images(folder, count, width=3840, height=2160):
+    paths = []
+    for i in range(count):
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        painter = QPainter(image)
+        gradient = QLinearGradient(0, 0, width, height)
+        gradient.setColorAt(0, QColor.fromHsv(i * 37 % 360, 200, 230))
+        gradient.setColorAt(1, QColor.fromHsv(i * 91 % 360, 160, 80))
+        painter.fillRect(image.rect(), gradient)
+        painter.end()
+        path = os.path.join(folder, f"frame_{i:03d}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def pump(app, ms):
+    """ms 동안 이벤트 루프를 돌립니다. (키 반복 간격 동안 GUI가 쉬는 시간)"""
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def report(label, samples):
+    samples_ms = [s * 1000 for s in samples]
+    under = sum(1 for s in samples_ms if s < FRAME_MS)
+    print(f"{label:<26} 평균 {statistics.mean(samples_ms):8.2f}ms  중앙값 {statistics.median(samples_ms):8.2f}ms  "
+          f"최대 {max(samples_ms):8.2f}ms  한 프레임 미만 {under}/{len(samples_ms)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--folder', help="측정에 쓸 이미지 폴더 (없으면 4K 이미지를 생성)")
+    parser.add_argument('--count', type=int, default=12, help="생성하거나 사용할 이미지 수")
+    parser.add_argument('--interval-ms', type=float, default=120, help="넘기는 간격 (키 반복 속도)")
+    args = parser.parse_args()
+
+    initialize_database()
+    app = QApplication(sys.argv)
+    temp_dir = None
+    if args.folder:
+        paths = find_image_files(args.folder)[:args.count]
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        print(f"4K 테스트 이미지 {args.count}장 생성 중...")
+        paths = make_test_images(temp_dir.name, args.count)
+    screen_size = app.primaryScreen().availableGeometry().size()
+
+    label = QLabel()
+    legacy = []
+    for path in paths:
+        start = time.perf_counter()
+        label.setPixmap(QPixmap(path).scaled(screen_size, Qt.AspectRatioMode.KeepAspectRatio,
+                                             Qt.TransformationMode.SmoothTransformation))
+        legacy.append(time.perf_counter() - start)
+        pump(app, args.interval_ms)
+
+    viewer = ImageViewer(paths, 0)
+    pump(app, args.interval_ms)
+    cached = []
+    for _ in paths[1:]:
+        start = time.perf_counter()
+        viewer.show_next_image()
+        cached.append(time.perf_counter() - start)
+        pump(app, args.interval_ms)
+
+    print(f"\n이미지 {len(paths)}장, 화면 {screen_size.width()}x{screen_size.height()}, "
+          f"간격 {args.interval_ms:.0f}ms")
+    report("이전 (매번 디스크+축소)", legacy)
+    report("이후 (미리 읽기+캐시)", cached)
+    print(f"캐시: {viewer.frame_cache.stats()}")
+    viewer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+# src/prompt_classifier/__main__.py
+
+import sys
+
+from src.prompt_classifier.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
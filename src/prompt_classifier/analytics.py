@@ -0,0 +1,379 @@
+# src/prompt_classifier/analytics.py
+
+import itertools
+import threading
+
+import numpy as np
+
+from src.prompt_classifier.db_manager import get_db_connection
+
+LORA_CATEGORY = "lora"     # 'lora:이름' 태그의 카테고리 (분류 결과에는 없고 프롬프트 태그 이름으로 정함)
+LORA_PREFIX = "lora:"
+COMPACT_MIN_ROWS = 1000    # 압축한 뒤 바뀐 행이 이 수와
+COMPACT_RATIO = 0.1        # 전체 행의 이 비율을 모두 넘으면 다음 질의에서 CSR/CSC 배열을 다시 만듦
+DEFAULT_MIN_COUNT = 2      # 연관 태그는 적어도 이만큼 함께 쓰인 것만 보여줌 (한두 장 우연히 겹친 태그 제외)
+LOAD_BATCH = 5000          # DB에서 불러올 때 한 번에 행렬에 넣을 이미지 수
+
+
+def _gather(indptr, values, rows):
+    """CSR(또는 CSC)에서 여러 행의 값을 하나의 배열로 이어 붙여 반환합니다."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return values[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(total)]
+
+
+class TagMatrix:
+    """
+    이미지(행) x 태그(열)의 0/1 희소 행렬입니다.
+    태그별 이미지 수는 행이 바뀔 때마다 바로 갱신하고, 함께 쓰인 횟수는 CSR(행 -> 태그)과
+    CSC(태그 -> 행) 배열로 그 태그가 있는 행들의 태그를 모아 세어서 구합니다.
+    행이 바뀌어도 배열은 그대로 두고 바뀐 행만 기억했다가 질의할 때 보정하며,
+    바뀐 행이 많아지면 다음 질의에서 배열을 다시 만듭니다. 여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._columns = {}  # 열 키(태그) -> 열 번호
+        self._keys = []     # 열 번호 -> 열 키
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._slots = {}    # 행 키(이미지 경로) -> 행 번호
+        self._rows = []     # 행 번호 -> 정렬된 열 번호 배열 (지운 행은 None)
+        self._free = []
+        self._dirty = set() # 배열을 만든 뒤 바뀐 행 번호
+        self._csr = None    # (indptr, 열 번호)
+        self._csc = None    # (indptr, 행 번호)
+        self._cooccurrence_cache = {}
+        self.version = 0    # 행이 바뀔 때마다 증가
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _column_ids(self, keys):
+        ids = []
+        for key in keys:
+            column = self._columns.get(key)
+            if column is None:
+                column = len(self._keys)
+                self._columns[key] = column
+                self._keys.append(key)
+            ids.append(column)
+        if len(self._keys) > len(self._counts):
+            counts = np.zeros(max(1024, len(self._keys) * 2), dtype=np.int64)
+            counts[:len(self._counts)] = self._counts
+            self._counts = counts
+        return np.unique(np.array(ids, dtype=np.int32))
+
+    def _discard(self, slot):
+        old = self._rows[slot]
+        if old is not None:
+            self._counts[old] -= 1
+        self._dirty.add(slot)
+
+    def update(self, rows):
+        """(행 키, 열 키 목록)들을 추가하거나 바꿉니다. 열 키가 없는 행은 지웁니다."""
+        with self._lock:
+            for row_key, keys in rows:
+                keys = list(keys)
+                if not keys:
+                    self._remove_one(row_key)
+                    continue
+                ids = self._column_ids(keys)
+                slot = self._slots.get(row_key)
+                if slot is None:
+                    if self._free:
+                        slot = self._free.pop()
+                    else:
+                        slot = len(self._rows)
+                        self._rows.append(None)
+                    self._slots[row_key] = slot
+                else:
+                    self._discard(slot)
+                self._rows[slot] = ids
+                self._counts[ids] += 1
+                self._dirty.add(slot)
+            self._changed()
+
+    def _remove_one(self, row_key):
+        slot = self._slots.pop(row_key, None)
+        if slot is None:
+            return
+        self._discard(slot)
+        self._rows[slot] = None
+        self._free.append(slot)
+
+    def remove(self, row_keys):
+        with self._lock:
+            for row_key in row_keys:
+                self._remove_one(row_key)
+            self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._cooccurrence_cache.clear()
+
+    def _compact(self):
+        lengths = np.array([0 if ids is None else len(ids) for ids in self._rows], dtype=np.int64)
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        present = [ids for ids in self._rows if ids is not None]
+        columns = np.concatenate(present) if present else np.zeros(0, dtype=np.int32)
+        row_of_entry = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        order = np.argsort(columns, kind='stable')
+        column_indptr = np.zeros(len(self._keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=len(self._keys)), out=column_indptr[1:])
+        self._csr = (indptr, columns)
+        self._csc = (column_indptr, row_of_entry[order])
+        self._dirty.clear()
+
+    def _ensure_compact(self):
+        if self._csr is None or len(self._dirty) > max(COMPACT_MIN_ROWS, COMPACT_RATIO * len(self._slots)):
+            self._compact()
+
+    def count(self, key) -> int:
+        """열 키가 있는 행의 수"""
+        column = self._columns.get(key)
+        return 0 if column is None else int(self._counts[column])
+
+    def _cooccurrence(self, column) -> np.ndarray:
+        counts = self._cooccurrence_cache.get(column)
+        if counts is not None:
+            return counts
+        self._ensure_compact()
+        csr_indptr, csr_columns = self._csr
+        csc_indptr, csc_rows = self._csc
+        if column + 1 < len(csc_indptr):
+            rows = csc_rows[csc_indptr[column]:csc_indptr[column + 1]]
+        else:
+            rows = csc_rows[:0] # 배열을 만든 뒤 처음 나온 태그
+        extra = []
+        if self._dirty:
+            # 바뀐 행은 배열에 남은 예전 내용 대신 지금 내용으로 셈
+            rows = rows[~np.isin(rows, np.fromiter(self._dirty, dtype=np.int64))]
+            for slot in self._dirty:
+                ids = self._rows[slot]
+                if ids is not None and ids[min(np.searchsorted(ids, column), len(ids) - 1)] == column:
+                    extra.append(ids)
+        counts = np.bincount(np.concatenate([_gather(csr_indptr, csr_columns, rows), *extra]),
+                             minlength=len(self._keys))
+        self._cooccurrence_cache[column] = counts
+        return counts
+
+    def cooccurrence(self, key) -> dict:
+        """열 키와 같은 행에 있는 열 키별 횟수를 {열 키: 수}로 반환합니다. (자기 자신 포함)"""
+        with self._lock:
+            column = self._columns.get(key)
+            if column is None:
+                return {}
+            counts = self._cooccurrence(column)
+            return {self._keys[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def cooccurrence_matrix(self, keys) -> np.ndarray:
+        """열 키들끼리 함께 쓰인 횟수의 정사각 행렬을 반환합니다. 대각선은 각 키의 수입니다."""
+        keys = list(keys)
+        with self._lock:
+            columns = np.array([self._columns.get(key, -1) for key in keys], dtype=np.int64)
+            matrix = np.zeros((len(keys), len(keys)), dtype=np.int64)
+            for i, column in enumerate(columns):
+                if column >= 0:
+                    counts = self._cooccurrence(column)
+                    matrix[i, columns >= 0] = counts[columns[columns >= 0]]
+            return matrix
+
+    def _candidates(self, predicate):
+        if predicate is None:
+            return np.arange(len(self._keys))
+        return np.array([i for i, key in enumerate(self._keys) if predicate(key)], dtype=np.int64)
+
+    def column_count(self) -> int:
+        """한 행 이상에 있는 열 키의 수"""
+        with self._lock:
+            return int(np.count_nonzero(self._counts))
+
+    def top_k(self, k: int = None, predicate=None) -> list:
+        """
+        행이 많은 열 키 k개(없으면 전부)를 [(열 키, 수), ...]로 많은 순서대로 반환합니다.
+        predicate를 주면 predicate(열 키)가 참인 키만 셉니다.
+        """
+        with self._lock:
+            candidates = self._candidates(predicate)
+            counts = self._counts[candidates]
+            candidates, counts = candidates[counts > 0], counts[counts > 0]
+            if k is not None and k < len(candidates):
+                top = np.argpartition(-counts, k - 1)[:k]
+                candidates, counts = candidates[top], counts[top]
+            ranked = sorted(zip(counts.tolist(), candidates.tolist()), key=lambda item: (-item[0], self._keys[item[1]]))
+            return [(self._keys[column], count) for count, column in ranked]
+
+    def associations(self, key, k: int = 20, predicate=None, min_count: int = DEFAULT_MIN_COUNT,
+                     order: str = 'lift') -> list:
+        """
+        열 키와 함께 쓰인 열 키들을 연관도 순서로 반환합니다.
+        신뢰도는 key가 있는 행 중 함께 있는 비율, 향상도(lift)는 신뢰도를 전체에서 그 태그가 나오는 비율로 나눈 값으로
+        1보다 크면 key와 함께 있을 때 더 자주 쓰인다는 뜻입니다.
+
+        Args:
+            order (str): 'lift'면 향상도, 'count'면 함께 쓰인 횟수가 큰 순서
+
+        Returns:
+            list: [(열 키, 함께 쓰인 수, 신뢰도, 향상도), ...]
+        """
+        with self._lock:
+            column = self._columns.get(key)
+            if column is None or not self._counts[column]:
+                return []
+            together = self._cooccurrence(column)
+            candidates = self._candidates(predicate)
+            candidates = candidates[(candidates != column) & (together[candidates] >= max(min_count, 1))]
+            if not len(candidates):
+                return []
+            hits = together[candidates]
+            confidence = hits / self._counts[column]
+            lift = confidence * len(self._slots) / self._counts[candidates]
+            primary = lift if order == 'lift' else hits
+            secondary = hits if order == 'lift' else lift
+            ranked = np.lexsort((-secondary, -primary))[:k]
+            return [(self._keys[candidates[i]], int(hits[i]), float(confidence[i]), float(lift[i]))
+                    for i in ranked]
+
+
+class TagAnalytics:
+    """
+    라이브러리 전체의 태그 통계입니다.
+    prompts는 인덱싱된 모든 이미지의 프롬프트 태그('lora:이름' 포함), classifications는 분류된 즐겨찾기의
+    (카테고리, 태그) 행렬이며, 프롬프트 인덱스와 분류 결과가 저장될 때 바뀐 이미지만 반영됩니다.
+    """
+
+    def __init__(self):
+        self.prompts = TagMatrix()
+        self.classifications = TagMatrix()
+        self._cached_categories = {} # tag_categories 캐시 (지시문이 바뀌기 전에 분류된 것도 참고용으로 씀)
+        self._category_of = {}
+        self._category_version = -1
+
+    def load(self, conn=None):
+        """DB의 prompt_tags, image_tags, tag_categories에서 행렬을 만듭니다."""
+        conn = conn or get_db_connection()
+        self._load_rows(self.prompts, conn.execute(
+            "SELECT image_path, tag FROM prompt_tags ORDER BY image_path"))
+        self._load_rows(self.classifications, (
+            (image_path, (category, name)) for image_path, category, name in conn.execute(
+                "SELECT f.image_path, it.category, t.name FROM image_tags it "
+                "JOIN favorites f ON f.id = it.favorite_id JOIN tags t ON t.id = it.tag_id "
+                "ORDER BY it.favorite_id")))
+        self._cached_categories = dict(conn.execute("SELECT tag, category FROM tag_categories").fetchall())
+        self._category_version = -1
+        return self
+
+    @staticmethod
+    def _load_rows(matrix, rows):
+        grouped = ((row_key, [key for _, key in group])
+                   for row_key, group in itertools.groupby(rows, key=lambda row: row[0]))
+        while True:
+            batch = list(itertools.islice(grouped, LOAD_BATCH))
+            if not batch:
+                break
+            matrix.update(batch)
+
+    def category_of(self, tag: str):
+        """
+        태그의 카테고리. 분류 결과에서 가장 많이 분류된 카테고리를 쓰고,
+        분류된 적이 없으면 태그 분류 캐시를 씁니다. LoRA는 LORA_CATEGORY, 모르면 None.
+        """
+        if tag.startswith(LORA_PREFIX):
+            return LORA_CATEGORY
+        matrix = self.classifications
+        if self._category_version != matrix.version:
+            best = {}
+            for (category, name), count in matrix.top_k():
+                best.setdefault(name, category) # 많은 순서이므로 처음 나온 카테고리가 가장 많음
+            self._category_of = best
+            self._category_version = matrix.version
+        return self._category_of.get(tag) or self._cached_categories.get(tag)
+
+    def _category_filter(self, category):
+        if category is None:
+            return None
+        if category == LORA_CATEGORY:
+            return lambda tag: tag.startswith(LORA_PREFIX)
+        return lambda tag: self.category_of(tag) == category
+
+    def top_tags(self, category: str = None, k: int = 20, classified_only: bool = False) -> list:
+        """
+        가장 많이 쓰인 태그를 [(태그, 이미지 수), ...]로 반환합니다.
+        classified_only면 분류된 즐겨찾기에서 그 카테고리로 분류된 횟수를 세고,
+        아니면 인덱싱된 모든 이미지의 프롬프트에서 category_of로 카테고리를 정해 셉니다.
+        """
+        if classified_only:
+            predicate = None if category is None else (lambda key: key[0] == category)
+            counts = {}
+            for (_, name), count in self.classifications.top_k(predicate=predicate):
+                counts[name] = max(counts.get(name, 0), count)
+            return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return self.prompts.top_k(k, self._category_filter(category))
+
+    def associations(self, tag: str, category: str = None, k: int = 20, min_count: int = DEFAULT_MIN_COUNT,
+                     order: str = 'lift') -> list:
+        """
+        인덱싱된 모든 이미지에서 태그와 함께 쓰인 태그를 [(태그, 함께 쓰인 수, 신뢰도, 향상도), ...]로 반환합니다.
+        category를 주면 그 카테고리의 태그만 보여줍니다. (예: 피사체 태그와 함께 쓰인 LoRA)
+        """
+        return self.prompts.associations(tag, k=k, predicate=self._category_filter(category),
+                                         min_count=min_count, order=order)
+
+    def summary(self) -> dict:
+        return {
+            "images": len(self.prompts),
+            "tags": self.prompts.column_count(),
+            "classified": len(self.classifications),
+        }
+
+
+_shared_analytics = None
+_shared_analytics_lock = threading.Lock()
+
+def get_tag_analytics(reload: bool = False) -> TagAnalytics:
+    """
+    앱 전체에서 공유하는 태그 통계를 반환합니다. 처음 호출할 때(또는 reload면) DB에서 불러옵니다.
+    불러오는 데 시간이 걸리므로 GUI에서는 별도 스레드에서 호출합니다.
+    """
+    global _shared_analytics
+    with _shared_analytics_lock:
+        if _shared_analytics is None or reload:
+            _shared_analytics = TagAnalytics().load()
+        return _shared_analytics
+
+
+def reset_tag_analytics():
+    """불러온 통계를 버립니다. 다음 get_tag_analytics에서 다시 불러옵니다. (태그 인덱스를 다시 만들었을 때)"""
+    global _shared_analytics
+    _shared_analytics = None
+
+
+def update_prompt_tags(rows):
+    """(이미지 경로, 태그 목록)들을 불러온 통계에 반영합니다. 아직 불러오지 않았으면 아무 작업도 하지 않습니다."""
+    analytics = _shared_analytics
+    if analytics is not None:
+        analytics.prompts.update(rows)
+
+
+def remove_prompt_tags(image_paths):
+    analytics = _shared_analytics
+    if analytics is not None:
+        analytics.prompts.remove(image_paths)
+
+
+def update_classifications(rows):
+    """(이미지 경로, [(카테고리, 태그), ...])들을 불러온 통계에 반영합니다."""
+    analytics = _shared_analytics
+    if analytics is not None:
+        analytics.classifications.update(rows)
+
+
+def remove_classifications(image_paths):
+    analytics = _shared_analytics
+    if analytics is not None:
+        analytics.classifications.remove(image_paths)
@@ -0,0 +1,561 @@
+# src/prompt_classifier/bulk_io.py
+
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet 형식만 쓸 수 없고 JSONL/CSV는 그대로 동작
+    pa = None
+    pq = None
+
+from src.prompt_classifier.analytics import remove_classifications, update_classifications
+from src.prompt_classifier.db_manager import BULK_CHUNK, get_db_connection, write_classification
+from src.prompt_classifier.tag_utils import extract_tags
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+FLUSH_ROWS = 500             # JSONL/CSV를 이만큼 쓸 때마다 디스크로 내보냄 (중단 시 잃는 양의 상한)
+PARQUET_ROW_GROUP = 10_000   # Parquet 행 그룹 하나에 모을 행 수 (메모리에 들고 있는 행 수의 상한)
+IMPORT_BATCH = 2000          # 가져오기에서 한 트랜잭션으로 기록할 행 수
+ON_CONFLICT = ('skip', 'replace', 'newer') # DB에 같은 image_path가 있을 때: 그대로 둠 / 덮어씀 / 더 새 것이면 덮어씀
+
+PROMPT_FIELDS = ('image_path', 'positive_prompt', 'negative_prompt', 'parameters')
+PROMPT_DB_FIELDS = PROMPT_FIELDS + ('file_size', 'file_mtime') # 가져온 뒤 변경 없는 파일을 다시 읽지 않도록 함께 내보냄
+FAVORITE_FIELDS = ('image_path', 'full_prompt', 'favorited_at', 'classified_at', 'classification')
+CLASSIFICATION_FIELDS = ('image_path', 'classified_at', 'category', 'position', 'tag')
+FIELD_TYPES = {'file_size': 'int', 'file_mtime': 'int', 'position': 'int'} # 문자열이 아닌 열 (CSV는 읽을 때 변환)
+
+
+def detect_format(path: str, fmt: str = None) -> str:
+    """fmt를 주지 않으면 확장자로 형식을 정합니다. 알 수 없으면 ValueError."""
+    if fmt is None:
+        fmt = os.path.splitext(path)[1].lower().lstrip('.')
+        fmt = 'jsonl' if fmt in ('ndjson', 'json') else fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"알 수 없는 형식입니다: '{fmt}' (지원 형식: {', '.join(FORMATS)})")
+    if fmt == 'parquet' and pa is None:
+        raise ValueError("Parquet 형식을 쓰려면 pyarrow를 설치하세요. (pip install pyarrow)")
+    return fmt
+
+
+def _to_text(value):
+    """CSV/Parquet 문자열 열에 넣을 수 있도록 dict/list는 JSON 문자열로 바꿉니다."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _truncate_partial_line(path: str):
+    """이전 실행이 줄 중간에서 끊겼으면 마지막 줄바꿈 뒤의 내용을 잘라 냅니다."""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            position = start
+        else:
+            keep = 0
+        if keep != end:
+            f.truncate(keep)
+
+
+class RowWriter:
+    """행(dict)을 하나씩 받아 파일에 바로 써 나가는 기록기의 공통 부분입니다. with 문으로 사용합니다."""
+
+    def __init__(self, path: str, fieldnames, append: bool = False):
+        self.path = path
+        self.fieldnames = tuple(fieldnames)
+        self.append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self.count = 0
+
+    def write(self, row: dict):
+        raise NotImplementedError
+
+    def write_many(self, rows) -> int:
+        for row in rows:
+            self.write(row)
+        return self.count
+
+    def close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlWriter(RowWriter):
+    """한 줄에 JSON 객체 하나씩 씁니다. 분류 결과 같은 dict 값도 그대로 남습니다."""
+
+    def __init__(self, path, fieldnames, append=False):
+        super().__init__(path, fieldnames, append)
+        if self.append:
+            _truncate_partial_line(path)
+        self._file = open(path, 'a' if self.append else 'w', encoding='utf-8', newline='\n')
+
+    def write(self, row):
+        self._file.write(json.dumps({key: row.get(key) for key in self.fieldnames}, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
+        if self.count % FLUSH_ROWS == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvWriter(RowWriter):
+    """헤더가 있는 CSV로 씁니다. 이어 쓸 때는 헤더를 다시 쓰지 않습니다."""
+
+    def __init__(self, path, fieldnames, append=False):
+        super().__init__(path, fieldnames, append)
+        if self.append:
+            _truncate_partial_line(path)
+        # Excel에서 한글이 깨지지 않도록 새 파일에는 BOM을 붙임
+        self._file = open(path, 'a' if self.append else 'w', encoding='utf-8' if self.append else 'utf-8-sig',
+                          newline='')
+        self._writer = csv.writer(self._file)
+        if not self.append:
+            self._writer.writerow(self.fieldnames)
+
+    def write(self, row):
+        self._writer.writerow([_to_text(row.get(key)) for key in self.fieldnames])
+        self.count += 1
+        if self.count % FLUSH_ROWS == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter(RowWriter):
+    """
+    PARQUET_ROW_GROUP 행씩 모아 행 그룹 단위로 씁니다. 열은 types에 없으면 문자열입니다.
+    Parquet 파일은 끝에 메타데이터가 있어 이어 쓸 수 없으므로 append는 지원하지 않습니다.
+    """
+    TYPES = {'int': 'int64', 'float': 'float64', 'str': 'string'}
+
+    def __init__(self, path, fieldnames, append=False, types=None):
+        super().__init__(path, fieldnames, append)
+        if self.append:
+            raise ValueError("Parquet 파일에는 이어 쓸 수 없습니다. JSONL이나 CSV를 사용하세요.")
+        types = types or {}
+        self.schema = pa.schema([(key, getattr(pa, self.TYPES[types.get(key, 'str')])())
+                                 for key in self.fieldnames])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._columns = {key: [] for key in self.fieldnames}
+        self._pending = 0
+
+    def write(self, row):
+        for key in self.fieldnames:
+            self._columns[key].append(_to_text(row.get(key)))
+        self._pending += 1
+        self.count += 1
+        if self._pending >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._writer.write_table(pa.Table.from_pydict(self._columns, schema=self.schema))
+            self._columns = {key: [] for key in self.fieldnames}
+            self._pending = 0
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+WRITERS = {
+    'jsonl': JsonlWriter,
+    'csv': CsvWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def open_writer(path: str, fieldnames, fmt: str = None, append: bool = False, types=None) -> RowWriter:
+    """
+    형식에 맞는 행 기록기를 엽니다.
+
+    Args:
+        fmt (str): 'jsonl', 'csv', 'parquet'. 없으면 확장자로 정함
+        append (bool): 기존 파일 뒤에 이어 씀 (JSONL/CSV만)
+        types (dict): Parquet 열 형식 {열 이름: 'int' | 'float' | 'str'}
+    """
+    fmt = detect_format(path, fmt)
+    if fmt == 'parquet':
+        return ParquetWriter(path, fieldnames, append, types)
+    return WRITERS[fmt](path, fieldnames, append)
+
+
+def read_written_keys(path: str, key: str, fmt: str = None) -> set:
+    """
+    이미 써 둔 파일에서 key 열의 값들을 모읍니다. (중단된 출력을 이어서 쓸 때 건너뛸 항목)
+    파일이 없으면 빈 집합을 반환하며, 끊겨서 읽을 수 없는 마지막 줄은 무시합니다.
+    """
+    fmt = detect_format(path, fmt)
+    if not os.path.exists(path):
+        return set()
+    keys = set()
+    if fmt == 'jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    keys.add(json.loads(line)[key])
+                except (ValueError, KeyError, TypeError):
+                    continue
+    elif fmt == 'csv':
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            keys.update(row[key] for row in csv.DictReader(f) if row.get(key))
+    else:
+        keys.update(pq.read_table(path, columns=[key]).column(key).to_pylist())
+    return keys
+
+
+def iter_prompts(conn=None):
+    """prompts 인덱스의 행을 PROMPT_DB_FIELDS 키의 dict로 하나씩 내보냅니다. (전체를 메모리에 올리지 않음)"""
+    conn = conn or get_db_connection()
+    for row in conn.execute("SELECT image_path, positive_prompt, negative_prompt, parameters, file_size, file_mtime "
+                            "FROM prompts ORDER BY image_path"):
+        yield dict(row)
+
+
+def iter_favorites(conn=None):
+    """
+    즐겨찾기를 추가한 순서로 FAVORITE_FIELDS 키의 dict로 하나씩 내보냅니다.
+    classification은 {카테고리: [태그, ...]}이며 아직 분류되지 않았으면 None입니다.
+    분류 태그 행을 즐겨찾기 순서로 한 번에 읽으면서 이미지가 바뀔 때마다 묶어 내보냅니다.
+    """
+    conn = conn or get_db_connection()
+    cursor = conn.execute(
+        "SELECT f.image_path, f.full_prompt, f.favorited_at, f.classified_at, it.category, it.tag_text "
+        "FROM favorites f LEFT JOIN image_tags it ON it.favorite_id = f.id "
+        "ORDER BY f.id, it.category, it.position")
+    current = None
+    for image_path, full_prompt, favorited_at, classified_at, category, tag_text in cursor:
+        if current is None or current['image_path'] != image_path:
+            if current is not None:
+                yield current
+            current = {"image_path": image_path, "full_prompt": full_prompt, "favorited_at": favorited_at,
+                       "classified_at": classified_at, "classification": {} if classified_at else None}
+        if category is not None and current['classification'] is not None:
+            current['classification'].setdefault(category, []).append(tag_text)
+    if current is not None:
+        yield current
+
+
+def iter_classifications(conn=None):
+    """
+    분류 결과를 태그 하나당 한 행(CLASSIFICATION_FIELDS)으로 내보냅니다. 표 계산 프로그램이나 pandas에서 집계하기 쉬운 형태입니다.
+    태그가 하나도 없는 분류 결과는 행이 없으므로 빠집니다.
+    """
+    conn = conn or get_db_connection()
+    cursor = conn.execute(
+        "SELECT f.image_path, f.classified_at, it.category, it.position, it.tag_text "
+        "FROM image_tags it JOIN favorites f ON f.id = it.favorite_id "
+        "ORDER BY it.favorite_id, it.category, it.position")
+    for image_path, classified_at, category, position, tag_text in cursor:
+        yield {"image_path": image_path, "classified_at": classified_at, "category": category,
+               "position": position, "tag": tag_text}
+
+
+def iter_rows(path: str, fmt: str = None):
+    """
+    open_writer로 쓴 파일을 dict로 한 행씩 읽습니다. Parquet은 행 그룹 단위로 읽으므로 파일 크기와 상관없이 메모리가 일정합니다.
+    CSV의 빈 칸은 None으로, FIELD_TYPES의 열은 숫자로 바꿉니다. 끊겨서 읽을 수 없는 JSONL 줄은 건너뜁니다.
+    """
+    fmt = detect_format(path, fmt)
+    if fmt == 'jsonl':
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"{os.path.basename(path)} {number}번째 줄을 읽을 수 없어 건너뜁니다.")
+    elif fmt == 'csv':
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield {key: None if value == '' else int(value) if FIELD_TYPES.get(key) == 'int' else value
+                       for key, value in row.items()}
+    else:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_ROW_GROUP):
+            yield from batch.to_pylist()
+
+
+def detect_table(path: str, fmt: str = None) -> str:
+    """파일의 첫 행에 있는 열로 어떤 표를 내보낸 파일인지 정합니다. 알 수 없으면 ValueError."""
+    for row in iter_rows(path, fmt):
+        if 'category' in row:
+            return 'classifications'
+        if 'full_prompt' in row:
+            return 'favorites'
+        if 'positive_prompt' in row:
+            return 'prompts'
+        break
+    raise ValueError(f"'{path}'에서 favorites/prompts/classifications 중 어떤 내용인지 알 수 없습니다. --table을 지정하세요.")
+
+
+def parse_remap(spec: str):
+    """'이전 경로=새 경로'를 (이전 경로, 새 경로)로 나눕니다."""
+    old, sep, new = spec.partition('=')
+    if not sep or not old:
+        raise ValueError(f"경로 바꾸기는 '이전 경로=새 경로' 형식이어야 합니다: '{spec}'")
+    return old, new
+
+
+def remap_path(path: str, remaps) -> str:
+    """
+    경로가 remaps의 이전 경로로 시작하면 새 경로로 바꿉니다. 먼저 맞는 것 하나만 적용합니다.
+    이전 경로는 폴더 경계에서만 맞춰 보며('D:/out'은 'D:/outputs'에 맞지 않음),
+    나머지 부분의 구분자는 새 경로의 구분자로 바꿉니다. (Windows <-> Linux로 옮길 때)
+    """
+    for old, new in remaps:
+        if not path.startswith(old):
+            continue
+        rest = path[len(old):]
+        if rest and not old.endswith(('/', '\\')) and rest[0] not in '/\\':
+            continue
+        sep = '\\' if '\\' in new and '/' not in new else '/' if '/' in new else os.sep
+        return new + rest.replace('\\' if sep == '/' else '/', sep)
+    return path
+
+
+def _batches(rows, size=IMPORT_BATCH):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _existing(conn, sql, paths) -> dict:
+    """sql('SELECT image_path, 값 ... WHERE image_path IN ({})')로 이미 있는 경로의 {경로: 값}을 구합니다."""
+    found = {}
+    for start in range(0, len(paths), BULK_CHUNK):
+        chunk = paths[start:start + BULK_CHUNK]
+        found.update(conn.execute(sql.format(', '.join('?' * len(chunk))), chunk).fetchall())
+    return found
+
+
+def _is_newer(incoming, current) -> bool:
+    """비교 값(분류 시각, mtime)이 DB에 있는 것보다 새로운지. 없는 값은 가장 오래된 것으로 봅니다."""
+    return incoming is not None and (current is None or incoming > current)
+
+
+def _plan(conn, batch, existing_sql, on_conflict, stats):
+    """
+    배치에서 기록할 항목을 고릅니다. 같은 image_path가 배치 안에 여러 번 있으면 마지막 것을 씁니다.
+
+    Returns:
+        list: [(항목, DB에 이미 있었는지), ...]
+    """
+    items = {item['image_path']: item for item in batch}
+    existing = _existing(conn, existing_sql, list(items))
+    planned = []
+    for image_path, item in items.items():
+        existed = image_path in existing
+        if existed:
+            if on_conflict == 'skip' or (on_conflict == 'newer' and not _is_newer(item['compare'], existing[image_path])):
+                stats['skipped'] += 1
+                continue
+            stats['updated'] += 1
+        else:
+            stats['inserted'] += 1
+        planned.append((item, existed))
+    stats['skipped'] += len(batch) - len(items)
+    return planned
+
+
+def _import(rows, prepare, existing_sql, write, on_conflict, remaps, progress_callback, conn):
+    """
+    가져오기의 공통 흐름: 경로를 바꾸고 IMPORT_BATCH 행씩 기록할 항목을 골라 한 트랜잭션으로 기록합니다.
+    prepare는 행들을 {'image_path', 'compare'(newer 비교 값), 'row'} 항목으로 바꾸며 쓸 수 없는 행은 None으로 냅니다.
+    """
+    if on_conflict not in ON_CONFLICT:
+        raise ValueError(f"알 수 없는 충돌 처리 방식입니다: '{on_conflict}' ({', '.join(ON_CONFLICT)})")
+    conn = conn or get_db_connection()
+    stats = {'inserted': 0, 'updated': 0, 'skipped': 0}
+    done = 0
+    for batch in _batches(prepare(rows, remaps)):
+        planned = _plan(conn, [row for row in batch if row], existing_sql, on_conflict, stats)
+        stats['skipped'] += sum(1 for row in batch if not row)
+        if planned:
+            # 기록하지 못한 항목 수 (분류 결과를 넣을 즐겨찾기가 없는 경우)
+            missing = write(conn, planned) or 0
+            stats['inserted'] -= missing
+            stats['skipped'] += missing
+        done += len(batch)
+        if progress_callback:
+            progress_callback(done)
+    return stats
+
+
+def _remapped(row, remaps):
+    image_path = row.get('image_path')
+    if not image_path:
+        return None # image_path가 없는 행은 건너뜀
+    return dict(row, image_path=remap_path(image_path, remaps) if remaps else image_path)
+
+
+def _prepare_prompts(rows, remaps):
+    for row in rows:
+        row = _remapped(row, remaps)
+        yield row and {'image_path': row['image_path'], 'compare': row.get('file_mtime'), 'row': row}
+
+
+def _prompt_writer(executor):
+    """태그를 프로세스 풀에서 파싱해 prompts 인덱스에 기록하는 함수를 만듭니다."""
+    from src.prompt_classifier.prompt_index import write_prompt_rows
+
+    def write(conn, planned):
+        rows = [item['row'] for item, _ in planned]
+        # 태그는 프롬프트 인덱스와 같은 방식으로 다시 파싱하므로 파일에 태그 열이 없어도 됨
+        tags = executor.map(extract_tags, [row.get('positive_prompt') for row in rows], chunksize=64)
+        write_prompt_rows(conn, [
+            (row['image_path'], row.get('positive_prompt'), row.get('negative_prompt'), row.get('parameters'),
+             row.get('file_size'), row.get('file_mtime'), row_tags)
+            for row, row_tags in zip(rows, tags)])
+    return write
+
+
+def import_prompts(rows, on_conflict: str = 'skip', remaps=(), progress_callback=None, conn=None,
+                   max_workers=None) -> dict:
+    """
+    PROMPT_DB_FIELDS 행들을 prompts 인덱스로 가져옵니다. 태그 인덱스와 중복 검사용 서명도 함께 만듭니다.
+    on_conflict='newer'면 file_mtime이 더 새로운 행만 덮어씁니다.
+
+    Returns:
+        dict: {'inserted': 새로 추가, 'updated': 덮어씀, 'skipped': 건너뜀}
+    """
+    # 태그 파싱이 가장 오래 걸리므로 index_images처럼 프로세스 풀에서 병렬로 함 (배치 단위라 메모리는 일정)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        return _import(rows, _prepare_prompts, "SELECT image_path, file_mtime FROM prompts WHERE image_path IN ({})",
+                       _prompt_writer(executor), on_conflict, remaps, progress_callback, conn)
+
+
+def _decode_classification(value):
+    """CSV/Parquet에서 문자열로 저장된 분류 결과를 dict로 되돌립니다."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def _prepare_favorites(rows, remaps):
+    for row in rows:
+        row = _remapped(row, remaps)
+        if row is not None:
+            row['classification'] = _decode_classification(row.get('classification'))
+        yield row and {'image_path': row['image_path'], 'compare': row.get('classified_at'), 'row': row}
+
+
+FAVORITE_UPSERT_SQL = """
+INSERT INTO favorites (image_path, full_prompt, favorited_at) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+ON CONFLICT(image_path) DO UPDATE SET
+    full_prompt = excluded.full_prompt,
+    favorited_at = excluded.favorited_at
+"""
+
+def _clear_classification(conn, image_paths):
+    conn.executemany("DELETE FROM image_tags WHERE favorite_id = (SELECT id FROM favorites WHERE image_path = ?)",
+                     [(image_path,) for image_path in image_paths])
+    conn.executemany("UPDATE favorites SET classified_at = NULL WHERE image_path = ?",
+                     [(image_path,) for image_path in image_paths])
+
+
+def _write_favorites(conn, planned):
+    rows = [item['row'] for item, _ in planned]
+    # 덮어쓰는 즐겨찾기의 분류 결과는 가져온 파일의 것으로 바꿈 (파일에서 미분류면 미분류로)
+    cleared = [item['image_path'] for item, existed in planned if existed and item['row']['classification'] is None]
+    analytics_updates = []
+    with conn:
+        conn.executemany(FAVORITE_UPSERT_SQL, [(row['image_path'], row.get('full_prompt'), row.get('favorited_at'))
+                                               for row in rows])
+        _clear_classification(conn, cleared)
+        for row in rows:
+            if row['classification'] is not None:
+                write_classification(conn, row['image_path'], row['classification'],
+                                     classified_at=row.get('classified_at'), analytics_updates=analytics_updates)
+    # 태그 통계는 커밋된 뒤에만 반영
+    remove_classifications(cleared)
+    update_classifications(analytics_updates)
+
+
+def import_favorites(rows, on_conflict: str = 'skip', remaps=(), progress_callback=None, conn=None) -> dict:
+    """
+    FAVORITE_FIELDS 행들을 즐겨찾기로 가져옵니다. 분류 결과가 있으면 태그 행으로 함께 저장합니다.
+    on_conflict='newer'면 분류 시각(classified_at)이 더 새로운 행만 덮어씁니다.
+
+    Returns:
+        dict: {'inserted': 새로 추가, 'updated': 덮어씀, 'skipped': 건너뜀}
+    """
+    return _import(rows, _prepare_favorites,
+                   "SELECT image_path, COALESCE(classified_at, '') FROM favorites WHERE image_path IN ({})",
+                   _write_favorites, on_conflict, remaps, progress_callback, conn)
+
+
+def _prepare_classifications(rows, remaps):
+    """태그 행들을 이미지별 분류 결과 하나로 묶습니다. (iter_classifications처럼 이미지별로 이어진 행이어야 함)"""
+    current = None
+    for row in rows:
+        row = _remapped(row, remaps)
+        if row is None or not row.get('category') or row.get('tag') is None:
+            yield None
+            continue
+        if current is not None and current['image_path'] != row['image_path']:
+            yield current
+            current = None
+        if current is None:
+            current = {'image_path': row['image_path'], 'compare': row.get('classified_at'),
+                       'row': {'classified_at': row.get('classified_at'), 'classification': {}}}
+        current['row']['classification'].setdefault(row['category'], []).append((row.get('position') or 0, row['tag']))
+    if current is not None:
+        yield current
+
+
+def _write_classifications(conn, planned) -> int:
+    missing = 0
+    analytics_updates = []
+    with conn:
+        for item, _ in planned:
+            classification = {category: [tag for _, tag in sorted(tags, key=lambda tag: tag[0])]
+                              for category, tags in item['row']['classification'].items()}
+            missing += not write_classification(conn, item['image_path'], classification,
+                                                classified_at=item['row']['classified_at'],
+                                                analytics_updates=analytics_updates)
+    update_classifications(analytics_updates) # 태그 통계는 커밋된 뒤에만 반영
+    return missing
+
+
+def import_classifications(rows, on_conflict: str = 'skip', remaps=(), progress_callback=None, conn=None) -> dict:
+    """
+    CLASSIFICATION_FIELDS 행들을 이미 있는 즐겨찾기의 분류 결과로 가져옵니다. 즐겨찾기에 없는 이미지는 건너뜁니다.
+    on_conflict='skip'이면 아직 분류되지 않은 즐겨찾기에만, 'newer'면 분류 시각이 더 새로울 때만 씁니다.
+
+    Returns:
+        dict: {'inserted': 미분류였던 즐겨찾기에 씀, 'updated': 덮어씀, 'skipped': 건너뜀}
+    """
+    # 즐겨찾기가 있어도 분류되지 않았으면 '없는' 것으로 보아 skip에서도 씀
+    return _import(rows, _prepare_classifications,
+                   "SELECT image_path, classified_at FROM favorites WHERE classified_at IS NOT NULL "
+                   "AND image_path IN ({})",
+                   _write_classifications, on_conflict, remaps, progress_callback, conn)
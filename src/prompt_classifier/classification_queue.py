@@ -0,0 +1,325 @@
+# src/prompt_classifier/classification_queue.py
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.prompt_classifier import dedup, tag_cache
+from src.prompt_classifier.analytics import update_classifications
+from src.prompt_classifier.classifier_backends import assemble_result
+from src.prompt_classifier.db_manager import get_db_connection, write_classification
+from src.prompt_classifier.gemini_classifier import (CATEGORIES, DEFAULT_MODEL, INSTRUCTION_PROMPT,
+                                                     classify_prompt_async, estimate_tokens, get_service)
+from src.prompt_classifier.tag_utils import normalize_tag, split_tags
+
+# Gemini 1.5 Flash 무료 등급 기준 할당량. 유료 등급이면 생성자 인자로 높여서 사용
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+MAX_RETRIES = 5
+BACKOFF_BASE_SEC = 2.0
+BACKOFF_MAX_SEC = 120.0
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+UPSERT_JOB_SQL = """
+INSERT INTO classification_jobs (image_path, prompt) VALUES (?, ?)
+ON CONFLICT(image_path) DO UPDATE SET
+    prompt = excluded.prompt,
+    status = 'pending',
+    attempts = 0,
+    last_error = NULL,
+    updated_at = CURRENT_TIMESTAMP
+WHERE classification_jobs.status != 'running'
+"""
+
+
+def enqueue_jobs(items) -> int:
+    """
+    (이미지 경로, 프롬프트) 목록을 분류 작업으로 등록합니다. 이미 있는 작업은 대기 상태로 되돌립니다.
+
+    Returns:
+        int: 등록된 작업 수
+    """
+    items = [(image_path, prompt) for image_path, prompt in items if prompt]
+    conn = get_db_connection()
+    with conn:
+        conn.executemany(UPSERT_JOB_SQL, items)
+    return len(items)
+
+
+def reset_interrupted_jobs() -> int:
+    """이전 실행이 중단되어 'running'으로 남은 작업을 대기 상태로 되돌리고 그 수를 반환합니다."""
+    conn = get_db_connection()
+    with conn:
+        return conn.execute(
+            "UPDATE classification_jobs SET status = 'pending', updated_at = CURRENT_TIMESTAMP "
+            "WHERE status = 'running'").rowcount
+
+
+def load_pending_jobs(image_paths=None) -> list:
+    """대기 중인 작업을 [(이미지 경로, 프롬프트, 시도 횟수), ...]로 반환합니다. image_paths를 주면 그 작업만."""
+    conn = get_db_connection()
+    rows = conn.execute("SELECT image_path, prompt, attempts FROM classification_jobs "
+                        "WHERE status = 'pending' ORDER BY id").fetchall()
+    wanted = None if image_paths is None else set(image_paths)
+    return [(row['image_path'], row['prompt'], row['attempts']) for row in rows
+            if wanted is None or row['image_path'] in wanted]
+
+
+def count_jobs() -> dict:
+    """상태별 작업 수를 반환합니다."""
+    conn = get_db_connection()
+    return {row['status']: row['n'] for row in conn.execute(
+        "SELECT status, COUNT(*) AS n FROM classification_jobs GROUP BY status")}
+
+
+def _set_job_status(image_path, status, attempts=None, last_error=None):
+    conn = get_db_connection()
+    with conn:
+        conn.execute(
+            "UPDATE classification_jobs SET status = ?, attempts = COALESCE(?, attempts), "
+            "last_error = ?, updated_at = CURRENT_TIMESTAMP WHERE image_path = ?",
+            (status, attempts, last_error, image_path))
+
+
+def _complete_job(image_path, result):
+    """분류 결과를 즐겨찾기에 저장하고 작업을 완료 상태로 바꿉니다."""
+    # 결과 저장과 작업 상태 변경을 한 트랜잭션으로 묶어 작업당 커밋을 한 번만 함
+    conn = get_db_connection()
+    analytics_updates = []
+    with conn:
+        write_classification(conn, image_path, result, analytics_updates=analytics_updates)
+        conn.execute("UPDATE classification_jobs SET status = 'done', last_error = NULL, "
+                     "updated_at = CURRENT_TIMESTAMP WHERE image_path = ?", (image_path,))
+    update_classifications(analytics_updates)
+
+
+def is_retryable(error) -> bool:
+    """429(할당량 초과), 5xx, 시간 초과, 잘못된 응답 형식이면 다시 시도할 가치가 있는 오류로 봅니다."""
+    if isinstance(error, (ValueError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, 'code', None)
+    try:
+        return int(code) in RETRYABLE_STATUS
+    except (TypeError, ValueError):
+        return False
+
+
+def backoff_delay(attempt: int) -> float:
+    """지수 백오프 대기 시간(초)을 계산합니다. 여러 작업이 동시에 깨어나지 않도록 지터를 섞습니다."""
+    delay = min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class TokenBucket:
+    """분당 허용량을 초 단위로 채워 넣는 토큰 버킷입니다. asyncio 루프 하나에서만 사용합니다."""
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """amount만큼 토큰이 찰 때까지 기다렸다가 꺼냅니다."""
+        amount = min(amount, self.capacity)
+        async with self._lock: # 먼저 기다린 작업이 먼저 토큰을 받도록 순서를 지킴
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def drain(self):
+        """할당량 초과 응답을 받았을 때 남은 토큰을 비워 다른 작업도 잠시 쉬게 합니다."""
+        self._refill()
+        self.tokens = 0
+
+
+class ClassificationQueue:
+    """
+    DB의 분류 작업을 asyncio로 동시에 처리합니다.
+    동시 요청 수는 concurrency로, 분당 요청/토큰 수는 토큰 버킷으로 제한하고
+    429/5xx 오류는 지수 백오프로 재시도합니다.
+
+    local 백엔드를 주면 먼저 로컬에서 분류하고, 확신도가 낮은 태그만 API로 보냅니다.
+    같은 프롬프트의 재생성처럼 중복 묶음에 속한 작업은 하나만 분류하고 그 결과를 나머지에 적용합니다.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries: int = MAX_RETRIES, model_name: str = DEFAULT_MODEL,
+                 local=None, threshold: float = 0.6):
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.model_name = model_name
+        self.local = local
+        self.threshold = threshold
+        self.request_count = 0
+        self._loop = None
+        self._stop = None
+
+    def stop(self):
+        """다른 스레드에서 호출해도 됩니다. 진행 중인 요청이 끝나면 멈추고, 남은 작업은 대기 상태로 남습니다."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def run(self, image_paths=None, on_result=None, on_error=None, on_progress=None):
+        """
+        대기 중인 작업을 모두 처리할 때까지 실행합니다. (호출한 스레드에서 이벤트 루프를 돌림)
+
+        Args:
+            image_paths: 주면 해당 이미지의 작업만 처리
+            on_result (callable): (이미지 경로, 분류 결과 dict)
+            on_error (callable): (이미지 경로, 오류 메시지)
+            on_progress (callable): (처리한 수, 전체 수)
+
+        Returns:
+            tuple: (성공 수, 실패 수)
+        """
+        return asyncio.run(self._run(image_paths, on_result, on_error, on_progress))
+
+    async def _run(self, image_paths, on_result, on_error, on_progress):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        reset_interrupted_jobs()
+        jobs = load_pending_jobs(image_paths)
+        if not jobs:
+            return 0, 0
+
+        try:
+            self._service = get_service(self.model_name)
+        except ValueError as e:
+            for image_path, _, _ in jobs:
+                _set_job_status(image_path, 'failed', last_error=str(e))
+                if on_error:
+                    on_error(image_path, str(e))
+            return 0, len(jobs)
+
+        # REST 전송에서는 요청이 스레드에서 실행되므로 기본 스레드 풀(CPU 수에 비례)이 동시성을 제한하지 않도록 함
+        self._loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, self.concurrency)))
+        self._requests = TokenBucket(self.requests_per_minute)
+        self._tokens = TokenBucket(self.tokens_per_minute)
+        # 재생성처럼 같은 묶음에 속한 작업은 하나만 먼저 분류하고, 나머지는 그 결과를 재사용
+        queue = asyncio.Queue()
+        job_of = {job[0]: job for job in jobs}
+        for group in dedup.group_duplicates(job_of):
+            queue.put_nowait([job_of[image_path] for image_path in group])
+
+        counts = {"done": 0, "failed": 0, "reused": 0}
+        total = len(jobs)
+
+        def finish(image_path, result):
+            _complete_job(image_path, result)
+            counts["done"] += 1
+            if on_result:
+                on_result(image_path, result)
+            if on_progress:
+                on_progress(counts["done"] + counts["failed"], total)
+
+        async def worker():
+            while not self._stop.is_set():
+                try:
+                    group = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                (image_path, prompt, attempts), rest = group[0], group[1:]
+                _set_job_status(image_path, 'running')
+                try:
+                    result = await self._classify(prompt, attempts, image_path)
+                except asyncio.CancelledError:
+                    _set_job_status(image_path, 'pending')
+                    raise
+                except Exception as e:
+                    _set_job_status(image_path, 'failed', last_error=str(e))
+                    counts["failed"] += 1
+                    if on_error:
+                        on_error(image_path, str(e))
+                    if on_progress:
+                        on_progress(counts["done"] + counts["failed"], total)
+                    if rest:
+                        queue.put_nowait(rest) # 남은 작업 중 하나가 다시 대표가 됨
+                    continue
+                if result is None: # 중지 요청으로 기다리다 빠져나온 경우
+                    _set_job_status(image_path, 'pending')
+                    continue
+                finish(image_path, result)
+                uncovered = []
+                for job in rest:
+                    reused = dedup.reuse_classification(result, job[1])
+                    if reused is None:
+                        uncovered.append(job)
+                    else:
+                        counts["reused"] += 1
+                        finish(job[0], reused)
+                if uncovered:
+                    queue.put_nowait(uncovered) # 새 태그가 있는 유사 프롬프트끼리 다시 대표 하나를 분류
+
+        await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+        print(f"분류 큐 완료: 성공 {counts['done']}개 (중복 재사용 {counts['reused']}개), "
+              f"실패 {counts['failed']}개, API 요청 {self.request_count}회")
+        return counts["done"], counts["failed"]
+
+    async def _classify(self, prompt, attempts, image_path):
+        """로컬에서 분류할 수 있는 태그는 바로 정하고 나머지만 API로 분류합니다."""
+        raw_tags = split_tags(prompt)
+        normalized_of = {raw_tag: normalize_tag(raw_tag)[0] for raw_tag in raw_tags}
+        labels = {}
+        if self.local is not None:
+            labels = self.local.classify_tags({tag for tag in normalized_of.values() if tag})
+        uncertain = [raw_tag for raw_tag, tag in normalized_of.items()
+                     if tag and (tag not in labels or labels[tag][1] < self.threshold)]
+        if uncertain:
+            response = await self._request(", ".join(uncertain), attempts, image_path)
+            if response is None:
+                return None
+            learned = {}
+            for category in CATEGORIES:
+                for tag in response[category]:
+                    normalized = normalize_tag(tag)[0]
+                    if normalized:
+                        learned.setdefault(normalized, category)
+            tag_cache.store_categories(learned)
+            if self.local is not None:
+                self.local.learn({tag: (category, 1.0) for tag, category in learned.items()})
+            labels.update((tag, (category, 1.0)) for tag, category in learned.items())
+        return assemble_result(raw_tags, normalized_of, labels)
+
+    async def _request(self, text, attempts, image_path):
+        """토큰 버킷을 거쳐 API를 호출하고, 재시도할 수 있는 오류면 백오프 후 다시 시도합니다."""
+        # 응답은 입력 태그를 다시 나열하므로 입력의 두 배 정도로 잡음
+        cost = estimate_tokens(INSTRUCTION_PROMPT) + 2 * estimate_tokens(text)
+        while True:
+            await self._requests.acquire()
+            await self._tokens.acquire(cost)
+            if self._stop.is_set():
+                return None
+            self.request_count += 1
+            try:
+                return await classify_prompt_async(text, self._service)
+            except Exception as e:
+                attempts += 1
+                if not is_retryable(e) or attempts > self.max_retries:
+                    _set_job_status(image_path, 'failed', attempts=attempts, last_error=str(e))
+                    raise
+                _set_job_status(image_path, 'running', attempts=attempts, last_error=str(e))
+                if getattr(e, 'code', None) == 429:
+                    self._requests.drain()
+                delay = backoff_delay(attempts)
+                print(f"분류 재시도 {attempts}/{self.max_retries} ({delay:.1f}초 후): {e}")
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                    return None # 기다리는 중 중지 요청
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,302 @@
+# src/prompt_classifier/classifier_backends.py
+
+import re
+import zlib
+from collections import Counter, defaultdict
+
+try:
+    import numpy as np
+except ImportError: # 해싱 선형 모델 없이 사전/규칙만으로 동작
+    np = None
+
+from src.prompt_classifier import tag_cache
+from src.prompt_classifier.db_manager import get_db_connection
+from src.prompt_classifier.gemini_classifier import CATEGORIES, DEFAULT_MODEL
+from src.prompt_classifier.tag_utils import normalize_tag, split_tags
+
+CONFIDENCE_THRESHOLD = 0.6  # 이보다 확신도가 낮은 태그는 하이브리드 백엔드에서 Gemini로 보냄
+MIN_TRAINING_TAGS = 50      # 사전에 이만큼 태그가 모여야 해싱 모델을 학습
+HASH_FEATURES = 2 ** 17
+
+# (정규화된 태그 패턴, 카테고리, 확신도). 사전에 없는 태그에 순서대로 적용
+RULES = [
+    (re.compile(r'^(lora|lyco|hypernet):'), "technical_elements", 1.0),
+    (re.compile(r'^(masterpiece|best quality|(high|normal|low|worst) quality|absurdres|highres|'
+                r'ultra[- ]detailed|extremely detailed|\d+k( uhd)?|hdr|ray tracing|.* lighting)$'),
+     "quality_rendering", 0.9),
+    (re.compile(r'^(\d+\+?|multiple) ?(girl|boy|other)s?$|^(solo|solo focus)$'), "subject", 0.95),
+    (re.compile(r'^(by |artist:)|(^| )style$'), "style_artist", 0.85),
+    (re.compile(r'^looking (at|away|back|down|up)|^(sitting|standing|kneeling|lying|squatting)\b|'
+                r'^(on (back|stomach|side)|all fours|from (above|below|behind|side))$'), "pose_gaze", 0.85),
+    (re.compile(r' (hair|eyes|pupils|skin|breasts|ears|tail|horns|bangs|lips)$|^(hair|eyes) '),
+     "body_appearance", 0.8),
+    (re.compile(r' (dress|shirt|skirt|gloves|boots|hat|uniform|jacket|ribbon|earrings|necklace|'
+                r'thighhighs|pantyhose|swimsuit|bikini|kimono)$'), "clothing_accessories", 0.8),
+    (re.compile(r'^(outdoors|indoors|.* background|sky|night|day|sunset|city|forest|beach|room|bed)$'),
+     "background_props", 0.8),
+]
+
+
+class ClassifierBackend:
+    """
+    태그 분류 백엔드의 공통 인터페이스입니다.
+    하위 클래스는 classify_tags만 구현하면 되고, 프롬프트 단위 분류는 공통 구현을 사용합니다.
+    """
+    name = "base"
+
+    def classify_tags(self, normalized_tags) -> dict:
+        """정규화된 태그들을 분류해 {태그: (카테고리, 확신도)}를 반환합니다. 분류하지 못한 태그는 빠집니다."""
+        raise NotImplementedError
+
+    def classify_prompts(self, prompts: dict) -> dict:
+        """
+        여러 프롬프트를 분류합니다. 결과 형식은 classify_prompt_with_gemini와 같습니다.
+
+        Args:
+            prompts (dict): {항목 id: 프롬프트}
+
+        Returns:
+            dict: {항목 id: 9개 카테고리 분류 결과}
+        """
+        split, normalized_of = split_prompts(prompts)
+        labels = self.classify_tags({tag for tag in normalized_of.values() if tag})
+        return {item_id: assemble_result(raw_tags, normalized_of, labels)
+                for item_id, raw_tags in split.items()}
+
+    def classify_prompt(self, prompt: str) -> dict:
+        return self.classify_prompts({0: prompt})[0]
+
+
+def split_prompts(prompts: dict):
+    """프롬프트들을 원문 태그로 나누고, 각 원문 태그의 정규화된 이름을 한 번씩만 계산합니다."""
+    split = {item_id: split_tags(prompt) for item_id, prompt in prompts.items()}
+    normalized_of = {}
+    for raw_tags in split.values():
+        for raw_tag in raw_tags:
+            if raw_tag not in normalized_of:
+                normalized_of[raw_tag] = normalize_tag(raw_tag)[0]
+    return split, normalized_of
+
+
+def assemble_result(raw_tags, normalized_of, labels) -> dict:
+    """{정규화된 태그: (카테고리, 확신도)}로 원문 태그들을 9개 카테고리에 나눠 담습니다."""
+    result = {category: [] for category in CATEGORIES}
+    for raw_tag in raw_tags:
+        label = labels.get(normalized_of[raw_tag])
+        if label is not None:
+            result[label[0]].append(raw_tag)
+    return result
+
+
+class GeminiBackend(ClassifierBackend):
+    """태그 분류 캐시를 거쳐 처음 보는 태그만 Gemini API로 분류합니다."""
+    name = "gemini"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        self.model_name = model_name
+        self.last_error = None
+
+    def classify_tags(self, normalized_tags) -> dict:
+        known, _, self.last_error = tag_cache.classify_tags(normalized_tags, model_name=self.model_name)
+        return {tag: (category, 1.0) for tag, category in known.items()}
+
+    def classify_prompts(self, prompts: dict) -> dict:
+        return tag_cache.classify_prompts_cached(prompts, model_name=self.model_name)
+
+
+class HashingLinearModel:
+    """
+    단어/글자 3-gram을 해싱한 희소 특징과 소프트맥스 선형 모델로 태그 카테고리를 예측합니다.
+    사전에 없는 태그('silver hair' 같은 조합)에 대한 추정용이며 NumPy만 사용합니다.
+    """
+
+    def __init__(self, n_features: int = HASH_FEATURES):
+        self.n_features = n_features
+        self.weights = np.zeros((n_features, len(CATEGORIES)), dtype=np.float32)
+        self.bias = np.zeros(len(CATEGORIES), dtype=np.float32)
+
+    def features(self, tag: str) -> list:
+        """태그의 해싱 특징 인덱스 목록을 반환합니다. (파이썬 hash는 실행마다 달라 crc32 사용)"""
+        words = tag.split()
+        keys = [f"w:{word}" for word in words]
+        if words:
+            keys.append(f"last:{words[-1]}") # 'blue eyes'의 'eyes'처럼 마지막 단어가 종류를 결정하는 경우가 많음
+        padded = f" {tag} "
+        keys.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return [zlib.crc32(key.encode('utf-8')) % self.n_features for key in keys]
+
+    def _batch(self, feature_lists):
+        """특징 목록들을 (평탄화된 인덱스, 각 태그의 시작 위치)로 합칩니다."""
+        lengths = np.fromiter((len(f) for f in feature_lists), dtype=np.int64, count=len(feature_lists))
+        starts = np.zeros(len(feature_lists), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        indices = np.fromiter((i for f in feature_lists for i in f), dtype=np.int64, count=int(lengths.sum()))
+        return indices, starts, lengths
+
+    def _scores(self, indices, starts):
+        return np.add.reduceat(self.weights[indices], starts, axis=0) + self.bias
+
+    def fit(self, tags, labels, epochs: int = 10, learning_rate: float = 0.5, batch_size: int = 256):
+        """
+        정규화된 태그와 카테고리 번호 목록으로 미니배치 SGD 학습을 합니다.
+        """
+        feature_lists = [self.features(tag) for tag in tags]
+        labels = np.asarray(labels, dtype=np.int64)
+        rng = np.random.default_rng(0)
+        for _ in range(epochs):
+            order = rng.permutation(len(tags))
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                indices, starts, lengths = self._batch([feature_lists[row] for row in rows])
+                scores = self._scores(indices, starts)
+                probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+                probs /= probs.sum(axis=1, keepdims=True)
+                probs[np.arange(len(rows)), labels[rows]] -= 1.0 # 교차 엔트로피의 기울기
+                grad = (probs * (learning_rate / len(rows))).astype(np.float32)
+                np.add.at(self.weights, indices, -np.repeat(grad, lengths, axis=0))
+                self.bias -= grad.sum(axis=0)
+
+    def predict(self, tags):
+        """태그들의 (카테고리 번호 배열, 확률 배열)을 반환합니다."""
+        if not tags:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices, starts, _ = self._batch([self.features(tag) for tag in tags])
+        scores = self._scores(indices, starts)
+        probs = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probs /= probs.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+        return best, probs[np.arange(len(tags)), best]
+
+
+class LocalBackend(ClassifierBackend):
+    """
+    네트워크 없이 동작하는 로컬 분류기입니다.
+    1) 즐겨찾기의 분류 결과와 태그 분류 캐시로 만든 사전, 2) 규칙, 3) 해싱 선형 모델(NumPy가 있을 때)
+    순서로 태그를 분류합니다. 결과는 태그별로 메모해 두므로 같은 태그는 다시 계산하지 않습니다.
+    """
+    name = "local"
+
+    def __init__(self, use_model: bool = True):
+        self.lexicon = {}   # 정규화된 태그 -> (카테고리, 확신도)
+        self.model = None
+        self._memo = {}
+        self.load_lexicon()
+        if use_model and np is not None:
+            self.train_model()
+
+    def load_lexicon(self):
+        """즐겨찾기의 분류 결과와 태그 분류 캐시에서 사전을 만듭니다. 여러 번 분류된 태그는 다수결로 정합니다."""
+        votes = defaultdict(Counter)
+        conn = get_db_connection()
+        # 즐겨찾기 분류 결과는 태그 테이블에서 (태그, 카테고리)별 횟수로 바로 집계
+        for row in conn.execute("SELECT t.name AS tag, it.category, COUNT(*) AS n FROM image_tags it "
+                                "JOIN tags t ON t.id = it.tag_id GROUP BY it.tag_id, it.category"):
+            if row['category'] in CATEGORIES:
+                votes[row['tag']][row['category']] += row['n']
+        for row in conn.execute("SELECT tag, category FROM tag_categories WHERE instruction_hash = ?",
+                                (tag_cache.INSTRUCTION_HASH,)):
+            if row['category'] in CATEGORIES:
+                votes[row['tag']][row['category']] += 1
+
+        self.lexicon = {}
+        for tag, counter in votes.items():
+            category, count = counter.most_common(1)[0]
+            self.lexicon[tag] = (category, count / sum(counter.values()))
+        self._memo.clear()
+        print(f"로컬 분류 사전: 태그 {len(self.lexicon)}개")
+
+    def learn(self, labels: dict):
+        """다른 백엔드가 분류한 {태그: (카테고리, 확신도)}를 사전에 더합니다."""
+        for tag, (category, confidence) in labels.items():
+            self.lexicon[tag] = (category, confidence)
+            self._memo[tag] = (category, confidence)
+
+    def train_model(self):
+        """사전으로 해싱 선형 모델을 학습합니다. 사전이 너무 작으면 모델을 쓰지 않습니다."""
+        if np is None or len(self.lexicon) < MIN_TRAINING_TAGS:
+            self.model = None
+            return
+        tags = list(self.lexicon)
+        labels = [CATEGORIES.index(self.lexicon[tag][0]) for tag in tags]
+        self.model = HashingLinearModel()
+        self.model.fit(tags, labels)
+        self._memo.clear()
+
+    def _rule_label(self, tag):
+        for pattern, category, confidence in RULES:
+            if pattern.search(tag):
+                return category, confidence
+        return None
+
+    def classify_tags(self, normalized_tags) -> dict:
+        labels = {}
+        pending = []
+        for tag in normalized_tags:
+            label = self._memo.get(tag)
+            if label is None:
+                label = self.lexicon.get(tag) or self._rule_label(tag)
+            if label is None:
+                pending.append(tag)
+            else:
+                labels[tag] = self._memo[tag] = label
+
+        if pending and self.model is not None:
+            best, confidence = self.model.predict(pending)
+            for tag, index, prob in zip(pending, best.tolist(), confidence.tolist()):
+                labels[tag] = self._memo[tag] = (CATEGORIES[index], prob)
+        return labels
+
+
+class HybridBackend(ClassifierBackend):
+    """
+    로컬 백엔드로 먼저 분류하고, 확신도가 threshold보다 낮거나 분류하지 못한 태그만 원격 백엔드(Gemini)로 보냅니다.
+    원격 분류 결과는 로컬 사전에도 더해 다음부터는 로컬에서 처리합니다.
+    """
+    name = "hybrid"
+
+    def __init__(self, local: LocalBackend = None, remote: ClassifierBackend = None,
+                 threshold: float = CONFIDENCE_THRESHOLD):
+        self.local = local or LocalBackend()
+        self.remote = remote or GeminiBackend()
+        self.threshold = threshold
+        self.last_error = None
+
+    def classify_tags(self, normalized_tags) -> dict:
+        normalized_tags = list(normalized_tags)
+        labels = self.local.classify_tags(normalized_tags)
+        uncertain = [tag for tag in normalized_tags
+                     if tag not in labels or labels[tag][1] < self.threshold]
+        self.last_error = None
+        if uncertain:
+            remote_labels = self.remote.classify_tags(uncertain)
+            self.last_error = getattr(self.remote, "last_error", None)
+            self.local.learn(remote_labels)
+            labels.update(remote_labels)
+            print(f"하이브리드 분류: 태그 {len(normalized_tags)}개 중 {len(uncertain)}개를 원격으로 분류")
+        return labels
+
+    def classify_prompts(self, prompts: dict) -> dict:
+        split, normalized_of = split_prompts(prompts)
+        labels = self.classify_tags({tag for tag in normalized_of.values() if tag})
+        results = {}
+        for item_id, raw_tags in split.items():
+            unresolved = any(normalized_of[tag] and normalized_of[tag] not in labels for tag in raw_tags)
+            if unresolved and self.last_error:
+                results[item_id] = {"error": self.last_error}
+            else:
+                results[item_id] = assemble_result(raw_tags, normalized_of, labels)
+        return results
+
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "local": LocalBackend,
+    "hybrid": HybridBackend,
+}
+
+
+def get_backend(name: str = "hybrid", **kwargs) -> ClassifierBackend:
+    """이름으로 분류 백엔드를 만듭니다. ('gemini', 'local', 'hybrid')"""
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 분류 백엔드입니다: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,300 @@
+# src/prompt_classifier/cli.py
+"""
+화면 없이 쓸 수 있는 일괄 처리 명령입니다. 저장소 루트에서 실행합니다.
+
+사용법:
+    python -m src.prompt_classifier scan D:/outputs --workers 8
+    python -m src.prompt_classifier hash D:/outputs --workers 8
+    python -m src.prompt_classifier extract D:/outputs -o prompts.jsonl --resume
+    python -m src.prompt_classifier classify --concurrency 4 --rpm 15
+    python -m src.prompt_classifier export favorites.parquet --table favorites
+    python -m src.prompt_classifier import favorites.parquet --on-conflict newer --remap D:/outputs=/mnt/outputs
+
+모든 명령은 중단 후 다시 실행하면 이어서 진행합니다.
+    scan     - 크기와 mtime이 그대로인 파일은 건너뜀 (배치마다 커밋)
+    hash     - scan과 같음
+    extract  - --resume을 주면 출력 파일에 이미 있는 이미지는 건너뛰고 뒤에 이어 씀
+    classify - 분류 작업 큐(classification_jobs)에 남은 작업부터 처리
+    import   - 이미 가져온 image_path는 --on-conflict에 따라 건너뛰거나 덮어씀 (배치마다 커밋)
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.prompt_classifier import bulk_io, db_manager
+from src.prompt_classifier.prompt_extractor import extract_generation_info
+from src.prompt_classifier.scanner import DEFAULT_MAX_WORKERS, DirectoryScanner
+
+LOCAL_BATCH = 500 # --local-only 분류에서 한 번에 분류하고 저장할 즐겨찾기 수
+
+
+class Progress:
+    """(처리한 수, 전체 수)를 받아 stderr에 진행 상황을 표시합니다. 터미널이 아니면 몇 초에 한 줄만 씁니다."""
+
+    def __init__(self, label: str, interval: float = None):
+        self.label = label
+        self.tty = sys.stderr.isatty()
+        self.interval = interval if interval is not None else (0.1 if self.tty else 5.0)
+        self.started = time.monotonic()
+        self._last = 0.0
+        self._line = ""
+
+    def __call__(self, done: int, total: int = None):
+        now = time.monotonic()
+        if now - self._last < self.interval and done != total:
+            return
+        self._last = now
+        elapsed = max(now - self.started, 1e-9)
+        text = f"{self.label}: {done}"
+        if total:
+            text += f"/{total} ({done * 100 // total}%)"
+        text += f"  {done / elapsed:.1f}/s"
+        if self.tty:
+            sys.stderr.write("\r" + text.ljust(len(self._line)))
+        else:
+            sys.stderr.write(text + "\n")
+        sys.stderr.flush()
+        self._line = text
+
+    def finish(self):
+        if self.tty and self._line:
+            sys.stderr.write("\n")
+            sys.stderr.flush()
+        self._line = ""
+
+
+def _log(message: str):
+    print(message, file=sys.stderr)
+
+
+def collect_images(folder: str, io_threads: int) -> list:
+    """폴더 트리의 이미지 경로를 정렬해 반환합니다. 읽는 동안 찾은 수를 표시합니다."""
+    if not os.path.isdir(folder):
+        raise SystemExit(f"오류: '{folder}'는 유효한 폴더가 아닙니다.")
+    progress = Progress("이미지 찾는 중")
+    paths = []
+    for batch in DirectoryScanner(folder, io_threads).scan():
+        paths.extend(batch)
+        progress(len(paths))
+    progress.finish()
+    paths.sort()
+    return paths
+
+
+def _extract_record(image_path):
+    """워커 프로세스에서 실행됩니다. 이미지 하나의 출력 행을 만듭니다. 생성 정보가 없으면 프롬프트는 None."""
+    info = extract_generation_info(image_path) or {}
+    return {"image_path": image_path, **{key: info.get(key) for key in bulk_io.PROMPT_FIELDS[1:]}}
+
+
+def cmd_scan(args) -> int:
+    from src.prompt_classifier.prompt_index import index_images
+
+    paths = collect_images(args.folder, args.io_threads)
+    _log(f"이미지 {len(paths)}개를 찾았습니다. 프롬프트 인덱스를 갱신합니다...")
+    progress = Progress("인덱싱")
+    indexed, skipped = index_images(paths, max_workers=args.workers, progress_callback=progress)
+    progress.finish()
+    _log(f"완료: 새로 인덱싱 {indexed}개, 변경 없음 {skipped}개")
+    return 0
+
+
+def cmd_hash(args) -> int:
+    from src.prompt_classifier.image_hash import index_hashes
+
+    paths = collect_images(args.folder, args.io_threads)
+    _log(f"이미지 {len(paths)}개를 찾았습니다. 비슷한 이미지 찾기용 해시를 계산합니다...")
+    progress = Progress("해시 계산")
+    hashed, skipped = index_hashes(paths, max_workers=args.workers, progress_callback=progress)
+    progress.finish()
+    _log(f"완료: 새로 계산 {hashed}개, 변경 없음 {skipped}개")
+    return 0
+
+
+def cmd_extract(args) -> int:
+    fmt = bulk_io.detect_format(args.output, args.format)
+    if args.resume and fmt == 'parquet':
+        raise SystemExit("오류: Parquet 출력은 --resume을 지원하지 않습니다. JSONL이나 CSV를 사용하세요.")
+
+    paths = collect_images(args.folder, args.io_threads)
+    if args.resume:
+        done = bulk_io.read_written_keys(args.output, 'image_path', fmt)
+        paths = [path for path in paths if path not in done]
+        _log(f"이미 추출한 이미지 {len(done)}개를 건너뜁니다.")
+
+    total = len(paths)
+    found = 0
+    progress = Progress("추출")
+    with bulk_io.open_writer(args.output, bulk_io.PROMPT_FIELDS, fmt, append=args.resume) as writer:
+        if paths:
+            # 추출은 CPU를 쓰므로 프로세스 풀에서 병렬로 하고, 결과는 순서대로 받아 바로 씀
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as executor:
+                for record in executor.map(_extract_record, paths, chunksize=64):
+                    writer.write(record)
+                    found += record['positive_prompt'] is not None
+                    progress(writer.count, total)
+    progress.finish()
+    _log(f"완료: {total}개 중 생성 정보가 있는 이미지 {found}개 -> {args.output}")
+    return 0
+
+
+def _classify_locally(items) -> int:
+    """로컬 백엔드만으로 분류해 LOCAL_BATCH개씩 한 트랜잭션으로 저장합니다."""
+    from src.prompt_classifier.classifier_backends import LocalBackend
+
+    backend = LocalBackend()
+    progress = Progress("로컬 분류")
+    saved = 0
+    for start in range(0, len(items), LOCAL_BATCH):
+        results = backend.classify_prompts(dict(items[start:start + LOCAL_BATCH]))
+        saved += db_manager.update_classified_data_many(results.items())
+        progress(start + len(results), len(items))
+    progress.finish()
+    return saved
+
+
+def cmd_classify(args) -> int:
+    items = db_manager.get_unclassified_favorites()
+    if args.local_only:
+        _log(f"분류되지 않은 즐겨찾기 {len(items)}개를 로컬에서 분류합니다.")
+        _log(f"완료: {_classify_locally(items)}개 저장")
+        return 0
+
+    from src.prompt_classifier.classification_queue import ClassificationQueue, count_jobs, enqueue_jobs
+    from src.prompt_classifier.classifier_backends import LocalBackend
+    from src.prompt_classifier.gemini_classifier import DEFAULT_MODEL, close_services
+
+    enqueue_jobs(items)
+    _log(f"분류되지 않은 즐겨찾기 {len(items)}개를 작업 큐에 넣었습니다. 작업 현황: {count_jobs()}")
+    queue = ClassificationQueue(concurrency=args.concurrency, requests_per_minute=args.rpm,
+                                tokens_per_minute=args.tpm, model_name=args.model or DEFAULT_MODEL,
+                                local=None if args.no_local else LocalBackend(), threshold=args.threshold)
+    progress = Progress("분류")
+    try:
+        done, failed = queue.run(
+            on_error=lambda image_path, error: _log(f"\n실패: {image_path}: {error}"),
+            on_progress=progress)
+    finally:
+        progress.finish()
+        close_services()
+    _log(f"완료: 성공 {done}개, 실패 {failed}개")
+    return 1 if failed else 0
+
+
+# 표 이름 -> (내보낼 행, 열, 가져오는 함수)
+TABLES = {
+    "favorites": (bulk_io.iter_favorites, bulk_io.FAVORITE_FIELDS, bulk_io.import_favorites),
+    "prompts": (bulk_io.iter_prompts, bulk_io.PROMPT_DB_FIELDS, bulk_io.import_prompts),
+    "classifications": (bulk_io.iter_classifications, bulk_io.CLASSIFICATION_FIELDS, bulk_io.import_classifications),
+}
+
+
+def cmd_export(args) -> int:
+    rows, fields, _ = TABLES[args.table]
+    progress = Progress("내보내기")
+    with bulk_io.open_writer(args.output, fields, args.format, types=bulk_io.FIELD_TYPES) as writer:
+        for row in rows():
+            writer.write(row)
+            progress(writer.count)
+    progress.finish()
+    _log(f"완료: {args.table} {writer.count}행 -> {args.output}")
+    return 0
+
+
+def cmd_import(args) -> int:
+    if not os.path.isfile(args.input):
+        raise SystemExit(f"오류: '{args.input}' 파일이 없습니다.")
+    table = args.table or bulk_io.detect_table(args.input, args.format)
+    remaps = [bulk_io.parse_remap(spec) for spec in args.remap]
+    _log(f"{args.input}에서 {table}을(를) 가져옵니다. (같은 이미지가 있으면: {args.on_conflict})")
+    progress = Progress("가져오기")
+    stats = TABLES[table][2](bulk_io.iter_rows(args.input, args.format), on_conflict=args.on_conflict,
+                             remaps=remaps, progress_callback=progress)
+    progress.finish()
+    _log(f"완료: 추가 {stats['inserted']}개, 덮어씀 {stats['updated']}개, 건너뜀 {stats['skipped']}개")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.prompt_classifier", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="사용할 DB 파일 (기본: PROMPT_GALLERY_DB 또는 저장소의 prompt_gallery.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_folder_options(command):
+        command.add_argument('folder', help="이미지 폴더 (하위 폴더 포함)")
+        command.add_argument('--workers', type=int, default=None,
+                             help="이미지를 처리할 프로세스 수 (기본: CPU 수)")
+        command.add_argument('--io-threads', type=int, default=DEFAULT_MAX_WORKERS,
+                             help=f"폴더를 동시에 읽을 스레드 수 (기본: {DEFAULT_MAX_WORKERS})")
+
+    def add_format_option(command):
+        command.add_argument('--format', choices=bulk_io.FORMATS,
+                             help="파일 형식 (기본: 확장자로 판단, Parquet은 pyarrow 필요)")
+
+    scan = commands.add_parser('scan', help="폴더의 프롬프트를 DB 인덱스에 저장")
+    add_folder_options(scan)
+    scan.set_defaults(handler=cmd_scan)
+
+    hash_command = commands.add_parser('hash', help="폴더 이미지의 지각 해시를 DB에 저장 (비슷한 이미지 찾기용)")
+    add_folder_options(hash_command)
+    hash_command.set_defaults(handler=cmd_hash)
+
+    extract = commands.add_parser('extract', help="폴더의 프롬프트를 파일로 추출")
+    add_folder_options(extract)
+    extract.add_argument('-o', '--output', required=True, help="출력 파일 (.jsonl, .csv, .parquet)")
+    add_format_option(extract)
+    extract.add_argument('--resume', action='store_true', help="출력 파일에 이미 있는 이미지는 건너뛰고 이어 씀")
+    extract.set_defaults(handler=cmd_extract)
+
+    classify = commands.add_parser('classify', help="분류되지 않은 즐겨찾기를 분류")
+    classify.add_argument('--concurrency', type=int, default=4, help="동시에 보낼 API 요청 수")
+    classify.add_argument('--rpm', type=float, default=15, help="분당 요청 수 제한")
+    classify.add_argument('--tpm', type=float, default=1_000_000, help="분당 토큰 수 제한")
+    classify.add_argument('--model', default=None, help="Gemini 모델 이름 (기본: gemini_classifier.DEFAULT_MODEL)")
+    classify.add_argument('--threshold', type=float, default=0.6,
+                          help="로컬 분류 확신도가 이보다 낮은 태그만 API로 보냄")
+    classify.add_argument('--no-local', action='store_true', help="로컬 분류 없이 모든 태그를 API로 보냄")
+    classify.add_argument('--local-only', action='store_true', help="API 없이 로컬 분류기로만 분류")
+    classify.set_defaults(handler=cmd_classify)
+
+    export = commands.add_parser('export', help="DB 내용을 파일로 내보내기")
+    export.add_argument('output', help="출력 파일 (.jsonl, .csv, .parquet)")
+    add_format_option(export)
+    export.add_argument('--table', choices=sorted(TABLES), default='favorites', help="내보낼 내용")
+    export.set_defaults(handler=cmd_export)
+
+    import_command = commands.add_parser('import', help="export로 내보낸 파일을 DB로 가져오기")
+    import_command.add_argument('input', help="가져올 파일 (.jsonl, .csv, .parquet)")
+    add_format_option(import_command)
+    import_command.add_argument('--table', choices=sorted(TABLES), help="가져올 내용 (기본: 파일의 열로 판단)")
+    import_command.add_argument('--on-conflict', choices=bulk_io.ON_CONFLICT, default='skip',
+                                help="DB에 같은 이미지가 있을 때: skip=그대로 둠, replace=덮어씀, "
+                                     "newer=분류 시각(prompts는 파일 mtime)이 더 새로우면 덮어씀 (기본: skip)")
+    import_command.add_argument('--remap', action='append', default=[], metavar='OLD=NEW',
+                                help="OLD로 시작하는 이미지 경로를 NEW로 바꿈 (이미지 폴더를 옮겼을 때, 여러 번 지정 가능)")
+    import_command.set_defaults(handler=cmd_import)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.db:
+        db_manager.db_path = args.db
+
+    from src.prompt_classifier.database import initialize_database
+    initialize_database()
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        _log(f"오류: {e}")
+        return 2
+    except KeyboardInterrupt:
+        _log("\n중단되었습니다. 같은 명령을 다시 실행하면 이어서 진행합니다.")
+        return 130
+    finally:
+        db_manager.close_db_connection()
@@ -1,19 +1,11 @@
+import json
 import sqlite3
-import os
 
-DB_NAME = "prompt_gallery.db"
+from src.prompt_classifier import db_manager
 
-def initialize_database():
+# 버전 1: 기존 스키마 그대로. 모두 IF NOT EXISTS이므로 버전 관리 이전에 만든 DB에도 그대로 적용됨
+SCHEMA_V1 = (
     """
-    데이터베이스와 'favorites' 테이블을 초기화합니다.
-    테이블이 이미 존재하면 아무 작업도 수행하지 않습니다.
-    """
-    db_path = os.path.join(os.path.dirname(__file__), '..', '..', DB_NAME)
-
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    cursor.execute("""
     CREATE TABLE IF NOT EXISTS favorites (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         image_path TEXT NOT NULL UNIQUE,
@@ -21,8 +13,266 @@ def initialize_database():
         classified_data TEXT,
         favorited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     )
-    """)
+    """,
+    # 스캔한 모든 이미지의 프롬프트 인덱스 (파일 크기/mtime이 같으면 재추출하지 않음)
+    """
+    CREATE TABLE IF NOT EXISTS prompts (
+        image_path TEXT PRIMARY KEY,
+        positive_prompt TEXT,
+        negative_prompt TEXT,
+        parameters TEXT,
+        file_size INTEGER,
+        file_mtime INTEGER,
+        indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 프롬프트 전문 검색용 FTS5 테이블 (prompts를 원본으로 하며 트리거로 동기화)
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+        positive_prompt, negative_prompt,
+        content='prompts', content_rowid='rowid',
+        tokenize="unicode61 tokenchars '_'"
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO prompts_fts(rowid, positive_prompt, negative_prompt)
+        VALUES (new.rowid, new.positive_prompt, new.negative_prompt);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_ad AFTER DELETE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, positive_prompt, negative_prompt)
+        VALUES ('delete', old.rowid, old.positive_prompt, old.negative_prompt);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_au AFTER UPDATE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, positive_prompt, negative_prompt)
+        VALUES ('delete', old.rowid, old.positive_prompt, old.negative_prompt);
+        INSERT INTO prompts_fts(rowid, positive_prompt, negative_prompt)
+        VALUES (new.rowid, new.positive_prompt, new.negative_prompt);
+    END
+    """,
+    # 태그 단위 검색용 테이블 (가중치 구문을 벗긴 정규화된 태그, LoRA는 'lora:이름')
+    """
+    CREATE TABLE IF NOT EXISTS prompt_tags (
+        image_path TEXT NOT NULL,
+        tag TEXT NOT NULL,
+        weight REAL,
+        PRIMARY KEY (tag, image_path)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_prompt_tags_image_path ON prompt_tags(image_path)",
+    # 태그 단위 분류 캐시 (정규화된 태그 -> 카테고리, 분류 지시문이 바뀌면 instruction_hash로 무효화)
+    """
+    CREATE TABLE IF NOT EXISTS tag_categories (
+        tag TEXT PRIMARY KEY,
+        category TEXT NOT NULL,
+        instruction_hash TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID
+    """,
+    # 분류 작업 큐 (중단된 일괄 분류를 이어서 실행할 수 있도록 DB에 보관)
+    """
+    CREATE TABLE IF NOT EXISTS classification_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        image_path TEXT NOT NULL UNIQUE,
+        prompt TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_classification_jobs_status ON classification_jobs(status)",
+)
+
+# 버전 2: 분류 결과를 JSON 문자열 대신 태그/카테고리 행으로 저장
+SCHEMA_V2 = (
+    # 정규화된 태그 이름 (tag_utils.normalize_tag 결과)
+    """
+    CREATE TABLE tags (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """,
+    # 즐겨찾기별 분류 결과. tag_text는 프롬프트에 적힌 원래 표기, position은 카테고리 안에서의 순서
+    """
+    CREATE TABLE image_tags (
+        favorite_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        tag_text TEXT NOT NULL,
+        PRIMARY KEY (favorite_id, category, position)
+    ) WITHOUT ROWID
+    """,
+    # "카테고리 X에 태그 Y가 있는 즐겨찾기"와 "카테고리별 태그 빈도"는 인덱스만으로 처리
+    "CREATE INDEX idx_image_tags_category_tag ON image_tags(category, tag_id, favorite_id)",
+    "CREATE INDEX idx_image_tags_tag ON image_tags(tag_id, favorite_id)",
+    """
+    CREATE TRIGGER favorites_ad AFTER DELETE ON favorites BEGIN
+        DELETE FROM image_tags WHERE favorite_id = old.id;
+    END
+    """,
+    # 분류 결과가 모두 빈 목록이어도 분류된 것으로 구분할 수 있도록 분류 시각을 따로 기록
+    "ALTER TABLE favorites ADD COLUMN classified_at TIMESTAMP",
+)
+
+# 버전 3: 중복/유사 프롬프트 묶음용 MinHash 서명과 LSH 버킷 (dedup 모듈 참고)
+SCHEMA_V3 = (
+    # cluster_id는 같은 묶음의 서명들이 공유하는 id (묶음에서 먼저 들어온 서명의 id)
+    """
+    CREATE TABLE prompt_signatures (
+        id INTEGER PRIMARY KEY,
+        image_path TEXT NOT NULL UNIQUE,
+        prompt_key INTEGER NOT NULL,
+        signature BLOB NOT NULL,
+        cluster_id INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX idx_prompt_signatures_key ON prompt_signatures(prompt_key)",
+    "CREATE INDEX idx_prompt_signatures_cluster ON prompt_signatures(cluster_id)",
+    # 밴드별 버킷 -> 서명. 태그 집합이 같은 서명들 중 대표 하나만 들어감
+    """
+    CREATE TABLE lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        signature_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, signature_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# 버전 4: 비슷한 이미지 찾기용 지각 해시 (image_hash 모듈 참고). 읽을 수 없는 이미지는 해시가 NULL
+SCHEMA_V4 = (
+    """
+    CREATE TABLE image_hashes (
+        image_path TEXT PRIMARY KEY,
+        file_size INTEGER,
+        file_mtime INTEGER,
+        phash INTEGER,
+        dhash INTEGER
+    )
+    """,
+)
+
+# 버전 5: 즐겨찾기 창이 최근에 추가한 순서로 페이지 단위로 읽을 때 쓰는 인덱스 (db_manager.get_favorites_page)
+SCHEMA_V5 = (
+    "CREATE INDEX idx_favorites_favorited_at ON favorites(favorited_at)",
+)
+
+
+def _migrate_v1(conn):
+    fts_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'prompts_fts'").fetchone() is not None
+    tags_exist = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'prompt_tags'").fetchone() is not None
+    for statement in SCHEMA_V1:
+        conn.execute(statement)
+    if not fts_exists:
+        # 기존에 인덱싱된 프롬프트도 검색되도록 FTS 인덱스를 다시 만듦
+        conn.execute("INSERT INTO prompts_fts(prompts_fts) VALUES ('rebuild')")
+    if not tags_exist:
+        from src.prompt_classifier.prompt_index import INSERT_TAG_SQL
+        from src.prompt_classifier.tag_utils import extract_tags
+        rows = conn.execute("SELECT image_path, positive_prompt FROM prompts").fetchall()
+        conn.executemany(INSERT_TAG_SQL, [(image_path, tag, weight) for image_path, positive_prompt in rows
+                                          for tag, weight in extract_tags(positive_prompt)])
+
+
+def _migrate_v2(conn):
+    for statement in SCHEMA_V2:
+        conn.execute(statement)
+
+    # 기존 JSON 분류 결과를 행으로 옮긴 뒤 JSON 열은 삭제
+    moved = skipped = 0
+    rows = conn.execute("SELECT image_path, classified_data, favorited_at FROM favorites "
+                        "WHERE classified_data IS NOT NULL").fetchall()
+    for image_path, classified_data, favorited_at in rows:
+        try:
+            data = json.loads(classified_data)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            skipped += 1
+            continue
+        db_manager.write_classification(conn, image_path, data, classified_at=favorited_at)
+        moved += 1
+    conn.execute("ALTER TABLE favorites DROP COLUMN classified_data")
+    if rows:
+        print(f"분류 결과 {moved}개를 태그 테이블로 옮겼습니다." +
+              (f" (읽을 수 없는 {skipped}개는 미분류로 둠)" if skipped else ""))
+
+
+def _migrate_v3(conn):
+    from src.prompt_classifier.dedup import rebuild_signatures
+    for statement in SCHEMA_V3:
+        conn.execute(statement)
+    # 이미 인덱싱된 프롬프트도 바로 묶이도록 태그 테이블로 서명을 만듦
+    written = rebuild_signatures(conn)
+    if written:
+        print(f"인덱싱된 프롬프트 {written}개의 중복 검사용 서명을 만들었습니다.")
+
+
+def _migrate_v4(conn):
+    for statement in SCHEMA_V4:
+        conn.execute(statement)
 
-    conn.commit()
-    conn.close()
-    print(f"데이터베이스 '{db_path}'가 성공적으로 초기화되었습니다.")
\ No newline at end of file
+
+def _migrate_v5(conn):
+    for statement in SCHEMA_V5:
+        conn.execute(statement)
+
+
+# 순서대로 적용되며, 목록의 위치(1부터)가 PRAGMA user_version에 기록되는 스키마 버전. 새 변경은 끝에만 추가
+MIGRATIONS = (
+    _migrate_v1,
+    _migrate_v2,
+    _migrate_v3,
+    _migrate_v4,
+    _migrate_v5,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn) -> int:
+    """
+    DB의 스키마 버전(PRAGMA user_version)보다 새로운 마이그레이션을 차례로 적용합니다.
+    각 마이그레이션은 버전 기록과 함께 한 트랜잭션으로 적용되므로, 중간에 실패하면 이전 버전으로 남습니다.
+
+    Returns:
+        int: 적용 후 스키마 버전
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"DB 스키마 버전({version})이 이 프로그램이 아는 버전({SCHEMA_VERSION})보다 높습니다.")
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        conn.execute("BEGIN")
+        try:
+            MIGRATIONS[target - 1](conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"DB 스키마를 버전 {target}(으)로 올렸습니다.")
+    return SCHEMA_VERSION
+
+
+def initialize_database(db_path: str = None):
+    """
+    데이터베이스를 만들거나 최신 스키마 버전으로 올립니다.
+    이미 최신 버전이면 아무 작업도 수행하지 않습니다.
+
+    Args:
+        db_path (str): DB 파일 경로. 없으면 db_manager.db_path
+    """
+    db_path = db_path or db_manager.db_path
+    # 마이그레이션은 BEGIN/COMMIT을 직접 관리하므로 자동 트랜잭션을 끈 별도 연결을 사용
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    print(f"데이터베이스 '{db_path}'가 성공적으로 초기화되었습니다.")
@@ -1,69 +1,307 @@
 import sqlite3
 import os
+import threading
+
+from src.prompt_classifier.tag_utils import normalize_tag
 
 DB_NAME = "prompt_gallery.db"
-db_path = os.path.join(os.path.dirname(__file__), '..', '..', DB_NAME)
+# PROMPT_GALLERY_DB 환경 변수로 다른 DB 파일을 쓸 수 있음 (벤치마크/테스트용)
+db_path = os.environ.get("PROMPT_GALLERY_DB") or os.path.join(os.path.dirname(__file__), '..', '..', DB_NAME)
 
-def get_db_connection():
-    """데이터베이스 연결 객체를 반환합니다."""
-    conn = sqlite3.connect(db_path)
+BULK_CHUNK = 500 # IN (...) 절 하나에 넣을 경로 수
+FAVORITES_PAGE = 200 # 즐겨찾기 목록을 한 번에 읽는 행 수
+NO_PROMPT = "프롬프트 정보 없음" # 즐겨찾기에 프롬프트가 없을 때 저장되는 문구
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",      # 읽기와 쓰기가 서로 막지 않고, 커밋마다 전체 저널을 쓰지 않음
+    "PRAGMA synchronous = NORMAL",    # WAL에서는 체크포인트 때만 fsync (전원 차단 시 마지막 커밋만 잃을 수 있음)
+    "PRAGMA cache_size = -16000",     # 페이지 캐시 약 16MB
+    "PRAGMA mmap_size = 268435456",   # 256MB까지 메모리 맵으로 읽기
+    "PRAGMA temp_store = MEMORY",
+)
+
+_local = threading.local()
+
+def _connect():
+    # 준비된 문장은 연결마다 캐시되므로, 연결을 유지하면 같은 SQL을 다시 컴파일하지 않음
+    conn = sqlite3.connect(db_path, timeout=10, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_db_connection():
+    """
+    현재 스레드의 데이터베이스 연결 객체를 반환합니다.
+    스레드마다 한 번만 연결하고 계속 재사용하므로 호출한 쪽에서 닫지 않습니다.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = _connect()
     return conn
 
+def close_db_connection():
+    """현재 스레드의 연결을 닫습니다. 스레드가 끝나기 전이나 DB 파일을 바꿀 때 호출합니다."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+def _chunks(items, size=BULK_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 def add_favorite(image_path: str, full_prompt: str):
     """
     이미지를 즐겨찾기에 추가합니다.
     이미 경로가 존재하면 아무 작업도 수행하지 않습니다.
     """
     conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            "INSERT INTO favorites (image_path, full_prompt) VALUES (?, ?)",
-            (image_path, full_prompt)
-        )
-        conn.commit()
+        with conn:
+            conn.execute(
+                "INSERT INTO favorites (image_path, full_prompt) VALUES (?, ?)",
+                (image_path, full_prompt)
+            )
     except sqlite3.IntegrityError:
         print(f"'{os.path.basename(image_path)}'는 이미 즐겨찾기에 있습니다.")
-    finally:
-        conn.close()
 
-def remove_favorite(image_path: str):
-    """이미지를 즐겨찾기에서 삭제합니다."""
+def add_favorites_many(items) -> int:
+    """
+    (이미지 경로, 프롬프트) 목록을 한 트랜잭션으로 즐겨찾기에 추가합니다.
+    이미 있는 경로는 건너뜁니다.
+
+    Returns:
+        int: 새로 추가된 수
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM favorites WHERE image_path = ?", (image_path,))
-    conn.commit()
-    conn.close()
+    with conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO favorites (image_path, full_prompt) VALUES (?, ?)",
+            list(items)
+        )
+        return conn.total_changes - before
+
+def remove_favorite(image_path: str) -> bool:
+    """이미지를 즐겨찾기에서 삭제합니다. 삭제된 항목이 있으면 True를 반환합니다."""
+    from src.prompt_classifier.analytics import remove_classifications
+    conn = get_db_connection()
+    with conn:
+        removed = conn.execute("DELETE FROM favorites WHERE image_path = ?", (image_path,)).rowcount > 0
+    if removed:
+        remove_classifications([image_path]) # 커밋된 뒤에만 태그 통계에 반영
+    return removed
+
+def remove_favorites_many(image_paths) -> int:
+    """여러 이미지를 한 트랜잭션으로 즐겨찾기에서 삭제하고 삭제된 수를 반환합니다."""
+    from src.prompt_classifier.analytics import remove_classifications
+    image_paths = list(image_paths)
+    conn = get_db_connection()
+    with conn:
+        before = conn.total_changes
+        conn.executemany("DELETE FROM favorites WHERE image_path = ?", [(path,) for path in image_paths])
+        removed = conn.total_changes - before
+    if removed:
+        remove_classifications(image_paths) # 커밋된 뒤에만 태그 통계에 반영
+    return removed
 
 def is_favorited(image_path: str) -> bool:
     """이미지가 즐겨찾기에 있는지 확인합니다."""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT 1 FROM favorites WHERE image_path = ?", (image_path,))
-    result = cursor.fetchone()
-    conn.close()
+    result = conn.execute("SELECT 1 FROM favorites WHERE image_path = ?", (image_path,)).fetchone()
     return result is not None
 
+def is_favorited_many(image_paths) -> set:
+    """주어진 경로 중 즐겨찾기에 있는 경로의 집합을 반환합니다."""
+    image_paths = list(dict.fromkeys(image_paths))
+    conn = get_db_connection()
+    favorited = set()
+    for chunk in _chunks(image_paths):
+        placeholders = ", ".join("?" * len(chunk))
+        favorited.update(row[0] for row in conn.execute(
+            f"SELECT image_path FROM favorites WHERE image_path IN ({placeholders})", chunk))
+    return favorited
+
 def get_all_favorites():
     """모든 즐겨찾기 목록을 반환합니다."""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM favorites ORDER BY favorited_at DESC")
-    favorites = cursor.fetchall()
-    conn.close()
-    return favorites
+    return conn.execute("SELECT * FROM favorites ORDER BY favorited_at DESC").fetchall()
 
-def update_classified_data(image_path: str, classified_data: str):
+def get_favorites_page(after=None, limit: int = FAVORITES_PAGE) -> list:
     """
-    특정 이미지의 분류된 프롬프트 데이터를 업데이트합니다.
+    즐겨찾기를 최근에 추가한 순서로 limit개 반환합니다.
+    OFFSET 대신 직전 페이지의 마지막 행 다음부터 읽으므로(키셋 페이지네이션) 뒤쪽 페이지도 인덱스에서 바로 찾습니다.
+
+    Args:
+        after (tuple): 직전 페이지 마지막 행의 (favorited_at, id). None이면 첫 페이지
     """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE favorites SET classified_data = ? WHERE image_path = ?",
-        (classified_data, image_path)
-    )
-    conn.commit()
-    conn.close()
+    if after is None:
+        return conn.execute("SELECT id, image_path, full_prompt, favorited_at, classified_at FROM favorites "
+                            "ORDER BY favorited_at DESC, id DESC LIMIT ?", (limit,)).fetchall()
+    return conn.execute("SELECT id, image_path, full_prompt, favorited_at, classified_at FROM favorites "
+                        "WHERE (favorited_at, id) < (?, ?) ORDER BY favorited_at DESC, id DESC LIMIT ?",
+                        (*after, limit)).fetchall()
+
+def get_favorite_paths() -> list:
+    """모든 즐겨찾기 이미지 경로를 반환합니다."""
+    conn = get_db_connection()
+    return [row[0] for row in conn.execute("SELECT image_path FROM favorites")]
+
+def count_favorites() -> int:
+    conn = get_db_connection()
+    return conn.execute("SELECT COUNT(*) FROM favorites").fetchone()[0]
+
+def get_unclassified_favorites() -> list:
+    """분류되지 않았고 프롬프트가 있는 즐겨찾기의 [(이미지 경로, 프롬프트), ...]를 추가한 순서로 반환합니다."""
+    conn = get_db_connection()
+    return [(row['image_path'], row['full_prompt']) for row in conn.execute(
+        "SELECT image_path, full_prompt FROM favorites "
+        "WHERE classified_at IS NULL AND full_prompt IS NOT NULL AND full_prompt != ? ORDER BY id", (NO_PROMPT,))]
+
+def write_classification(conn, image_path: str, data: dict, classified_at=None, analytics_updates=None) -> bool:
+    """
+    분류 결과({카테고리: [태그, ...]})를 tags/image_tags 행으로 기록합니다.
+    호출한 쪽의 트랜잭션 안에서 실행되며 커밋하지 않습니다.
+
+    Args:
+        analytics_updates (list): 주면 태그 통계에 반영할 (이미지 경로, [(카테고리, 태그), ...])를 추가합니다.
+            트랜잭션이 롤백되면 통계만 바뀌지 않도록, 호출한 쪽이 커밋한 뒤 analytics.update_classifications로 반영합니다.
+
+    Returns:
+        bool: 즐겨찾기에 해당 이미지가 있어 기록했으면 True
+    """
+    row = conn.execute("SELECT id FROM favorites WHERE image_path = ?", (image_path,)).fetchone()
+    if row is None:
+        return False
+    favorite_id = row[0]
+
+    entries = []
+    for category, tags in data.items():
+        if not isinstance(tags, list):
+            continue
+        for position, tag_text in enumerate(tag for tag in tags if isinstance(tag, str)):
+            name = normalize_tag(tag_text)[0] or tag_text.strip().lower()
+            if name:
+                entries.append((category, position, name, tag_text))
+
+    conn.execute("DELETE FROM image_tags WHERE favorite_id = ?", (favorite_id,))
+    if entries:
+        names = list({name for _, _, name, _ in entries})
+        conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(name,) for name in names])
+        tag_ids = {}
+        for chunk in _chunks(names):
+            placeholders = ", ".join("?" * len(chunk))
+            tag_ids.update(conn.execute(f"SELECT name, id FROM tags WHERE name IN ({placeholders})", chunk).fetchall())
+        conn.executemany(
+            "INSERT INTO image_tags (favorite_id, category, position, tag_id, tag_text) VALUES (?, ?, ?, ?, ?)",
+            [(favorite_id, category, position, tag_ids[name], tag_text)
+             for category, position, name, tag_text in entries])
+    conn.execute("UPDATE favorites SET classified_at = COALESCE(?, CURRENT_TIMESTAMP) WHERE id = ?",
+                 (classified_at, favorite_id))
+    if analytics_updates is not None:
+        analytics_updates.append((image_path, [(category, name) for category, _, name, _ in entries]))
+    return True
+
+def update_classified_data(image_path: str, classified_data: dict):
+    """
+    특정 이미지의 분류 결과({카테고리: [태그, ...]})를 저장합니다. 이전 결과는 대체됩니다.
+    """
+    from src.prompt_classifier.analytics import update_classifications
+    conn = get_db_connection()
+    analytics_updates = []
+    with conn:
+        write_classification(conn, image_path, classified_data, analytics_updates=analytics_updates)
+    update_classifications(analytics_updates)
     print(f"'{os.path.basename(image_path)}'의 분류 데이터가 업데이트되었습니다.")
+
+def update_classified_data_many(items) -> int:
+    """
+    (이미지 경로, 분류 결과 dict) 목록을 한 트랜잭션으로 저장합니다.
+
+    Returns:
+        int: 저장된 즐겨찾기 수
+    """
+    from src.prompt_classifier.analytics import update_classifications
+    conn = get_db_connection()
+    analytics_updates = []
+    with conn:
+        updated = sum(write_classification(conn, image_path, classified_data, analytics_updates=analytics_updates)
+                      for image_path, classified_data in items)
+    update_classifications(analytics_updates)
+    print(f"즐겨찾기 {updated}개의 분류 데이터가 업데이트되었습니다.")
+    return updated
+
+def _group_classifications(rows) -> dict:
+    """(이미지 경로, 카테고리, 태그 표기) 행을 {이미지 경로: {카테고리: [태그, ...]}}로 묶습니다."""
+    grouped = {}
+    for image_path, category, tag_text in rows:
+        data = grouped.setdefault(image_path, {})
+        if category is not None:
+            data.setdefault(category, []).append(tag_text)
+    return grouped
+
+CLASSIFICATION_SQL = """
+SELECT f.image_path, it.category, it.tag_text
+FROM favorites f LEFT JOIN image_tags it ON it.favorite_id = f.id
+WHERE f.classified_at IS NOT NULL {where}
+ORDER BY f.id, it.category, it.position
+"""
+
+def get_classified_data(image_path: str):
+    """
+    이미지의 분류 결과를 {카테고리: [태그, ...]}로 반환합니다. 태그가 없는 카테고리는 빠집니다.
+    아직 분류되지 않았으면 None을 반환합니다.
+    """
+    conn = get_db_connection()
+    rows = conn.execute(CLASSIFICATION_SQL.format(where="AND f.image_path = ?"), (image_path,)).fetchall()
+    return _group_classifications(rows).get(image_path)
+
+def get_classified_data_many(image_paths=None) -> dict:
+    """
+    여러 이미지의 분류 결과를 {이미지 경로: {카테고리: [태그, ...]}}로 반환합니다.
+    image_paths가 없으면 분류된 모든 즐겨찾기를 반환하며, 분류되지 않은 이미지는 빠집니다.
+    """
+    conn = get_db_connection()
+    if image_paths is None:
+        return _group_classifications(conn.execute(CLASSIFICATION_SQL.format(where="")))
+    grouped = {}
+    for chunk in _chunks(list(dict.fromkeys(image_paths))):
+        placeholders = ", ".join("?" * len(chunk))
+        grouped.update(_group_classifications(conn.execute(
+            CLASSIFICATION_SQL.format(where=f"AND f.image_path IN ({placeholders})"), chunk)))
+    return grouped
+
+def find_favorites_by_tag(tag: str, category: str = None) -> list:
+    """
+    분류 결과에 태그가 있는 즐겨찾기 경로를 최근에 추가한 순서로 반환합니다.
+    태그는 정규화해서 비교하며, category를 주면 그 카테고리로 분류된 경우만 찾습니다.
+    """
+    name = normalize_tag(tag)[0] or tag.strip().lower()
+    sql = ("SELECT DISTINCT f.image_path, f.favorited_at FROM image_tags it "
+           "JOIN tags t ON t.id = it.tag_id JOIN favorites f ON f.id = it.favorite_id WHERE t.name = ?")
+    params = [name]
+    if category:
+        sql += " AND it.category = ?"
+        params.append(category)
+    sql += " ORDER BY f.favorited_at DESC"
+    conn = get_db_connection()
+    return [row[0] for row in conn.execute(sql, params)]
+
+def get_tag_frequencies(category: str = None, limit: int = None) -> list:
+    """
+    카테고리별로 태그가 분류된 즐겨찾기 수를 [(카테고리, 태그, 수), ...]로 많은 순서대로 반환합니다.
+    category를 주면 그 카테고리만 집계합니다.
+    """
+    sql = ("SELECT it.category, t.name, COUNT(DISTINCT it.favorite_id) AS n FROM image_tags it "
+           "JOIN tags t ON t.id = it.tag_id")
+    params = []
+    if category:
+        sql += " WHERE it.category = ?"
+        params.append(category)
+    sql += " GROUP BY it.category, it.tag_id ORDER BY n DESC, t.name"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    conn = get_db_connection()
+    return [tuple(row) for row in conn.execute(sql, params)]
@@ -0,0 +1,243 @@
+# src/prompt_classifier/dedup.py
+
+import hashlib
+import zlib
+
+import numpy as np
+
+from src.prompt_classifier.db_manager import BULK_CHUNK, get_db_connection
+from src.prompt_classifier.tag_utils import normalize_tag, split_tags
+
+# MinHash 서명은 NUM_PERM개의 해시 최솟값이고, LSH는 이를 BANDS개의 밴드(밴드당 ROWS개)로 나눠 버킷에 넣음.
+# 자카드 유사도 s인 두 태그 집합이 한 밴드 이상 겹칠 확률은 1 - (1 - s^ROWS)^BANDS 이며
+# ROWS=8, BANDS=8이면 s=0.9에서 약 99%, s=0.5에서 약 3%만 후보가 됨
+NUM_PERM = 64
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8 # 서명으로 추정한 자카드 유사도가 이 이상이면 같은 묶음 (태그 몇 개만 다른 재생성)
+MERSENNE_PRIME = (1 << 31) - 1
+
+# 순열 해시 (a * x + b) mod p 의 계수. 서명이 DB에 저장되므로 실행마다 같도록 시드를 고정
+_rng = np.random.default_rng(0x5eed)
+_PERM_A = _rng.integers(1, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, MERSENNE_PRIME, NUM_PERM, dtype=np.uint64)
+
+INSERT_SIGNATURE_SQL = ("INSERT INTO prompt_signatures (image_path, prompt_key, signature, cluster_id) "
+                        "VALUES (?, ?, ?, 0)")
+INSERT_BUCKET_SQL = "INSERT OR IGNORE INTO lsh_buckets (band, bucket, signature_id) VALUES (?, ?, ?)"
+DELETE_BUCKET_SQL = "DELETE FROM lsh_buckets WHERE band = ? AND bucket = ? AND signature_id = ?"
+
+
+def _int64(digest: bytes) -> int:
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def prompt_key(tags) -> int:
+    """태그 집합(순서/중복 무관)의 해시. 시드만 다른 재생성처럼 태그가 완전히 같은 프롬프트는 값이 같습니다."""
+    text = "\x1f".join(sorted(set(tags)))
+    return _int64(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest())
+
+
+def minhash_signatures(tag_sets) -> np.ndarray:
+    """
+    태그 집합들의 MinHash 서명을 한 번에 계산합니다. 빈 집합은 넣지 않아야 합니다.
+
+    Returns:
+        np.ndarray: (집합 수, NUM_PERM) uint32 배열
+    """
+    tag_sets = [sorted(set(tags)) for tags in tag_sets]
+    if not tag_sets:
+        return np.empty((0, NUM_PERM), dtype=np.uint32)
+    # 파이썬 hash()는 프로세스마다 달라지므로 crc32로 태그를 정수로 바꿈
+    hashed = np.fromiter((zlib.crc32(tag.encode('utf-8')) for tags in tag_sets for tag in tags),
+                         dtype=np.uint64)
+    values = (hashed[:, None] % MERSENNE_PRIME * _PERM_A + _PERM_B) % MERSENNE_PRIME
+    offsets = np.cumsum([0] + [len(tags) for tags in tag_sets[:-1]])
+    return np.minimum.reduceat(values, offsets, axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list:
+    """서명을 밴드별 버킷 키 [(밴드 번호, 버킷), ...]로 바꿉니다."""
+    return [(band, _int64(hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                          digest_size=8).digest()))
+            for band in range(BANDS)]
+
+
+def similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """서명이 같은 자리의 비율로 자카드 유사도를 추정합니다. others는 (n, NUM_PERM)."""
+    return (others == signature).mean(axis=1)
+
+
+def _load_signature(blob) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.uint32)
+
+
+def _remove(conn, signature_id, key, blob):
+    """서명 행을 지웁니다. 버킷을 가진 대표 행이었으면 같은 태그 집합의 다음 행에 버킷을 넘깁니다."""
+    conn.execute("DELETE FROM prompt_signatures WHERE id = ?", (signature_id,))
+    bands = band_keys(_load_signature(blob))
+    deleted = conn.executemany(DELETE_BUCKET_SQL, [(band, bucket, signature_id) for band, bucket in bands]).rowcount
+    if deleted:
+        heir = conn.execute("SELECT MIN(id) FROM prompt_signatures WHERE prompt_key = ?", (key,)).fetchone()[0]
+        if heir is not None:
+            conn.executemany(INSERT_BUCKET_SQL, [(band, bucket, heir) for band, bucket in bands])
+
+
+def _find_cluster(conn, signature, bands):
+    """LSH 버킷에서 후보를 찾아 유사도를 확인하고, 겹치는 묶음들을 하나로 합친 묶음 id를 반환합니다. 없으면 None."""
+    # (band, bucket) IN (VALUES ...)는 기본 키를 쓰지 않고 전체를 훑으므로 OR로 풀어 밴드마다 키로 찾게 함
+    conditions = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in bands)
+    candidates = conn.execute(
+        "SELECT DISTINCT s.signature, s.cluster_id FROM lsh_buckets b "
+        f"JOIN prompt_signatures s ON s.id = b.signature_id WHERE {conditions}",
+        [value for pair in bands for value in pair]).fetchall()
+    if not candidates:
+        return None
+    scores = similarity(signature, np.stack([_load_signature(blob) for blob, _ in candidates]))
+    clusters = sorted({cluster_id for (_, cluster_id), score in zip(candidates, scores)
+                       if score >= SIMILARITY_THRESHOLD})
+    if not clusters:
+        return None
+    if len(clusters) > 1:
+        # 새 프롬프트가 두 묶음을 잇는 경우 (A~B, B~C 이면 A, B, C를 한 묶음으로)
+        others = clusters[1:]
+        conn.execute(f"UPDATE prompt_signatures SET cluster_id = ? "
+                     f"WHERE cluster_id IN ({', '.join('?' * len(others))})", [clusters[0], *others])
+    return clusters[0]
+
+
+def update_signatures(conn, items) -> int:
+    """
+    (이미지 경로, 정규화된 태그 목록)들의 서명을 갱신하고 중복 묶음에 배정합니다.
+    호출한 쪽의 트랜잭션 안에서 실행되며 커밋하지 않습니다. 태그 집합이 그대로인 이미지는 건너뜁니다.
+
+    태그 집합이 완전히 같은 이미지는 prompt_key 인덱스로 바로 묶고, LSH 버킷에는 태그 집합마다
+    대표 행 하나만 넣으므로 같은 프롬프트의 재생성이 아무리 많아도 후보 수가 늘지 않습니다.
+    태그가 바뀐 이미지는 새 묶음에 다시 배정되며, 그 이미지를 거쳐 합쳐졌던 묶음은 나누지 않습니다.
+
+    Returns:
+        int: 새로 기록한 서명 수
+    """
+    items = [(image_path, list(dict.fromkeys(tags))) for image_path, tags in items]
+    existing = {}
+    paths = [image_path for image_path, _ in items]
+    for start in range(0, len(paths), BULK_CHUNK):
+        chunk = paths[start:start + BULK_CHUNK]
+        existing.update((row[0], row[1:]) for row in conn.execute(
+            "SELECT image_path, id, prompt_key, signature FROM prompt_signatures "
+            f"WHERE image_path IN ({', '.join('?' * len(chunk))})", chunk))
+
+    pending = []
+    for image_path, tags in items:
+        key = prompt_key(tags) if tags else None
+        old = existing.get(image_path)
+        if old is not None:
+            if old[1] == key:
+                continue
+            _remove(conn, *old)
+        if tags:
+            pending.append((image_path, tags, key))
+    if not pending:
+        return 0
+
+    signatures = minhash_signatures([tags for _, tags, _ in pending])
+    for (image_path, _, key), signature in zip(pending, signatures):
+        signature_id = conn.execute(INSERT_SIGNATURE_SQL, (image_path, key, signature.tobytes())).lastrowid
+        twin = conn.execute("SELECT cluster_id FROM prompt_signatures WHERE prompt_key = ? AND id != ? LIMIT 1",
+                            (key, signature_id)).fetchone()
+        if twin is not None:
+            cluster_id = twin[0] # 이미 같은 태그 집합이 있으면 버킷을 찾을 필요 없음
+        else:
+            bands = band_keys(signature)
+            cluster_id = _find_cluster(conn, signature, bands) or signature_id
+            conn.executemany(INSERT_BUCKET_SQL, [(band, bucket, signature_id) for band, bucket in bands])
+        conn.execute("UPDATE prompt_signatures SET cluster_id = ? WHERE id = ?", (cluster_id, signature_id))
+    return len(pending)
+
+
+def rebuild_signatures(conn) -> int:
+    """prompt_tags 테이블로 모든 서명과 LSH 버킷을 다시 만듭니다. 호출한 쪽의 트랜잭션 안에서 실행됩니다."""
+    conn.execute("DELETE FROM lsh_buckets")
+    conn.execute("DELETE FROM prompt_signatures")
+    written = 0
+    batch, current, tags = [], None, []
+    for image_path, tag in conn.execute("SELECT image_path, tag FROM prompt_tags ORDER BY image_path"):
+        if image_path != current:
+            if current is not None:
+                batch.append((current, tags))
+            current, tags = image_path, []
+        tags.append(tag)
+        if len(batch) >= BULK_CHUNK:
+            written += update_signatures(conn, batch)
+            batch = []
+    if current is not None:
+        batch.append((current, tags))
+    return written + update_signatures(conn, batch)
+
+
+def _cluster_ids(conn, image_paths) -> dict:
+    cluster_of = {}
+    for start in range(0, len(image_paths), BULK_CHUNK):
+        chunk = image_paths[start:start + BULK_CHUNK]
+        cluster_of.update(conn.execute(
+            f"SELECT image_path, cluster_id FROM prompt_signatures WHERE image_path IN ({', '.join('?' * len(chunk))})",
+            chunk).fetchall())
+    return cluster_of
+
+
+def group_duplicates(image_paths) -> list:
+    """
+    경로들을 중복 묶음별 리스트로 나눕니다. 묶음과 묶음 안의 순서는 입력 순서를 따르며,
+    아직 인덱싱되지 않았거나 태그가 없는 이미지는 혼자 한 묶음이 됩니다.
+    """
+    image_paths = list(dict.fromkeys(image_paths))
+    cluster_of = _cluster_ids(get_db_connection(), image_paths)
+    groups = {}
+    for image_path in image_paths:
+        groups.setdefault(cluster_of.get(image_path, image_path), []).append(image_path)
+    return list(groups.values())
+
+
+def collapse_duplicates(image_paths):
+    """
+    재생성 묶음마다 첫 이미지만 남깁니다.
+
+    Returns:
+        tuple: (대표 경로 리스트, {대표 경로: 묶음의 이미지 수})
+    """
+    groups = group_duplicates(image_paths)
+    return [group[0] for group in groups], {group[0]: len(group) for group in groups}
+
+
+def find_duplicates(image_path: str, exact: bool = False) -> list:
+    """
+    이미지와 같은 묶음에 속한 다른 이미지 경로들을 반환합니다.
+    exact=True면 태그 집합이 완전히 같은 이미지만 찾습니다.
+    """
+    column = "prompt_key" if exact else "cluster_id"
+    conn = get_db_connection()
+    return [row[0] for row in conn.execute(
+        f"SELECT image_path FROM prompt_signatures WHERE {column} = "
+        f"(SELECT {column} FROM prompt_signatures WHERE image_path = ?) AND image_path != ? ORDER BY id",
+        (image_path, image_path))]
+
+
+def reuse_classification(result: dict, prompt: str):
+    """
+    같은 묶음의 다른 이미지가 받은 분류 결과를 이 프롬프트의 원문 태그에 적용합니다.
+    프롬프트의 모든 태그가 그 결과에 있으면 분류 결과를, 하나라도 새 태그가 있으면 None을 반환합니다.
+    """
+    from src.prompt_classifier.classifier_backends import CATEGORIES, assemble_result
+
+    labels = {}
+    for category, tags in result.items():
+        if category in CATEGORIES and isinstance(tags, list):
+            for tag in tags:
+                name = normalize_tag(tag)[0]
+                if name:
+                    labels.setdefault(name, (category, 1.0))
+    raw_tags = split_tags(prompt)
+    normalized_of = {raw_tag: normalize_tag(raw_tag)[0] for raw_tag in raw_tags}
+    if any(name and name not in labels for name in normalized_of.values()):
+        return None
+    return assemble_result(raw_tags, normalized_of, labels)
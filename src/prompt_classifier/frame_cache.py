@@ -0,0 +1,154 @@
+# src/prompt_classifier/frame_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+from PyQt6.QtGui import QImage, QImageIOHandler, QImageReader
+from PyQt6.QtCore import Qt, QSize
+
+DEFAULT_BUDGET_MB = 256 # VIEWER_CACHE_MB 환경 변수로 변경
+
+
+def decode_frame(image_path: str, max_size: QSize):
+    """
+    이미지를 max_size 안에 들어가도록 축소해서 디코딩합니다. 원본이 더 작으면 그대로 둡니다.
+    JPEG처럼 디코더가 축소 디코딩을 지원하면 전체 해상도로 풀지 않습니다.
+    PNG 등은 전체 해상도로 푼 뒤 부드럽게 축소하므로 GUI 스레드에서 부르지 말고 FramePrefetcher 스레드 풀에 맡깁니다.
+
+    Returns:
+        QImage: 읽을 수 없으면 None
+    """
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True) # EXIF 회전 반영
+    source_size = reader.size()
+    if source_size.isValid() and reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize) \
+            and (source_size.width() > max_size.width() or source_size.height() > max_size.height()):
+        reader.setScaledSize(source_size.scaled(max_size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    if image.width() > max_size.width() or image.height() > max_size.height():
+        image = image.scaled(max_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+class FrameCache:
+    """
+    뷰어용으로 디코딩/축소해 둔 이미지(QImage)를 메모리에 보관하는 LRU 캐시입니다.
+    원본 경로 + mtime + 파일 크기 + 축소 크기로 키를 만들며, 보관한 이미지의 바이트 합이
+    예산을 넘으면 가장 오래 사용되지 않은 것부터 버립니다. 여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, budget_bytes: int = None):
+        if budget_bytes is None:
+            budget_bytes = int(float(os.getenv("VIEWER_CACHE_MB", DEFAULT_BUDGET_MB)) * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._frames = OrderedDict() # 키 -> QImage (최근 사용한 것이 끝)
+        self._total_bytes = 0
+        self._decoding = {} # 디코딩 중인 키 -> 끝나면 set되는 Event
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(image_path: str, max_size: QSize):
+        """파일이 없으면 None."""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return (image_path, stat.st_mtime_ns, stat.st_size, max_size.width(), max_size.height())
+
+    def get(self, image_path: str, max_size: QSize):
+        """캐시된 이미지를 반환합니다. 없으면 None."""
+        key = self.cache_key(image_path, max_size)
+        with self._lock:
+            image = self._frames.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def contains(self, image_path: str, max_size: QSize) -> bool:
+        key = self.cache_key(image_path, max_size)
+        with self._lock:
+            return key in self._frames
+
+    def put(self, image_path: str, max_size: QSize, image: QImage):
+        key = self.cache_key(image_path, max_size)
+        size = image.sizeInBytes()
+        if key is None or size > self.budget_bytes:
+            return
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old.sizeInBytes()
+            self._frames[key] = image
+            self._total_bytes += size
+            while self._total_bytes > self.budget_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self._total_bytes -= evicted.sizeInBytes()
+
+    def get_or_decode(self, image_path: str, max_size: QSize, record_stats: bool = True):
+        """
+        캐시된 이미지를 반환하고, 없으면 디코딩해서 캐시에 넣은 뒤 반환합니다. 읽을 수 없으면 None.
+        다른 스레드가 같은 이미지를 디코딩하는 중이면 새로 읽지 않고 끝나기를 기다립니다.
+
+        Args:
+            record_stats (bool): False면 적중/실패 통계에 세지 않음 (미리 읽기용)
+        """
+        key = self.cache_key(image_path, max_size)
+        if key is None:
+            return None
+        with self._lock:
+            image = self._frames.get(key)
+            if image is not None:
+                self._frames.move_to_end(key)
+                self.hits += record_stats
+                return image
+            self.misses += record_stats
+            pending = self._decoding.get(key)
+            if pending is None:
+                pending = self._decoding[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            pending.wait()
+            with self._lock:
+                image = self._frames.get(key)
+            # 디코딩에 실패했거나 그사이 캐시에서 밀려났으면 직접 읽음
+            return image if image is not None else decode_frame(image_path, max_size)
+
+        try:
+            image = decode_frame(image_path, max_size)
+            if image is not None:
+                self.put(image_path, max_size, image)
+        finally:
+            with self._lock:
+                self._decoding.pop(key, None)
+            pending.set()
+        return image
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"frames": len(self._frames), "bytes": self._total_bytes, "budget_bytes": self.budget_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+_shared_cache = None
+
+def get_frame_cache() -> FrameCache:
+    """앱 전체에서 공유하는 뷰어 이미지 캐시를 반환합니다."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = FrameCache()
+    return _shared_cache
@@ -1,38 +1,20 @@
 # src/prompt_classifier/gemini_classifier.py
 
-import os
 import json
-import google.generativeai as genai
-from src.prompt_classifier.utils import load_api_key
+import math
+import threading
+import time
+from src.prompt_classifier.gemini_client import GeminiClassifierService
+from src.prompt_classifier.tag_utils import split_tags
 
-def preprocess_prompt(raw_prompt: str) -> str:
-    """API에 보내기 전 프롬프트를 전처리합니다."""
-    tags = [tag.strip() for tag in raw_prompt.split(',') if tag.strip()]
-    unique_tags = list(dict.fromkeys(tags))
-    return ", ".join(unique_tags)
-
-def classify_prompt_with_gemini(prompt: str, model_name: str = "gemini-1.5-flash") -> dict:
-    """
-    주어진 프롬프트를 Gemini API를 사용하여 분류하고 결과를 JSON(dict)으로 반환합니다.
-    """
-    try:
-        api_key = load_api_key()
-        genai.configure(api_key=api_key)
-    except ValueError as e:
-        print(f"API 키 로딩 오류: {e}")
-        return {"error": str(e)}
+DEFAULT_MODEL = "gemini-1.5-flash"
 
-    generation_config = {
-        "response_mime_type": "application/json",
-        "temperature": 0.0,
-    }
+CATEGORIES = (
+    "style_artist", "quality_rendering", "subject", "body_appearance", "pose_gaze",
+    "clothing_accessories", "action_situation", "background_props", "technical_elements",
+)
 
-    model = genai.GenerativeModel(
-        model_name,
-        generation_config=generation_config
-    )
-
-    instruction_prompt = """
+INSTRUCTION_PROMPT = """
     You are an expert AI specializing in classifying image generation prompt tags.
     Your task is to classify a given list of comma-separated tags into 9 distinct categories.
     You must follow a strict two-step process:
@@ -61,11 +43,232 @@ def classify_prompt_with_gemini(prompt: str, model_name: str = "gemini-1.5-flash
     Now, analyze the following prompt and provide only the final JSON output.
     """
 
+BATCH_INSTRUCTION = """
+    # BATCH MODE:
+    The input is a JSON array of objects, each with an "id" and a "prompt".
+    Classify every prompt independently using the rules above.
+    Return ONLY a JSON array with exactly one object per input item, in the form
+    {"id": "<the same id>", "style_artist": [...], "quality_rendering": [...], ..., "technical_elements": [...]}.
+    Every object must contain all 9 category keys (use an empty list when no tag fits).
+    """
+
+# 배치 크기 조절용 추정치 (태그 프롬프트는 대략 3~4글자당 1토큰)
+CHARS_PER_TOKEN = 3.5
+MAX_BATCH_INPUT_TOKENS = 6000   # 한 요청에 담을 프롬프트 토큰 상한
+MAX_BATCH_OUTPUT_TOKENS = 7000  # 응답(JSON)은 입력 태그를 다시 나열하므로 입력보다 약간 큼
+OUTPUT_TOKEN_RATIO = 1.5
+MAX_BATCH_ITEMS = 50
+MAX_BATCH_RETRIES = 2
+
+GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "temperature": 0.0,
+}
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def preprocess_prompt(raw_prompt: str) -> str:
+    """API에 보내기 전 프롬프트를 전처리합니다. (가중치 구문은 유지한 채 중복 태그 제거)"""
+    return ", ".join(split_tags(raw_prompt))
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 글자 수로 대략 추정합니다."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def get_service(model_name: str = DEFAULT_MODEL) -> GeminiClassifierService:
+    """
+    모델별로 한 번만 만든 분류 서비스를 반환합니다. 분류 지시문은 서비스의 시스템 지시문으로 고정됩니다.
+    API 키가 없으면 ValueError가 발생하며, 이 경우 다음 호출에서 다시 시도합니다.
+    """
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = GeminiClassifierService(model_name, system_instruction=INSTRUCTION_PROMPT,
+                                              generation_config=GENERATION_CONFIG)
+            _services[model_name] = service
+        return service
+
+def close_services():
+    """만들어 둔 서비스의 컨텍스트 캐시를 정리합니다. 프로그램 종료 시 호출합니다."""
+    with _services_lock:
+        for service in _services.values():
+            service.close()
+        _services.clear()
+
+def validate_classification(data) -> dict:
+    """
+    분류 결과가 9개 카테고리의 문자열 리스트로 이루어졌는지 검사하고 정리된 사전을 반환합니다.
+    빠진 카테고리는 빈 리스트로 채우며, 형식이 맞지 않으면 None을 반환합니다.
+    """
+    if not isinstance(data, dict):
+        return None
+    result = {}
+    for key in CATEGORIES:
+        tags = data.get(key, [])
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            return None
+        result[key] = tags
+    return result
+
+def classify_prompt_with_gemini(prompt: str, model_name: str = DEFAULT_MODEL) -> dict:
+    """
+    주어진 프롬프트를 Gemini API를 사용하여 분류하고 결과를 JSON(dict)으로 반환합니다.
+    """
+    try:
+        service = get_service(model_name)
+    except ValueError as e:
+        print(f"API 키 로딩 오류: {e}")
+        return {"error": str(e)}
+
     processed_prompt = preprocess_prompt(prompt)
 
     try:
-        response = model.generate_content([instruction_prompt, processed_prompt])
+        response = service.generate([processed_prompt])
         return json.loads(response.text)
     except Exception as e:
         print(f"API 호출 중 오류 발생: {e}")
-        return {"error": f"API Error: {e}"}
\ No newline at end of file
+        return {"error": f"API Error: {e}"}
+
+async def classify_prompt_async(prompt: str, service: GeminiClassifierService) -> dict:
+    """
+    비동기 API로 프롬프트 하나를 분류합니다. 작업 큐에서 재시도 여부를 판단할 수 있도록
+    오류를 사전으로 바꾸지 않고 그대로 발생시킵니다.
+
+    Raises:
+        ValueError: 응답이 올바른 분류 결과가 아닐 때
+    """
+    response = await service.generate_async([preprocess_prompt(prompt)])
+    result = validate_classification(json.loads(response.text))
+    if result is None:
+        raise ValueError("응답이 올바른 분류 결과 형식이 아닙니다.")
+    return result
+
+def split_into_batches(items, max_input_tokens=MAX_BATCH_INPUT_TOKENS,
+                       max_output_tokens=MAX_BATCH_OUTPUT_TOKENS, max_items=MAX_BATCH_ITEMS):
+    """
+    (id, 프롬프트) 목록을 추정 입력/출력 토큰과 항목 수 상한을 넘지 않도록 나눕니다.
+    """
+    batches, current, current_tokens = [], [], 0
+    for item_id, prompt in items:
+        tokens = estimate_tokens(prompt) + 10 # id와 JSON 구문 몫
+        too_big = (current_tokens + tokens > max_input_tokens
+                   or (current_tokens + tokens) * OUTPUT_TOKEN_RATIO > max_output_tokens
+                   or len(current) >= max_items)
+        if current and too_big:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((item_id, prompt))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def _request_batch(service, batch):
+    """
+    배치 하나를 요청하고 {id: 검증된 분류 결과}를 반환합니다.
+    응답 전체를 해석할 수 없으면 예외가 발생합니다.
+    """
+    payload = json.dumps([{"id": item_id, "prompt": prompt} for item_id, prompt in batch], ensure_ascii=False)
+    response = service.generate([BATCH_INSTRUCTION, payload])
+    data = json.loads(response.text)
+    if isinstance(data, dict):
+        # 배열 대신 {id: 결과} 객체로 돌려준 경우도 허용
+        data = [dict(value, id=key) for key, value in data.items() if isinstance(value, dict)]
+    if not isinstance(data, list):
+        raise ValueError("배치 응답이 JSON 배열이 아닙니다.")
+
+    expected = {item_id for item_id, _ in batch}
+    results = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        item_id = str(entry.get("id"))
+        if item_id not in expected or item_id in results:
+            continue
+        classification = validate_classification({key: value for key, value in entry.items() if key != "id"})
+        if classification is not None:
+            results[item_id] = classification
+    return results
+
+def classify_prompts_batch(prompts: dict, model_name: str = DEFAULT_MODEL,
+                           max_input_tokens: int = MAX_BATCH_INPUT_TOKENS,
+                           max_retries: int = MAX_BATCH_RETRIES) -> dict:
+    """
+    여러 프롬프트를 요청 하나에 묶어 분류합니다.
+
+    Args:
+        prompts (dict): {항목 id: 프롬프트}
+        max_input_tokens (int): 요청 하나에 담을 프롬프트의 추정 토큰 상한
+        max_retries (int): 검증에 실패한 항목만 다시 요청하는 최대 횟수.
+            할당량 초과나 네트워크 오류면 지수 백오프 후 다시 요청하고, 인증 오류처럼 재시도할 수 없는 오류면 바로 중단합니다.
+
+    Returns:
+        dict: {항목 id: 분류 결과 dict}. 끝내 실패한 항목은 {"error": ...} 값을 가집니다.
+    """
+    from src.prompt_classifier.classification_queue import backoff_delay, is_retryable
+    try:
+        service = get_service(model_name)
+    except ValueError as e:
+        print(f"API 키 로딩 오류: {e}")
+        return {item_id: {"error": str(e)} for item_id in prompts}
+
+    pending = [(str(item_id), preprocess_prompt(prompt)) for item_id, prompt in prompts.items()]
+    id_map = {str(item_id): item_id for item_id in prompts}
+    results = {}
+    errors = {}
+    request_count = 0
+    sent_tokens = 0
+    retry_delay = 0 # 재시도할 수 있는 API 오류 뒤 다음 시도 전에 기다릴 시간(초)
+
+    stop = False
+    for attempt in range(max_retries + 1):
+        if not pending or stop:
+            break
+        if retry_delay:
+            time.sleep(retry_delay)
+        failed = []
+        retry_delay = 0
+        # 재시도할수록 배치를 작게 만들어 잘린 응답이나 누락 가능성을 줄임
+        queue = split_into_batches(pending, max_input_tokens=max(500, max_input_tokens >> attempt))
+        while queue:
+            batch = queue.pop(0)
+            request_count += 1
+            sent_tokens += estimate_tokens(INSTRUCTION_PROMPT + BATCH_INSTRUCTION) + sum(
+                estimate_tokens(prompt) for _, prompt in batch)
+            try:
+                batch_results = _request_batch(service, batch)
+            except ValueError as e:
+                if len(batch) > 1:
+                    # 응답이 잘리거나 JSON이 깨진 경우만 반으로 나눠 다시 시도
+                    middle = len(batch) // 2
+                    queue[:0] = [batch[:middle], batch[middle:]]
+                else:
+                    errors[batch[0][0]] = f"API Error: {e}"
+                    failed.extend(batch)
+                continue
+            except Exception as e:
+                # 할당량 초과/인증/네트워크 오류는 나눠 보내도 똑같이 실패하므로 남은 배치를 보내지 않음
+                remaining = batch + [item for queued in queue for item in queued]
+                for item_id, _ in remaining:
+                    errors[item_id] = f"API Error: {e}"
+                failed.extend(remaining)
+                if is_retryable(e):
+                    retry_delay = backoff_delay(attempt)
+                else:
+                    stop = True
+                break
+            results.update(batch_results)
+            for item_id, prompt in batch:
+                if item_id not in batch_results:
+                    errors[item_id] = "응답에 유효한 분류 결과가 없습니다."
+                    failed.append((item_id, prompt))
+        pending = failed
+
+    print(f"배치 분류 완료: 프롬프트 {len(prompts)}개, 요청 {request_count}회, "
+          f"전송 약 {sent_tokens} 토큰, 실패 {len(pending)}개")
+    output = {id_map[item_id]: result for item_id, result in results.items()}
+    for item_id, _ in pending:
+        output[id_map[item_id]] = {"error": errors.get(item_id, "분류 실패")}
+    return output
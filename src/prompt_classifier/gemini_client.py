@@ -1,13 +1,173 @@
+# src/prompt_classifier/gemini_client.py
+
+import asyncio
+import datetime
+import os
+import statistics
+import threading
+import time
+from collections import deque
+
 import google.generativeai as genai
+from google.generativeai import caching
+
+from src.prompt_classifier.utils import load_api_key
+
+CONTEXT_CACHE_TTL_SEC = 3600
+LATENCY_SAMPLES = 10000 # 지연 시간 백분위 계산에 보관할 최근 호출 수
+# Gemini 1.5의 컨텍스트 캐시 최소 크기. 이보다 확실히 작은 지시문은 만들기 요청을 보내지 않음
+MIN_CONTEXT_CACHE_TOKENS = 32768
+# 컨텍스트 캐시는 버전이 명시된 모델 이름에서만 만들 수 있음
+VERSIONED_MODELS = {
+    "gemini-1.5-flash": "gemini-1.5-flash-002",
+    "gemini-1.5-pro": "gemini-1.5-pro-002",
+}
+
+
+class GeminiClassifierService:
+    """
+    API 키 로딩, genai.configure, 모델 생성을 한 번만 하고 모든 호출에서 재사용하는 장기 실행 클라이언트입니다.
+    genai는 configure할 때마다 내부 클라이언트(gRPC 채널)를 새로 만들기 때문에, 호출마다 설정하면
+    연결을 매번 다시 맺게 됩니다.
+
+    고정된 시스템 지시문은 먼저 Gemini 컨텍스트 캐시로 올려 보고, 실패하면(지시문이 최소 캐시 크기보다
+    작거나 모델이 지원하지 않는 경우) 모델의 system_instruction으로 둡니다. 어느 쪽이든 호출할 때는
+    프롬프트만 보냅니다.
+
+    Args:
+        endpoint (str): API 엔드포인트 재정의 (예: 테스트용 로컬 서버). 없으면 GEMINI_API_ENDPOINT 환경 변수.
+        transport (str): 'grpc' 또는 'rest'. 없으면 GEMINI_TRANSPORT 환경 변수, 그것도 없으면 genai 기본값.
+    """
+
+    def __init__(self, model_name: str, system_instruction: str = None, generation_config: dict = None,
+                 api_key: str = None, endpoint: str = None, transport: str = None,
+                 use_context_cache: bool = True, cache_ttl_sec: int = CONTEXT_CACHE_TTL_SEC):
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config or {}
+        self.endpoint = endpoint or os.getenv("GEMINI_API_ENDPOINT")
+        self.transport = transport or os.getenv("GEMINI_TRANSPORT")
+        self.instruction_mode = None # 'context_cache' / 'system_instruction' / None
+        self.cached_content = None
+        self._lock = threading.Lock()
+        self._async_loop = None # 비동기 호출 전용 이벤트 루프 (처음 비동기 호출할 때 시작)
+        self._async_thread = None
+        self._stats = {"calls": 0, "errors": 0, "total_sec": 0.0}
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+        start = time.perf_counter()
+        options = {"api_key": api_key or load_api_key()}
+        if self.endpoint:
+            options["client_options"] = {"api_endpoint": self.endpoint}
+        if self.transport:
+            options["transport"] = self.transport
+        genai.configure(**options)
+        self.model = self._create_model(use_context_cache, cache_ttl_sec)
+        self.setup_sec = time.perf_counter() - start
+
+    def _create_model(self, use_context_cache, cache_ttl_sec):
+        if not self.system_instruction:
+            return genai.GenerativeModel(self.model_name, generation_config=self.generation_config)
+
+        # 대략 4글자당 1토큰으로 추정
+        if use_context_cache and not self.endpoint and len(self.system_instruction) // 4 >= MIN_CONTEXT_CACHE_TOKENS:
+            try:
+                self.cached_content = caching.CachedContent.create(
+                    model=VERSIONED_MODELS.get(self.model_name, self.model_name),
+                    display_name="prompt-classifier-instruction",
+                    system_instruction=self.system_instruction,
+                    ttl=datetime.timedelta(seconds=cache_ttl_sec),
+                )
+                self.instruction_mode = "context_cache"
+                return genai.GenerativeModel.from_cached_content(
+                    self.cached_content, generation_config=self.generation_config)
+            except Exception as e:
+                print(f"컨텍스트 캐시를 사용할 수 없어 system_instruction으로 설정합니다: {e}")
+
+        self.instruction_mode = "system_instruction"
+        return genai.GenerativeModel(self.model_name, generation_config=self.generation_config,
+                                     system_instruction=self.system_instruction)
+
+    def _record(self, start, failed=False):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["total_sec"] += elapsed
+            self._latencies.append(elapsed)
+            if failed:
+                self._stats["errors"] += 1
+
+    def generate(self, contents):
+        """시스템 지시문을 뺀 나머지 내용만 보내 응답을 받습니다. 오류는 그대로 발생합니다."""
+        start = time.perf_counter()
+        try:
+            response = self.model.generate_content(contents)
+        except Exception:
+            self._record(start, failed=True)
+            raise
+        self._record(start)
+        return response
+
+    async def generate_async(self, contents):
+        """generate의 비동기 버전입니다."""
+        if self.transport == "rest":
+            # genai의 REST 전송은 비동기 클라이언트를 지원하지 않으므로 동기 호출을 스레드에서 실행
+            return await asyncio.to_thread(self.generate, contents)
+        start = time.perf_counter()
+        try:
+            # 비동기 gRPC 채널은 처음 만든 이벤트 루프에 묶이므로, 호출한 쪽의 루프(asyncio.run 재호출 등)와
+            # 상관없이 항상 서비스가 가진 하나의 루프에서 실행
+            future = asyncio.run_coroutine_threadsafe(
+                self.model.generate_content_async(contents), self._service_loop())
+            response = await asyncio.wrap_future(future)
+        except Exception:
+            self._record(start, failed=True)
+            raise
+        self._record(start)
+        return response
+
+    def _service_loop(self):
+        """비동기 호출을 실행할 장기 실행 이벤트 루프를 반환합니다. 없으면 전용 스레드에서 시작합니다."""
+        with self._lock:
+            if self._async_loop is None:
+                self._async_loop = asyncio.new_event_loop()
+                self._async_thread = threading.Thread(target=self._async_loop.run_forever,
+                                                      name="gemini-async", daemon=True)
+                self._async_thread.start()
+            return self._async_loop
+
+    def call_stats(self) -> dict:
+        """지금까지의 호출 수, 오류 수, 평균/p50/p95 호출 시간(초)과 최초 설정에 걸린 시간을 반환합니다."""
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = list(self._latencies)
+        stats["mean_sec"] = stats["total_sec"] / stats["calls"] if stats["calls"] else 0.0
+        if len(latencies) >= 2:
+            percentiles = statistics.quantiles(latencies, n=100)
+            stats["p50_sec"], stats["p95_sec"] = percentiles[49], percentiles[94]
+        else:
+            stats["p50_sec"] = stats["p95_sec"] = latencies[0] if latencies else 0.0
+        stats["setup_sec"] = self.setup_sec
+        stats["instruction_mode"] = self.instruction_mode
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {"calls": 0, "errors": 0, "total_sec": 0.0}
+            self._latencies.clear()
 
-class GeminiClient:
-    def __init__(self, api_key):
-        self.api_key = api_key
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
-
-    def classify_prompt(self, prompt: str) -> str:
-        # This is a placeholder for the actual classification logic.
-        # You would typically send a request to the Gemini API here.
-        response = self.model.generate_content(f"Classify the following prompt: {prompt}")
-        return response.text
+    def close(self):
+        """컨텍스트 캐시를 만료 전에 지우고 비동기 호출용 이벤트 루프를 멈춥니다. (캐시는 보관 시간만큼 과금되므로 종료 시 호출)"""
+        with self._lock:
+            loop, thread = self._async_loop, self._async_thread
+            self._async_loop = self._async_thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        if self.cached_content is not None:
+            try:
+                self.cached_content.delete()
+            except Exception as e:
+                print(f"컨텍스트 캐시 삭제 중 오류 발생: {e}")
+            self.cached_content = None
@@ -0,0 +1,279 @@
+# src/prompt_classifier/generation_params.py
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+# <lora:이름:가중치>, <lyco:...>, <hypernet:...>
+LORA_PATTERN = re.compile(r'<\s*(lora|lyco|hypernet)\s*:\s*([^:>]+?)\s*(?::\s*([^>]*?)\s*)?>', re.IGNORECASE)
+# 괄호 그룹 끝의 명시적 가중치 (예: 'blue eyes:1.2')
+EXPLICIT_WEIGHT_PATTERN = re.compile(r'^(.*?)\s*:\s*(-?\d+(?:\.\d+)?)\s*$', re.DOTALL)
+# A1111 설정 줄의 'Key: value' 쌍 (값은 따옴표로 감싸 쉼표를 포함할 수 있음)
+SETTING_PATTERN = re.compile(r'\s*([\w ./-]+):\s*("(?:\\.|[^\\"])+"|[^,]*)(?:,|$)')
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+BRACKET_WEIGHTS = {'(': 1.1, '[': 1 / 1.1, '{': 1.05} # A1111 기준, {}는 NovelAI 강조
+SEPARATORS = {',', '\n'}
+
+
+class Tag(NamedTuple):
+    """정규화된 태그 이름과 괄호/명시적 가중치를 곱한 최종 가중치"""
+    name: str
+    weight: float
+
+
+class Lora(NamedTuple):
+    kind: str     # lora / lyco / hypernet
+    name: str
+    weight: float
+
+
+@dataclass(slots=True)
+class GenerationParams:
+    """이미지 하나의 생성 정보를 한 번에 파싱한 결과입니다."""
+    source: str                      # 'a1111', 'comfyui', 'novelai'
+    positive_prompt: str = ""
+    negative_prompt: str = ""
+    positive_tags: list = field(default_factory=list)   # [Tag, ...]
+    negative_tags: list = field(default_factory=list)   # [Tag, ...]
+    loras: list = field(default_factory=list)           # [Lora, ...]
+    settings: dict = field(default_factory=dict)        # Steps, Sampler, CFG scale, Seed, Model hash 등
+
+    def settings_text(self) -> str:
+        """설정을 A1111의 'Key: value, ...' 형식 문자열로 만듭니다."""
+        # 쉼표가 들어간 값은 A1111과 같이 따옴표로 감쌈
+        return ", ".join(f'{key}: "{value}"' if ',' in value else f"{key}: {value}"
+                         for key, value in self.settings.items())
+
+
+def normalize_tag_name(text: str) -> str:
+    """태그 이름을 소문자, 공백 정리, 밑줄->공백 규칙으로 정규화합니다."""
+    text = text.replace('_', ' ')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def _to_float(value, default=1.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _parse_group(text, pos, closer, tags):
+    """
+    text[pos:]를 closer가 나올 때까지 읽어 [이름, 가중치] 태그를 tags에 추가합니다.
+    그룹의 명시적 가중치(없으면 None)와 다음 읽을 위치를 반환합니다.
+    """
+    buf = []
+    explicit_weight = None
+
+    def flush(at_close=False):
+        nonlocal explicit_weight
+        fragment = ''.join(buf)
+        buf.clear()
+        if at_close:
+            # '(a, b:1.2)'처럼 그룹 마지막 조각의 ':숫자'는 그룹 전체의 가중치
+            match = EXPLICIT_WEIGHT_PATTERN.match(fragment)
+            if match:
+                fragment, explicit_weight = match.group(1), float(match.group(2))
+        name = normalize_tag_name(fragment)
+        if name:
+            tags.append([name, 1.0])
+
+    length = len(text)
+    while pos < length:
+        ch = text[pos]
+        if ch == '\\' and pos + 1 < length:
+            buf.append(text[pos + 1]) # \( \) 같은 이스케이프 문자는 글자 그대로
+            pos += 2
+            continue
+        if ch in OPENERS:
+            flush()
+            group_start = len(tags)
+            group_weight, pos = _parse_group(text, pos + 1, OPENERS[ch], tags)
+            if group_weight is None:
+                group_weight = BRACKET_WEIGHTS[ch]
+            for tag in tags[group_start:]:
+                tag[1] *= group_weight
+            continue
+        if ch == closer:
+            flush(at_close=True)
+            return explicit_weight, pos + 1
+        if ch in SEPARATORS:
+            flush()
+        elif ch not in ')]}': # 짝이 맞지 않는 닫는 괄호는 무시
+            buf.append(ch)
+        pos += 1
+
+    # 닫히지 않은 그룹은 끝에서 닫힌 것으로 간주
+    flush(at_close=closer is not None)
+    return explicit_weight, pos
+
+
+def parse_prompt(prompt: str):
+    """
+    프롬프트를 한 번 훑어 (태그 목록, LoRA 목록)을 반환합니다.
+    (x:1.2), ((x)), [x], {x} 의 중첩 가중치를 곱해서 계산하고, 같은 태그는 처음 것만 남깁니다.
+    """
+    if not prompt:
+        return [], []
+
+    loras = []
+    def take_lora(match):
+        kind, name, weight = match.groups()
+        loras.append(Lora(kind.lower(), name.strip(), _to_float(weight)))
+        return ','
+
+    text = LORA_PATTERN.sub(take_lora, prompt)
+    text = re.sub(r'\bBREAK\b', ',', text) # A1111의 청크 구분 키워드
+
+    raw_tags = []
+    _parse_group(text, 0, None, raw_tags)
+
+    tags = {}
+    for name, weight in raw_tags:
+        tags.setdefault(name, Tag(name, round(weight, 4)))
+    return list(tags.values()), loras
+
+
+def parse_settings(text: str) -> dict:
+    """A1111의 'Steps: 20, Sampler: Euler a, ...' 설정 줄을 사전으로 파싱합니다."""
+    settings = {}
+    for key, value in SETTING_PATTERN.findall(text or ""):
+        value = value.strip()
+        if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+            value = value[1:-1]
+        if key.strip():
+            settings[key.strip()] = value
+    return settings
+
+
+def _build(source, positive_prompt, negative_prompt, settings, extra_loras=()):
+    positive_tags, loras = parse_prompt(positive_prompt)
+    negative_tags, _ = parse_prompt(negative_prompt)
+    return GenerationParams(
+        source=source,
+        positive_prompt=positive_prompt.strip(),
+        negative_prompt=negative_prompt.strip(),
+        positive_tags=positive_tags,
+        negative_tags=negative_tags,
+        loras=loras + list(extra_loras),
+        settings=settings,
+    )
+
+
+def parse_a1111(raw_info: str) -> GenerationParams:
+    """A1111/Forge 형식의 'parameters' 원문을 파싱합니다."""
+    positive_prompt, negative_prompt, settings_line = raw_info, "", ""
+
+    # 마지막 줄이 'Steps:'로 시작하면 설정 줄
+    lines = raw_info.rstrip().split('\n')
+    if len(lines) > 1 and lines[-1].lstrip().startswith('Steps:'):
+        settings_line = lines[-1]
+        positive_prompt = '\n'.join(lines[:-1])
+    elif 'Steps:' in raw_info:
+        positive_prompt, settings_line = raw_info.split('Steps:', 1)
+        settings_line = 'Steps:' + settings_line
+
+    neg_prompt_marker = "Negative prompt:"
+    if neg_prompt_marker in positive_prompt:
+        positive_prompt, negative_prompt = positive_prompt.split(neg_prompt_marker, 1)
+
+    return _build('a1111', positive_prompt, negative_prompt, parse_settings(settings_line))
+
+
+def _comfy_text(nodes, ref, depth=0):
+    """ComfyUI 노드 참조([노드 id, 출력 번호])를 따라가 프롬프트 텍스트를 찾습니다."""
+    if isinstance(ref, str):
+        return ref
+    if not isinstance(ref, list) or not ref or depth > 10:
+        return ""
+    node = nodes.get(str(ref[0]))
+    if not isinstance(node, dict):
+        return ""
+    inputs = node.get('inputs', {})
+    for key in ('text', 'text_g', 'text_l', 'prompt', 'string', 'conditioning', 'conditioning_1'):
+        if key in inputs:
+            text = _comfy_text(nodes, inputs[key], depth + 1)
+            if text:
+                return text
+    return ""
+
+
+def parse_comfyui(prompt_json: str) -> GenerationParams:
+    """ComfyUI가 PNG 'prompt' 청크에 저장하는 API 형식 워크플로 JSON을 파싱합니다."""
+    nodes = json.loads(prompt_json)
+    if not isinstance(nodes, dict):
+        raise ValueError("ComfyUI 프롬프트 형식이 아닙니다.")
+
+    positive_prompt, negative_prompt = "", ""
+    settings = {}
+    loras = []
+    for node_id, node in nodes.items():
+        if not isinstance(node, dict):
+            continue
+        class_type = node.get('class_type', '')
+        inputs = node.get('inputs', {})
+        if 'KSampler' in class_type and not positive_prompt:
+            positive_prompt = _comfy_text(nodes, inputs.get('positive'))
+            negative_prompt = _comfy_text(nodes, inputs.get('negative'))
+            for key, name in (('steps', 'Steps'), ('sampler_name', 'Sampler'), ('scheduler', 'Schedule type'),
+                              ('cfg', 'CFG scale'), ('seed', 'Seed'), ('noise_seed', 'Seed'),
+                              ('denoise', 'Denoising strength')):
+                if key in inputs and not isinstance(inputs[key], list):
+                    settings[name] = str(inputs[key])
+        elif class_type.startswith('CheckpointLoader') and 'ckpt_name' in inputs:
+            settings['Model'] = str(inputs['ckpt_name'])
+        elif class_type.startswith('LoraLoader') and 'lora_name' in inputs:
+            name = str(inputs['lora_name']).rsplit('.', 1)[0]
+            loras.append(Lora('lora', name, _to_float(inputs.get('strength_model'))))
+
+    if not positive_prompt:
+        # 샘플러를 찾지 못하면 텍스트 인코더 노드의 텍스트를 모두 긍정 프롬프트로 간주
+        texts = [node['inputs']['text'] for node in nodes.values()
+                 if isinstance(node, dict) and isinstance(node.get('inputs', {}).get('text'), str)]
+        positive_prompt = ", ".join(texts)
+
+    return _build('comfyui', positive_prompt, negative_prompt, settings, loras)
+
+
+def parse_novelai(comment_json: str, description: str = "") -> GenerationParams:
+    """NovelAI가 PNG 'Comment' 청크에 저장하는 JSON을 파싱합니다."""
+    comment = json.loads(comment_json)
+    if not isinstance(comment, dict):
+        raise ValueError("NovelAI Comment 형식이 아닙니다.")
+    positive_prompt = comment.get('prompt') or description or ""
+    negative_prompt = comment.get('uc') or ""
+    settings = {}
+    for key, name in (('steps', 'Steps'), ('sampler', 'Sampler'), ('scale', 'CFG scale'),
+                      ('seed', 'Seed'), ('noise_schedule', 'Schedule type'), ('strength', 'Denoising strength')):
+        if key in comment:
+            settings[name] = str(comment[key])
+    if 'width' in comment and 'height' in comment:
+        settings['Size'] = f"{comment['width']}x{comment['height']}"
+    return _build('novelai', positive_prompt, negative_prompt, settings)
+
+
+def parse_metadata_texts(texts: dict):
+    """
+    metadata_reader가 읽은 텍스트 사전에서 생성 정보를 찾아 파싱합니다.
+    A1111 'parameters'/UserComment, ComfyUI 'prompt', NovelAI 'Comment' 순서로 확인합니다.
+
+    Returns:
+        GenerationParams: 파싱 결과. 생성 정보가 없으면 None.
+    """
+    raw_info = texts.get('parameters') or texts.get('UserComment')
+    if raw_info:
+        return parse_a1111(raw_info)
+    try:
+        if texts.get('prompt'):
+            return parse_comfyui(texts['prompt'])
+        if texts.get('Comment'):
+            return parse_novelai(texts['Comment'], texts.get('Description', ""))
+    except ValueError:
+        # json.JSONDecodeError 포함: 다른 프로그램이 같은 키를 쓴 경우
+        pass
+    if texts.get('Description'):
+        return _build('novelai', texts['Description'], "", {})
+    return None
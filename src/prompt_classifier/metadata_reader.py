@@ -0,0 +1,198 @@
+# src/prompt_classifier/metadata_reader.py
+
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_TEXT_CHUNKS = (b'tEXt', b'zTXt', b'iTXt')
+PNG_STOP_CHUNKS = (b'IDAT', b'IEND') # 텍스트 청크는 보통 픽셀 데이터 앞에 있음
+MAX_TEXT_CHUNK = 16 * 1024 * 1024    # 비정상적으로 큰 청크는 읽지 않음
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_SOS = 0xDA
+JPEG_APP1 = 0xE1
+JPEG_COM = 0xFE
+EXIF_HEADER = b'Exif\x00\x00'
+EXIF_IFD_POINTER = 0x8769
+USER_COMMENT_TAG = 0x9286
+
+
+class MetadataError(ValueError):
+    """파일 구조가 예상과 달라 메타데이터를 읽을 수 없을 때 발생합니다."""
+
+
+def read_png_text_chunks(image_path: str) -> dict:
+    """
+    PNG 파일의 tEXt/zTXt/iTXt 청크를 픽셀 데이터를 풀지 않고 읽습니다.
+    첫 IDAT 청크를 만나면 멈춥니다.
+
+    Returns:
+        dict: 키워드 -> 텍스트
+    """
+    texts = {}
+    with open(image_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise MetadataError("PNG 시그니처가 아닙니다.")
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type in PNG_STOP_CHUNKS:
+                break
+            if chunk_type not in PNG_TEXT_CHUNKS or length > MAX_TEXT_CHUNK:
+                f.seek(length + 4, 1) # 데이터 + CRC 건너뛰기
+                continue
+            data = f.read(length)
+            f.seek(4, 1)
+            if len(data) < length:
+                raise MetadataError("PNG 청크가 잘렸습니다.")
+            keyword, text = _decode_png_text_chunk(chunk_type, data)
+            if keyword:
+                texts.setdefault(keyword, text)
+    return texts
+
+
+def _decode_png_text_chunk(chunk_type, data):
+    keyword, sep, rest = data.partition(b'\x00')
+    if not sep:
+        return None, None
+    keyword = keyword.decode('latin-1')
+
+    if chunk_type == b'tEXt':
+        return keyword, rest.decode('latin-1')
+    if chunk_type == b'zTXt':
+        # 압축 방식(1바이트) + zlib 데이터
+        return keyword, zlib.decompress(rest[1:]).decode('latin-1')
+
+    # iTXt: 압축 여부(1) + 압축 방식(1) + 언어 태그\0 + 번역된 키워드\0 + 텍스트
+    if len(rest) < 2:
+        return None, None
+    compressed = rest[0] == 1
+    _, _, rest = rest[2:].partition(b'\x00') # 언어 태그
+    _, _, text = rest.partition(b'\x00')     # 번역된 키워드
+    if compressed:
+        text = zlib.decompress(text)
+    return keyword, text.decode('utf-8', errors='replace')
+
+
+def read_jpeg_comments(image_path: str) -> dict:
+    """
+    JPEG 파일의 EXIF UserComment와 COM 세그먼트를 픽셀 데이터를 풀지 않고 읽습니다.
+    첫 SOS 세그먼트를 만나면 멈춥니다.
+
+    Returns:
+        dict: 'UserComment', 'Comment' 중 찾은 항목
+    """
+    texts = {}
+    with open(image_path, 'rb') as f:
+        if f.read(2) != JPEG_SOI:
+            raise MetadataError("JPEG 시그니처가 아닙니다.")
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2:
+                break
+            if marker[0] != 0xFF:
+                raise MetadataError("JPEG 마커가 올바르지 않습니다.")
+            marker_type = marker[1]
+            if marker_type == 0xFF: # 채움 바이트
+                f.seek(-1, 1)
+                continue
+            if marker_type == JPEG_SOS or marker_type == 0xD9:
+                break
+            if 0xD0 <= marker_type <= 0xD7 or marker_type == 0x01: # 길이가 없는 마커
+                continue
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                break
+            length = struct.unpack('>H', length_bytes)[0] - 2
+            if marker_type == JPEG_APP1 and 'UserComment' not in texts:
+                segment = f.read(length)
+                if segment.startswith(EXIF_HEADER):
+                    comment = _find_user_comment(segment[len(EXIF_HEADER):])
+                    if comment is not None:
+                        texts['UserComment'] = comment
+            elif marker_type == JPEG_COM and 'Comment' not in texts:
+                texts['Comment'] = f.read(length).decode('utf-8', errors='ignore').rstrip('\x00')
+            else:
+                f.seek(length, 1)
+    return texts
+
+
+def _find_user_comment(tiff: bytes):
+    """TIFF 구조의 EXIF 데이터에서 UserComment(0x9286) 값을 찾아 디코딩합니다."""
+    if len(tiff) < 8:
+        return None
+    byte_order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if byte_order is None:
+        return None
+
+    def read_ifd(offset):
+        if offset + 2 > len(tiff):
+            return {}
+        count = struct.unpack_from(byte_order + 'H', tiff, offset)[0]
+        entries = {}
+        for i in range(count):
+            entry_offset = offset + 2 + i * 12
+            if entry_offset + 12 > len(tiff):
+                break
+            tag, field_type, value_count, value = struct.unpack_from(byte_order + 'HHI4s', tiff, entry_offset)
+            entries[tag] = (field_type, value_count, value)
+        return entries
+
+    ifd0 = read_ifd(struct.unpack_from(byte_order + 'I', tiff, 4)[0])
+    if EXIF_IFD_POINTER not in ifd0:
+        return None
+    exif_offset = struct.unpack(byte_order + 'I', ifd0[EXIF_IFD_POINTER][2])[0]
+    exif_ifd = read_ifd(exif_offset)
+    if USER_COMMENT_TAG not in exif_ifd:
+        return None
+
+    _, value_count, value = exif_ifd[USER_COMMENT_TAG]
+    if value_count <= 4:
+        raw = value[:value_count]
+    else:
+        value_offset = struct.unpack(byte_order + 'I', value)[0]
+        raw = tiff[value_offset:value_offset + value_count]
+    return decode_user_comment(raw)
+
+
+def decode_user_comment(raw: bytes) -> str:
+    """
+    EXIF UserComment 값을 디코딩합니다. 앞 8바이트는 문자 코드 지정자입니다.
+    UNICODE는 UTF-16이며, 바이트 순서는 0바이트 위치로 판단합니다.
+    """
+    prefix, body = raw[:8], raw[8:]
+    if prefix.startswith(b'UNICODE'):
+        if len(body) >= 2 and body[0] == 0 and body[1] != 0:
+            encoding = 'utf-16-be'
+        elif len(body) >= 2 and body[1] == 0 and body[0] != 0:
+            encoding = 'utf-16-le'
+        else:
+            encoding = 'utf-16-be' # piexif 등 대부분의 생성기가 사용하는 순서
+        text = body.decode(encoding, errors='ignore')
+    elif prefix.startswith((b'ASCII', b'\x00' * 8, b'JIS')):
+        text = body.decode('utf-8', errors='ignore')
+    else:
+        # 지정자 없이 저장된 경우
+        text = raw.decode('utf-8', errors='ignore')
+    return text.rstrip('\x00')
+
+
+def read_metadata_texts(image_path: str) -> dict:
+    """확장자에 따라 PNG 텍스트 청크 또는 JPEG 주석을 읽습니다. 그 외 형식은 빈 사전."""
+    lowered = image_path.lower()
+    if lowered.endswith('.png'):
+        return read_png_text_chunks(image_path)
+    if lowered.endswith(('.jpg', '.jpeg')):
+        return read_jpeg_comments(image_path)
+    return {}
+
+
+def read_generation_text(image_path: str) -> str:
+    """
+    생성 정보 원문(PNG 'parameters' 또는 JPEG UserComment)을 헤더만 읽어 반환합니다.
+    없으면 빈 문자열을 반환합니다.
+    """
+    texts = read_metadata_texts(image_path)
+    return texts.get('parameters') or texts.get('UserComment') or ""
@@ -2,92 +2,90 @@ import os
 from PIL import Image
 from PIL.ExifTags import TAGS
 
-def get_positive_prompt_from_image(image_path):
-    """
-    단일 이미지 파일에서 Stable Diffusion 긍정 프롬프트를 추출합니다.
-    PNG와 JPG/JPEG 형식을 모두 지원합니다.
+from src.prompt_classifier import metadata_reader
+from src.prompt_classifier.generation_params import parse_metadata_texts, parse_a1111
 
-    Args:
-        image_path (str): 이미지 파일의 경로
-
-    Returns:
-        str: 추출된 긍정 프롬프트 문자열. 없으면 None.
+def read_generation_text(image_path):
+    """
+    이미지 파일에 저장된 생성 정보 원문(A1111 'parameters' 등)을 읽습니다.
+    PNG와 JPG/JPEG 형식을 모두 지원하며, 없으면 빈 문자열을 반환합니다.
+    픽셀 데이터를 건드리지 않는 헤더 전용 리더를 먼저 사용하고,
+    파일 구조를 해석하지 못한 경우에만 PIL로 다시 읽습니다.
     """
     try:
-        img = Image.open(image_path)
-        raw_info = ""
+        return metadata_reader.read_generation_text(image_path)
+    except metadata_reader.MetadataError:
+        return read_generation_text_pil(image_path)
 
-        # PNG 파일의 메타데이터 (PNG info) 처리
-        if image_path.lower().endswith('.png'):
-            # 'parameters' 키에 생성 정보가 저장되어 있는 경우가 많음
-            raw_info = img.info.get('parameters', '')
-        
-        # JPEG 파일의 메타데이터 (EXIF) 처리
-        elif image_path.lower().endswith(('.jpg', '.jpeg')):
-            exif_data = img._getexif()
-            if exif_data:
-                # UserComment 태그(0x9286)에 생성 정보가 저장되는 경우가 많음
-                user_comment_tag = 0x9286
-                if user_comment_tag in exif_data:
-                    # bytes를 utf-8로 디코딩
-                    raw_info = exif_data[user_comment_tag].decode('utf-8', errors='ignore')
+def read_generation_text_pil(image_path):
+    """PIL로 이미지를 열어 생성 정보 원문을 읽습니다. (이전 방식, 비교 및 예비용)"""
+    img = Image.open(image_path)
+    raw_info = ""
 
-        if not raw_info:
-            return None
+    # PNG 파일의 메타데이터 (PNG info) 처리
+    if image_path.lower().endswith('.png'):
+        # 'parameters' 키에 생성 정보가 저장되어 있는 경우가 많음
+        raw_info = img.info.get('parameters', '')
+    
+    # JPEG 파일의 메타데이터 (EXIF) 처리
+    elif image_path.lower().endswith(('.jpg', '.jpeg')):
+        exif_data = img._getexif()
+        if exif_data:
+            # UserComment 태그(0x9286)에 생성 정보가 저장되는 경우가 많음
+            user_comment_tag = 0x9286
+            if user_comment_tag in exif_data:
+                # bytes를 utf-8로 디코딩
+                raw_info = exif_data[user_comment_tag].decode('utf-8', errors='ignore')
 
-        # "Negative prompt:" 앞부분을 긍정 프롬프트로 간주
-        neg_prompt_marker = "Negative prompt:"
-        if neg_prompt_marker in raw_info:
-            positive_prompt = raw_info.split(neg_prompt_marker)[0]
-        else:
-            # Negative prompt가 없는 경우, "Steps:" 이전까지를 프롬프트로 간주
-            steps_marker = "Steps:"
-            if steps_marker in raw_info:
-                positive_prompt = raw_info.split(steps_marker)[0]
-            else:
-                positive_prompt = raw_info
+    return raw_info
 
-        # 앞뒤 공백 및 줄바꿈 제거 후 반환
-        return positive_prompt.strip()
+def extract_generation_params(image_path):
+    """
+    단일 이미지 파일의 생성 정보를 구조화된 GenerationParams로 추출합니다.
+    A1111(PNG parameters / JPEG UserComment), ComfyUI 워크플로, NovelAI Comment를 지원합니다.
 
+    Returns:
+        GenerationParams: 파싱 결과. 생성 정보가 없으면 None.
+    """
+    try:
+        try:
+            texts = metadata_reader.read_metadata_texts(image_path)
+        except metadata_reader.MetadataError:
+            raw_info = read_generation_text_pil(image_path)
+            return parse_a1111(raw_info) if raw_info else None
+        return parse_metadata_texts(texts)
     except Exception as e:
         print(f"오류 발생 ({os.path.basename(image_path)}): {e}")
         return None
 
-def main():
-    """
-    메인 실행 함수
+def extract_generation_info(image_path):
     """
-    # 사용자로부터 폴더 경로 입력받기
-    folder_path = input("이미지 프롬프트를 추출할 폴더 경로를 입력하세요: ")
+    단일 이미지 파일에서 긍정/부정 프롬프트와 생성 파라미터를 추출합니다.
 
-    if not os.path.isdir(folder_path):
-        print(f"오류: '{folder_path}'는 유효한 폴더가 아닙니다.")
-        return
-
-    print(f"\n[{folder_path}] 폴더의 이미지들을 스캔합니다...")
-    print("-" * 50)
-
-    # 지원하는 이미지 확장자
-    supported_extensions = ('.png', '.jpg', '.jpeg')
+    Returns:
+        dict: positive_prompt, negative_prompt, parameters 키를 가진 사전. 생성 정보가 없으면 None.
+    """
+    params = extract_generation_params(image_path)
+    if params is None:
+        return None
+    return {
+        "positive_prompt": params.positive_prompt,
+        "negative_prompt": params.negative_prompt,
+        "parameters": params.settings_text(),
+    }
 
-    # 폴더 내 파일 순회
-    for filename in os.listdir(folder_path):
-        if filename.lower().endswith(supported_extensions):
-            full_path = os.path.join(folder_path, filename)
-            
-            print(f"▶️ 파일: {filename}")
-            
-            prompt = get_positive_prompt_from_image(full_path)
-            
-            if prompt:
-                print(f"✅ 추출된 프롬프트:\n{prompt}\n")
-            else:
-                print("❌ 프롬프트를 찾을 수 없습니다.\n")
-    
-    print("-" * 50)
-    print("모든 이미지 파일 스캔을 완료했습니다.")
+def get_positive_prompt_from_image(image_path):
+    """
+    단일 이미지 파일에서 Stable Diffusion 긍정 프롬프트를 추출합니다.
+    PNG와 JPG/JPEG 형식을 모두 지원합니다.
 
+    Args:
+        image_path (str): 이미지 파일의 경로
 
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+    Returns:
+        str: 추출된 긍정 프롬프트 문자열. 없으면 None.
+    """
+    info = extract_generation_info(image_path)
+    if not info:
+        return None
+    return info["positive_prompt"]
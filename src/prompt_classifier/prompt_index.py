@@ -0,0 +1,201 @@
+# src/prompt_classifier/prompt_index.py
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.prompt_classifier import analytics, dedup
+from src.prompt_classifier.db_manager import BULK_CHUNK, get_db_connection
+from src.prompt_classifier.prompt_extractor import extract_generation_params
+from src.prompt_classifier.tag_utils import extract_tags, tags_with_loras
+
+BATCH_SIZE = 500 # 한 트랜잭션에 기록할 행 수
+
+UPSERT_SQL = """
+INSERT INTO prompts (image_path, positive_prompt, negative_prompt, parameters, file_size, file_mtime)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(image_path) DO UPDATE SET
+    positive_prompt = excluded.positive_prompt,
+    negative_prompt = excluded.negative_prompt,
+    parameters = excluded.parameters,
+    file_size = excluded.file_size,
+    file_mtime = excluded.file_mtime,
+    indexed_at = CURRENT_TIMESTAMP
+"""
+
+DELETE_TAGS_SQL = "DELETE FROM prompt_tags WHERE image_path = ?"
+INSERT_TAG_SQL = "INSERT OR IGNORE INTO prompt_tags (image_path, tag, weight) VALUES (?, ?, ?)"
+
+
+def _file_signature(image_path):
+    """(파일 크기, mtime_ns)를 반환합니다. 파일이 없으면 None."""
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _extract_row(job):
+    """
+    워커 프로세스에서 실행됩니다. 이미지 하나의 prompts 행을 만듭니다.
+    태그 파싱도 워커에서 끝내 두므로 기록하는 쪽에서는 다시 파싱하지 않습니다.
+    마지막 항목은 [(정규화된 태그, 가중치), ...] 입니다.
+    """
+    image_path, file_size, file_mtime = job
+    params = extract_generation_params(image_path)
+    if params is None:
+        return (image_path, None, None, None, file_size, file_mtime, [])
+    return (image_path, params.positive_prompt, params.negative_prompt, params.settings_text(),
+            file_size, file_mtime, tags_with_loras(params.positive_tags, params.loras))
+
+
+def write_prompt_rows(conn, rows):
+    """
+    prompts 행과 그 태그 행들, 중복 검사용 서명을 한 트랜잭션으로 기록하고 불러온 태그 통계에도 반영합니다.
+    각 행은 (이미지 경로, 긍정, 부정, 설정, 파일 크기, mtime_ns, [(정규화된 태그, 가중치), ...]) 입니다.
+    """
+    with conn:
+        conn.executemany(UPSERT_SQL, [row[:6] for row in rows])
+        conn.executemany(DELETE_TAGS_SQL, [(row[0],) for row in rows])
+        conn.executemany(INSERT_TAG_SQL, [(row[0], tag, weight)
+                                          for row in rows for tag, weight in row[6]])
+        dedup.update_signatures(conn, [(row[0], [tag for tag, _ in row[6]]) for row in rows])
+    analytics.update_prompt_tags([(row[0], [tag for tag, _ in row[6]]) for row in rows])
+
+
+def rebuild_tag_index(conn):
+    """prompts 테이블에 저장된 긍정 프롬프트로 prompt_tags 테이블과 중복 검사용 서명을 다시 만듭니다."""
+    rows = conn.execute("SELECT image_path, positive_prompt FROM prompts").fetchall()
+    with conn:
+        conn.execute("DELETE FROM prompt_tags")
+        conn.executemany(INSERT_TAG_SQL, [(image_path, tag, weight)
+                                          for image_path, positive_prompt in rows
+                                          for tag, weight in extract_tags(positive_prompt)])
+        dedup.rebuild_signatures(conn)
+    analytics.reset_tag_analytics()
+
+
+def index_images(image_paths, max_workers=None, batch_size=BATCH_SIZE, progress_callback=None,
+                 is_cancelled=None):
+    """
+    이미지들의 프롬프트를 추출해 prompts 테이블에 저장합니다.
+    이미 인덱싱된 파일 중 크기와 mtime이 같은 파일은 건너뜁니다.
+    추출은 프로세스 풀에서 병렬로 수행하고, 결과는 batch_size 단위 트랜잭션으로 기록합니다.
+
+    Args:
+        progress_callback (callable): (처리한 수, 전체 대상 수)를 받는 함수. 선택 사항.
+        is_cancelled (callable): 참을 반환하면 아직 시작하지 않은 파일은 건너뛰고 멈춥니다. 선택 사항.
+
+    Returns:
+        tuple: (새로 인덱싱한 수, 변경이 없어 건너뛴 수)
+    """
+    conn = get_db_connection()
+    image_paths = list(dict.fromkeys(image_paths))
+    # 인덱스 전체가 아니라 이번에 받은 경로의 행만 읽음 (폴더를 열거나 변경분만 다시 스캔할 때마다 호출되므로)
+    indexed = {}
+    for start in range(0, len(image_paths), BULK_CHUNK):
+        chunk = image_paths[start:start + BULK_CHUNK]
+        for row in conn.execute("SELECT image_path, file_size, file_mtime FROM prompts "
+                                f"WHERE image_path IN ({', '.join('?' * len(chunk))})", chunk):
+            indexed[row['image_path']] = (row['file_size'], row['file_mtime'])
+
+    jobs = []
+    skipped = 0
+    for image_path in image_paths:
+        signature = _file_signature(image_path)
+        if signature is None:
+            continue
+        if indexed.get(image_path) == signature:
+            skipped += 1
+            continue
+        jobs.append((image_path, *signature))
+
+    total = len(jobs)
+    if total == 0:
+        return 0, skipped
+
+    done = 0
+    batch = []
+    # Qt 스레드에서 호출될 수 있으므로 fork 대신 spawn으로 워커를 띄움
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        for row in executor.map(_extract_row, jobs, chunksize=64):
+            if is_cancelled and is_cancelled():
+                executor.shutdown(wait=True, cancel_futures=True)
+                break
+            batch.append(row)
+            if len(batch) >= batch_size:
+                write_prompt_rows(conn, batch)
+                done += len(batch)
+                batch = []
+                if progress_callback:
+                    progress_callback(done, total)
+    if batch:
+        write_prompt_rows(conn, batch)
+        done += len(batch)
+        if progress_callback:
+            progress_callback(done, total)
+    return done, skipped
+
+
+def remove_images(image_paths) -> int:
+    """
+    사라진 이미지의 prompts 행과 태그 행, 중복 검사용 서명을 한 트랜잭션으로 삭제하고 불러온 태그 통계에서도 뺍니다.
+    전문 검색 색인은 prompts 삭제 트리거로 함께 지워집니다.
+
+    Returns:
+        int: 삭제한 prompts 행 수
+    """
+    image_paths = list(dict.fromkeys(image_paths))
+    conn = get_db_connection()
+    removed = 0
+    with conn:
+        for start in range(0, len(image_paths), BULK_CHUNK):
+            chunk = image_paths[start:start + BULK_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            removed += conn.execute(f"DELETE FROM prompts WHERE image_path IN ({placeholders})", chunk).rowcount
+            conn.execute(f"DELETE FROM prompt_tags WHERE image_path IN ({placeholders})", chunk)
+        dedup.update_signatures(conn, [(image_path, []) for image_path in image_paths]) # 빈 태그면 서명만 지움
+    analytics.remove_prompt_tags(image_paths)
+    return removed
+
+
+def get_prompt_info(image_path: str):
+    """
+    인덱스에서 이미지의 프롬프트 정보를 반환합니다.
+    아직 인덱싱되지 않았거나 파일이 바뀐 경우에만 파일을 읽어 인덱스를 갱신합니다.
+
+    Returns:
+        dict: positive_prompt, negative_prompt, parameters 키를 가진 사전. 파일이 없으면 None.
+    """
+    signature = _file_signature(image_path)
+    if signature is None:
+        return None
+
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT positive_prompt, negative_prompt, parameters, file_size, file_mtime "
+        "FROM prompts WHERE image_path = ?", (image_path,)
+    ).fetchone()
+    if row is None or (row['file_size'], row['file_mtime']) != signature:
+        new_row = _extract_row((image_path, *signature))
+        write_prompt_rows(conn, [new_row])
+        _, positive_prompt, negative_prompt, parameters = new_row[:4]
+    else:
+        positive_prompt, negative_prompt, parameters = (
+            row['positive_prompt'], row['negative_prompt'], row['parameters'])
+
+    return {
+        "positive_prompt": positive_prompt,
+        "negative_prompt": negative_prompt,
+        "parameters": parameters,
+    }
+
+
+def get_positive_prompt(image_path: str):
+    """인덱스를 거쳐 긍정 프롬프트를 반환합니다. 없으면 None."""
+    info = get_prompt_info(image_path)
+    if not info:
+        return None
+    return info["positive_prompt"] or None
@@ -0,0 +1,162 @@
+# src/prompt_classifier/scanner.py
+
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.prompt_classifier.utils import get_cache_dir
+
+SUPPORTED_FORMATS = ('.png', '.jpg', '.jpeg', '.bmp')
+DEFAULT_MAX_WORKERS = 8 # NAS처럼 지연이 큰 저장소에서는 동시 요청 수가 속도를 좌우함
+
+
+def _list_directory(dir_path):
+    """os.scandir로 폴더 하나를 읽어 (mtime_ns, 이미지 파일 이름들, 하위 폴더 이름들)을 반환합니다."""
+    files, subdirs = [], []
+    mtime_ns = os.stat(dir_path).st_mtime_ns
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name.lower().endswith(SUPPORTED_FORMATS) and entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+    files.sort()
+    subdirs.sort()
+    return mtime_ns, files, subdirs
+
+
+class DirectoryScanner:
+    """
+    폴더 트리에서 이미지 파일을 찾는 스캐너입니다.
+    하위 폴더를 스레드 풀에서 병렬로 읽고, 찾은 파일을 폴더 단위로 바로 내보냅니다.
+    폴더별 mtime 스냅샷을 디스크에 저장해 두므로, 다시 스캔할 때는 mtime이 바뀐 폴더만
+    실제로 읽고 나머지는 스냅샷의 목록을 재사용합니다.
+    """
+
+    def __init__(self, root, max_workers=DEFAULT_MAX_WORKERS, snapshot_path=None):
+        self.root = os.path.abspath(root)
+        self.max_workers = max_workers
+        if snapshot_path is None:
+            root_key = hashlib.sha1(self.root.encode('utf-8')).hexdigest()
+            snapshot_path = os.path.join(get_cache_dir('scans'), root_key + '.json')
+        self.snapshot_path = snapshot_path
+        self.snapshot = self._load_snapshot()
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_snapshot(self):
+        """현재 스냅샷을 디스크에 저장합니다."""
+        with self._lock:
+            data = json.dumps(self.snapshot)
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def cancel(self):
+        """진행 중인 scan()을 가능한 빨리 멈춥니다."""
+        self._cancelled = True
+
+    def directories(self):
+        """마지막 스캔에서 확인된 모든 폴더 경로를 반환합니다."""
+        with self._lock:
+            return list(self.snapshot)
+
+    def _read_directory(self, dir_path):
+        """스냅샷과 mtime이 같으면 저장된 목록을, 다르면 폴더를 새로 읽은 결과를 반환합니다."""
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return dir_path, None
+        with self._lock:
+            cached = self.snapshot.get(dir_path)
+        if cached and cached['mtime_ns'] == mtime_ns:
+            return dir_path, cached
+        try:
+            mtime_ns, files, subdirs = _list_directory(dir_path)
+        except OSError as e:
+            print(f"폴더를 읽을 수 없습니다 ({dir_path}): {e}")
+            return dir_path, None
+        return dir_path, {'mtime_ns': mtime_ns, 'files': files, 'subdirs': subdirs}
+
+    def scan(self, start_dir=None):
+        """
+        루트 아래의 이미지 파일을 폴더 단위 리스트로 하나씩 내보내는 제너레이터입니다.
+        전체 스캔이 끝나면 사라진 폴더를 스냅샷에서 제거하고 스냅샷을 저장합니다.
+        start_dir를 주면 새로 생긴 하위 폴더처럼 트리의 일부만 스캔합니다.
+        """
+        self._cancelled = False
+        seen_dirs = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {executor.submit(self._read_directory, os.path.abspath(start_dir or self.root))}
+            while running and not self._cancelled:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_path, entry = future.result()
+                    if entry is None:
+                        continue
+                    seen_dirs.add(dir_path)
+                    with self._lock:
+                        self.snapshot[dir_path] = entry
+                    for subdir in entry['subdirs']:
+                        running.add(executor.submit(self._read_directory, os.path.join(dir_path, subdir)))
+                    if entry['files']:
+                        yield [os.path.join(dir_path, name) for name in entry['files']]
+            for future in running:
+                future.cancel()
+
+        if self._cancelled or start_dir is not None:
+            return
+        with self._lock:
+            for dir_path in list(self.snapshot):
+                if dir_path not in seen_dirs:
+                    del self.snapshot[dir_path]
+        self.save_snapshot()
+
+    def rescan_directory(self, dir_path):
+        """
+        폴더 하나를 다시 읽어 스냅샷과 비교합니다.
+        (새 파일 경로들, 사라진 파일 경로들, 새 하위 폴더 경로들)을 반환합니다.
+        """
+        dir_path = os.path.abspath(dir_path)
+        with self._lock:
+            previous = self.snapshot.get(dir_path, {'files': [], 'subdirs': []})
+        try:
+            mtime_ns, files, subdirs = _list_directory(dir_path)
+        except OSError:
+            # 폴더 자체가 사라진 경우
+            with self._lock:
+                removed_dirs = [path for path in self.snapshot
+                                if path == dir_path or path.startswith(dir_path + os.sep)]
+                removed = [os.path.join(path, name)
+                           for path in removed_dirs for name in self.snapshot[path]['files']]
+                for path in removed_dirs:
+                    del self.snapshot[path]
+            return [], removed, []
+
+        with self._lock:
+            self.snapshot[dir_path] = {'mtime_ns': mtime_ns, 'files': files, 'subdirs': subdirs}
+        old_files, old_subdirs = set(previous['files']), set(previous['subdirs'])
+        added = [os.path.join(dir_path, name) for name in files if name not in old_files]
+        new_files = set(files)
+        removed = [os.path.join(dir_path, name) for name in previous['files'] if name not in new_files]
+        new_subdirs = [os.path.join(dir_path, name) for name in subdirs if name not in old_subdirs]
+        return added, removed, new_subdirs
+
+
+def find_image_files(folder_path, max_workers=DEFAULT_MAX_WORKERS):
+    """폴더 트리의 모든 이미지 파일 경로를 정렬된 리스트로 반환합니다."""
+    scanner = DirectoryScanner(folder_path, max_workers)
+    return sorted(path for batch in scanner.scan() for path in batch)
@@ -0,0 +1,233 @@
+# src/prompt_classifier/search.py
+
+import re
+
+from src.prompt_classifier.db_manager import get_db_connection
+from src.prompt_classifier.tag_utils import LORA_PATTERN, normalize_tag
+
+FTS_OPERATORS = {'AND', 'OR', 'NOT'}
+# tag:"따옴표", "따옴표 구문", <lora:...>, 괄호로 감싼 가중치 태그, 괄호, 그 외 공백으로 구분되는 단어
+QUERY_TOKEN_PATTERN = re.compile(r'\w+:"[^"]*"|"[^"]*"|<[^>]*>|\([^()\s][^()]*:\s*-?[\d.]+\)|[()]|[^\s()]+')
+
+
+def _tokenize(query: str) -> list:
+    """
+    검색어를 연산자('AND', 'OR', 'NOT', '(', ')')와 검색 항목으로 나눕니다.
+    검색 항목은 ('fts', FTS5 구문) 또는 ('tag', 태그, 접두어 여부)입니다.
+    """
+    terms = []
+    tokens = QUERY_TOKEN_PATTERN.findall(query or "")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        lowered = token.lower()
+
+        if LORA_PATTERN.fullmatch(token):
+            terms.append(('tag', normalize_tag(token)[0], False))
+        elif lowered.startswith(('lora:', 'lyco:', 'hypernet:')) and len(token) > token.index(':') + 1:
+            terms.append(('tag', lowered.rstrip('*'), token.endswith('*')))
+        elif lowered.startswith('tag:'):
+            value = token[4:]
+            if not value and i < len(tokens):
+                value = tokens[i] # tag: "blue eyes" 처럼 띄어 쓴 경우
+                i += 1
+            name = normalize_tag(value.strip('"').rstrip('*'))[0]
+            if name:
+                terms.append(('tag', name, value.endswith('*')))
+        elif token.startswith('(') and token.endswith(')') and len(token) > 2:
+            name = normalize_tag(token)[0]
+            if name:
+                terms.append(('tag', name, False))
+        elif token in ('(', ')') or token in FTS_OPERATORS:
+            terms.append(token)
+        elif token.startswith('"'):
+            phrase = token.strip('"').replace('"', '')
+            if phrase.strip():
+                terms.append(('fts', f'"{phrase}"'))
+        else:
+            word = token.rstrip('*').replace('"', '')
+            if word:
+                terms.append(('fts', f'"{word}"' + ('*' if token.endswith('*') else '')))
+    return terms
+
+
+class _Parser:
+    """
+    연산자 우선순위 NOT > AND(생략 가능) > OR로 검색식 트리를 만듭니다.
+    짝이 맞지 않는 괄호나 피연산자 없는 연산자는 무시합니다.
+    """
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.pos = 0
+
+    def peek(self):
+        return self.terms[self.pos] if self.pos < len(self.terms) else None
+
+    def parse(self):
+        node = None
+        while self.pos < len(self.terms):
+            node = _combine('and', node, self.parse_or())
+            if self.peek() == ')':
+                self.pos += 1 # 여는 괄호 없이 닫힌 괄호
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == 'OR':
+            self.pos += 1
+            node = _combine('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = None
+        while self.peek() not in (None, 'OR', ')'):
+            if self.peek() == 'AND':
+                self.pos += 1
+                continue
+            node = _combine('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        term = self.peek()
+        self.pos += 1
+        if term == 'NOT':
+            if self.peek() in (None, 'OR', 'AND', ')'):
+                return None
+            operand = self.parse_not()
+            return None if operand is None else ('not', operand)
+        if term == '(':
+            node = self.parse_or()
+            if self.peek() == ')':
+                self.pos += 1
+            return node
+        return term
+
+
+def _combine(op, left, right):
+    if left is None or right is None:
+        return left if right is None else right
+    children = []
+    for node in (left, right):
+        children.extend(node[1] if node[0] == op else [node])
+    return (op, children)
+
+
+def parse_query(query: str):
+    """
+    검색어를 불리언 검색식 트리로 변환합니다.
+
+    지원하는 문법:
+        blue eyes            두 단어를 모두 포함 (AND)
+        "blue eyes"          구문 검색
+        blue OR red, NOT hat 불리언 연산자와 괄호 (태그 조건에도 적용)
+        eye*                 접두어 검색
+        tag:"blue eyes"      가중치를 벗긴 정확한 태그 일치 (tag:eye* 는 태그 접두어)
+        (blue eyes:1.2)      가중치 태그를 그대로 입력하면 태그 일치로 처리
+        lora:detail, <lora:detail:0.8>  해당 LoRA를 사용한 이미지 (lora:det* 접두어 가능)
+
+    Returns:
+        검색 항목이 없으면 None. 아니면 ('fts', 구문), ('tag', 태그, 접두어 여부),
+        ('not', 노드), ('and', [노드, ...]), ('or', [노드, ...]) 중 하나
+    """
+    return _Parser(_tokenize(query)).parse()
+
+
+def _is_fts(node) -> bool:
+    if node[0] == 'fts':
+        return True
+    if node[0] == 'tag':
+        return False
+    if node[0] == 'not':
+        return _is_fts(node[1])
+    return all(_is_fts(child) for child in node[1])
+
+
+def _fts_expression(node):
+    """
+    태그 조건이 없는 노드를 FTS5 MATCH 식으로 바꿉니다.
+    FTS5의 NOT은 이항 연산자라 긍정 항목 없이 부정만 있는 노드는 표현할 수 없으므로 None을 반환합니다.
+    """
+    kind = node[0]
+    if kind == 'fts':
+        return node[1]
+    if kind == 'not':
+        return None
+    if kind == 'or':
+        parts = [_fts_expression(child) for child in node[1]]
+        return None if None in parts else " OR ".join(f"({part})" for part in parts)
+    positives = [_fts_expression(child) for child in node[1] if child[0] != 'not']
+    negatives = [_fts_expression(child[1]) for child in node[1] if child[0] == 'not']
+    if not positives or None in positives or None in negatives:
+        return None
+    expression = " AND ".join(f"({part})" for part in positives)
+    for negative in negatives:
+        expression = f"({expression}) NOT ({negative})"
+    return expression
+
+
+def _match_argument(expression: str) -> str:
+    # 부정 프롬프트가 아닌 긍정 프롬프트 열에서만 검색
+    return f"positive_prompt : ({expression})"
+
+
+def _sql_condition(node, params: list) -> str:
+    """검색식 노드를 prompts p 테이블에 대한 WHERE 조건으로 바꿉니다."""
+    if _is_fts(node):
+        expression = _fts_expression(node)
+        if expression is not None:
+            params.append(_match_argument(expression))
+            return "p.rowid IN (SELECT rowid FROM prompts_fts WHERE prompts_fts MATCH ?)"
+    kind = node[0]
+    if kind == 'tag':
+        _, tag, is_prefix = node
+        if is_prefix:
+            # 태그 기본키 인덱스를 타는 범위 검색
+            params.extend([tag, tag + '\uffff'])
+            return "p.image_path IN (SELECT image_path FROM prompt_tags WHERE tag >= ? AND tag < ?)"
+        params.append(tag)
+        return "p.image_path IN (SELECT image_path FROM prompt_tags WHERE tag = ?)"
+    if kind == 'not':
+        return f"NOT ({_sql_condition(node[1], params)})"
+
+    # 태그 조건이 없는 항목들은 MATCH 하나로 묶음
+    children = node[1]
+    words = [child for child in children if _is_fts(child)]
+    if len(words) > 1 and _fts_expression((kind, words)) is not None:
+        children = [(kind, words)] + [child for child in children if not _is_fts(child)]
+    joiner = " AND " if kind == 'and' else " OR "
+    return joiner.join(f"({_sql_condition(child, params)})" for child in children)
+
+
+def search_images(query: str, limit: int = None):
+    """
+    프롬프트 인덱스에서 검색어와 일치하는 이미지 경로 목록을 반환합니다.
+    limit을 주면 관련도가 높은 순으로 limit개만 반환합니다. (태그 조건이 섞이면 관련도 정렬 없음)
+    검색어가 비어 있으면 None을 반환합니다. 잘못된 검색식이면 ValueError가 발생합니다.
+    """
+    node = parse_query(query)
+    if node is None:
+        return None
+
+    params = []
+    match_expr = _fts_expression(node) if _is_fts(node) else None
+    if match_expr is not None:
+        sql = ("SELECT p.image_path FROM prompts_fts "
+               "JOIN prompts p ON p.rowid = prompts_fts.rowid "
+               "WHERE prompts_fts MATCH ?")
+        params.append(_match_argument(match_expr))
+        if limit:
+            # 일부만 가져올 때만 관련도(bm25) 순으로 정렬 (전체 결과 정렬은 비용이 큼)
+            sql += " ORDER BY prompts_fts.rank"
+    else:
+        sql = "SELECT p.image_path FROM prompts p WHERE " + _sql_condition(node, params)
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    conn = get_db_connection()
+    try:
+        return [row[0] for row in conn.execute(sql, params)]
+    except Exception as e:
+        raise ValueError(f"잘못된 검색식입니다: {e}") from e
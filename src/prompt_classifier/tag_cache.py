@@ -0,0 +1,200 @@
+# src/prompt_classifier/tag_cache.py
+
+import hashlib
+
+from src.prompt_classifier.db_manager import get_db_connection
+from src.prompt_classifier.gemini_classifier import (CATEGORIES, DEFAULT_MODEL, INSTRUCTION_PROMPT,
+                                                     classify_prompts_batch)
+from src.prompt_classifier.tag_utils import normalize_tag, split_tags
+
+# 지시문이 바뀌면 해시가 달라져 이전 분류 결과는 자동으로 무시됨
+INSTRUCTION_HASH = hashlib.sha1(INSTRUCTION_PROMPT.encode('utf-8')).hexdigest()[:16]
+TAGS_PER_ITEM = 60    # 캐시에 없는 태그를 묶어 보낼 때 항목 하나에 담을 태그 수
+LOOKUP_CHUNK = 500    # IN (...) 절 하나에 넣을 태그 수
+
+UPSERT_SQL = """
+INSERT INTO tag_categories (tag, category, instruction_hash) VALUES (?, ?, ?)
+ON CONFLICT(tag) DO UPDATE SET
+    category = excluded.category,
+    instruction_hash = excluded.instruction_hash,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+# 실행 중 누적 통계
+_stats = {"tag_hits": 0, "tag_misses": 0, "prompts": 0, "api_calls_saved": 0, "tags_sent": 0}
+
+
+def lookup_categories(tags) -> dict:
+    """정규화된 태그들의 캐시된 카테고리를 {태그: 카테고리}로 반환합니다. 현재 지시문으로 분류된 것만 사용합니다."""
+    tags = list(tags)
+    found = {}
+    conn = get_db_connection()
+    for start in range(0, len(tags), LOOKUP_CHUNK):
+        chunk = tags[start:start + LOOKUP_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT tag, category FROM tag_categories "
+            f"WHERE instruction_hash = ? AND tag IN ({placeholders})",
+            (INSTRUCTION_HASH, *chunk))
+        found.update((row['tag'], row['category']) for row in rows)
+    return found
+
+
+def store_categories(categories: dict):
+    """{정규화된 태그: 카테고리}를 캐시에 저장합니다."""
+    if not categories:
+        return
+    conn = get_db_connection()
+    with conn:
+        conn.executemany(UPSERT_SQL, [(tag, category, INSTRUCTION_HASH)
+                                      for tag, category in categories.items()])
+
+
+def invalidate_tag_cache(tags=None) -> int:
+    """
+    태그 분류 캐시를 삭제합니다. tags를 주면 해당 태그만 삭제합니다.
+
+    Returns:
+        int: 삭제된 행 수
+    """
+    conn = get_db_connection()
+    with conn:
+        if tags is None:
+            return conn.execute("DELETE FROM tag_categories").rowcount
+        return conn.executemany("DELETE FROM tag_categories WHERE tag = ?",
+                                [(normalize_tag(tag)[0],) for tag in tags]).rowcount
+
+
+def prune_stale_entries() -> int:
+    """현재 지시문과 다른 지시문으로 분류된 캐시 항목을 삭제하고 삭제된 수를 반환합니다."""
+    conn = get_db_connection()
+    with conn:
+        return conn.execute("DELETE FROM tag_categories WHERE instruction_hash != ?",
+                            (INSTRUCTION_HASH,)).rowcount
+
+
+def get_cache_stats() -> dict:
+    """실행 중 누적된 캐시 적중률과 절약한 API 호출 수를 반환합니다."""
+    lookups = _stats["tag_hits"] + _stats["tag_misses"]
+    return dict(_stats, hit_rate=_stats["tag_hits"] / lookups if lookups else 0.0)
+
+
+def reset_cache_stats():
+    for key in _stats:
+        _stats[key] = 0
+
+
+def _classify_unseen(unseen: dict, model_name: str):
+    """
+    캐시에 없는 태그들만 묶어서 Gemini로 분류합니다.
+
+    Args:
+        unseen (dict): {정규화된 태그: 보낼 원문 태그}
+
+    Returns:
+        tuple: ({정규화된 태그: 카테고리}, 오류 메시지 또는 None)
+    """
+    raw_tags = list(unseen.values())
+    items = {str(i): ", ".join(raw_tags[start:start + TAGS_PER_ITEM])
+             for i, start in enumerate(range(0, len(raw_tags), TAGS_PER_ITEM))}
+    results = classify_prompts_batch(items, model_name=model_name)
+
+    classified = {}
+    error = None
+    for result in results.values():
+        if "error" in result:
+            error = result["error"]
+            continue
+        for category in CATEGORIES:
+            for tag in result.get(category, []):
+                normalized = normalize_tag(tag)[0]
+                if normalized in unseen:
+                    classified.setdefault(normalized, category)
+    return classified, error
+
+
+def classify_tags(raw_tags, model_name: str = DEFAULT_MODEL):
+    """
+    원문 태그들의 카테고리를 캐시에서 찾고, 캐시에 없는 태그만 Gemini로 분류해 캐시에 저장합니다.
+
+    Returns:
+        tuple: ({정규화된 태그: 카테고리}, {처음 보는 정규화된 태그: 원문 태그}, 오류 메시지 또는 None)
+    """
+    normalized_of = {raw_tag: normalize_tag(raw_tag)[0] for raw_tag in dict.fromkeys(raw_tags)}
+    return _resolve(normalized_of, model_name)
+
+
+def _resolve(normalized_of: dict, model_name: str):
+    """{원문 태그: 정규화된 태그}를 받아 classify_tags와 같은 결과를 반환합니다."""
+    known = lookup_categories({tag for tag in normalized_of.values() if tag})
+    unseen = {}
+    for raw_tag, normalized in normalized_of.items():
+        if normalized and normalized not in known:
+            unseen.setdefault(normalized, raw_tag)
+
+    error = None
+    if unseen:
+        classified, error = _classify_unseen(unseen, model_name)
+        store_categories(classified)
+        known.update(classified)
+    return known, unseen, error
+
+
+def classify_prompts_cached(prompts: dict, model_name: str = DEFAULT_MODEL) -> dict:
+    """
+    여러 프롬프트를 태그 단위 캐시를 거쳐 분류합니다.
+    캐시에 있는 태그는 바로 카테고리를 정하고, 처음 보는 태그만 모아 Gemini에 보낸 뒤 결과를 캐시에 저장합니다.
+
+    Args:
+        prompts (dict): {항목 id: 프롬프트}
+
+    Returns:
+        dict: {항목 id: 9개 카테고리 분류 결과}. 처음 보는 태그의 분류에 실패한 항목은 {"error": ...}.
+    """
+    split = {item_id: split_tags(prompt) for item_id, prompt in prompts.items()}
+    normalized_of = {}
+    for raw_tags in split.values():
+        for raw_tag in raw_tags:
+            if raw_tag not in normalized_of:
+                normalized_of[raw_tag] = normalize_tag(raw_tag)[0]
+
+    known, unseen, error = _resolve(normalized_of, model_name)
+
+    results = {}
+    hits = misses = saved = 0
+    for item_id, raw_tags in split.items():
+        result = {category: [] for category in CATEGORIES}
+        needed_api = False
+        failed = False
+        for raw_tag in raw_tags:
+            normalized = normalized_of[raw_tag]
+            if not normalized:
+                continue
+            if normalized in unseen:
+                misses += 1
+                needed_api = True
+            else:
+                hits += 1
+            category = known.get(normalized)
+            if category is None:
+                failed = True
+                continue
+            result[category].append(raw_tag)
+        if not needed_api:
+            saved += 1
+        results[item_id] = {"error": error} if failed and error else result
+
+    _stats["tag_hits"] += hits
+    _stats["tag_misses"] += misses
+    _stats["prompts"] += len(prompts)
+    _stats["api_calls_saved"] += saved
+    _stats["tags_sent"] += len(unseen)
+    lookups = hits + misses
+    print(f"태그 캐시: 적중률 {hits / lookups if lookups else 0:.1%} ({hits}/{lookups}), "
+          f"새로 분류한 태그 {len(unseen)}개, API 없이 분류한 프롬프트 {saved}/{len(prompts)}개")
+    return results
+
+
+def classify_prompt_cached(prompt: str, model_name: str = DEFAULT_MODEL) -> dict:
+    """프롬프트 하나를 태그 단위 캐시를 거쳐 분류합니다. classify_prompt_with_gemini와 같은 형식을 반환합니다."""
+    return classify_prompts_cached({0: prompt}, model_name=model_name)[0]
@@ -0,0 +1,84 @@
+# src/prompt_classifier/tag_utils.py
+
+from src.prompt_classifier.generation_params import LORA_PATTERN, OPENERS, SEPARATORS, parse_prompt
+
+
+def _top_level_fragments(prompt: str):
+    """괄호(<>, (), [], {}) 밖에 있는 쉼표/줄바꿈에서만 프롬프트를 나눕니다."""
+    closers = set(OPENERS.values()) | {'>'}
+    start = depth = 0
+    escaped = False
+    for pos, ch in enumerate(prompt):
+        if escaped:
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch in OPENERS or ch == '<':
+            depth += 1
+        elif ch in closers:
+            depth = max(0, depth - 1) # 짝이 맞지 않는 닫는 괄호는 무시
+        elif ch in SEPARATORS and depth == 0:
+            yield prompt[start:pos]
+            start = pos + 1
+    yield prompt[start:]
+
+
+def _weighted(name: str, weight: float) -> str:
+    return name if weight == 1.0 else f"({name}:{weight:g})"
+
+
+def split_tags(prompt: str) -> list:
+    """
+    프롬프트를 괄호 밖의 쉼표/줄바꿈 기준으로 나누고 중복 태그를 제거합니다. (가중치 구문은 그대로 유지)
+    '(a, b:1.2)'처럼 괄호 하나에 여러 태그가 묶여 있으면 태그마다 '(a:1.2)', '(b:1.2)'로 풀어서
+    각 조각을 normalize_tag에 넣었을 때 태그 하나와 그 가중치가 나오도록 합니다.
+    """
+    if not prompt:
+        return []
+    tags = []
+    for fragment in _top_level_fragments(prompt):
+        fragment = fragment.strip()
+        if not fragment:
+            continue
+        parsed_tags, loras = parse_prompt(fragment)
+        if len(parsed_tags) + len(loras) <= 1:
+            tags.append(fragment)
+            continue
+        tags.extend(_weighted(tag.name, tag.weight) for tag in parsed_tags)
+        tags.extend(f"<{lora.kind}:{lora.name}:{lora.weight:g}>" for lora in loras)
+    return list(dict.fromkeys(tags))
+
+
+def lora_tag(lora) -> str:
+    """LoRA 참조를 태그 인덱스에 저장하는 이름('lora:이름')으로 바꿉니다."""
+    return f"{lora.kind}:{lora.name.lower()}"
+
+
+def normalize_tag(tag: str):
+    """
+    가중치 구문을 벗겨낸 정규화된 태그 이름과 가중치를 반환합니다.
+    예: '(Blue Eyes:1.2)' -> ('blue eyes', 1.2), '[hat]' -> ('hat', 0.909...),
+        '<lora:detail:0.8>' -> ('lora:detail', 0.8)
+
+    Returns:
+        tuple: (정규화된 태그, 가중치). 남는 내용이 없으면 ('', 1.0).
+    """
+    tags, loras = parse_prompt(tag)
+    if loras:
+        return lora_tag(loras[0]), loras[0].weight
+    if tags:
+        return tags[0].name, tags[0].weight
+    return '', 1.0
+
+
+def tags_with_loras(tags, loras) -> list:
+    """파싱된 태그와 LoRA를 (정규화된 태그, 가중치) 목록 하나로 합칩니다."""
+    merged = {tag.name: tag.weight for tag in tags}
+    for lora in loras:
+        merged.setdefault(lora_tag(lora), lora.weight)
+    return list(merged.items())
+
+
+def extract_tags(prompt: str) -> list:
+    """프롬프트에서 (정규화된 태그, 가중치) 목록을 중복 없이 추출합니다. LoRA는 'lora:이름'."""
+    return tags_with_loras(*parse_prompt(prompt))
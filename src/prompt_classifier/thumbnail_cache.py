@@ -0,0 +1,195 @@
+# src/prompt_classifier/thumbnail_cache.py
+
+import os
+import hashlib
+import threading
+from PyQt6.QtGui import QImage, QImageReader, QPainter
+from PyQt6.QtCore import Qt, QSize
+
+from src.prompt_classifier.utils import get_cache_dir
+
+THUMBNAIL_SIZE = 200                      # 갤러리 setIconSize와 동일한 해상도
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024     # 캐시 폴더 최대 크기 (512MB)
+EVICT_RATIO = 0.8                         # 용량 초과 시 최대 크기의 80%까지 비움
+THUMBNAIL_EXT = ".jpg"
+
+
+class ThumbnailCache:
+    """
+    디스크 기반 썸네일 캐시입니다.
+    원본 경로 + 수정 시각(mtime) + 파일 크기로 키를 만들어 축소된 썸네일을 저장하므로,
+    원본이 바뀌면 자동으로 새 키가 사용됩니다. 용량 상한을 넘으면 가장 오래 사용되지 않은
+    썸네일부터 삭제합니다(LRU). 여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir or get_cache_dir('thumbnails')
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        self._total_bytes = None # 처음 필요할 때 한 번만 계산
+
+    def cache_key(self, image_path: str):
+        """원본 파일의 경로, mtime, 크기로 캐시 키를 만듭니다. 파일이 없으면 None."""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        raw_key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        # 한 폴더에 파일이 너무 많아지지 않도록 키 앞 두 글자로 하위 폴더를 나눔
+        return os.path.join(self.cache_dir, key[:2], key + THUMBNAIL_EXT)
+
+    def get(self, image_path: str):
+        """캐시된 썸네일(QImage)을 반환합니다. 없으면 None."""
+        key = self.cache_key(image_path)
+        if key is None:
+            return None
+        return self._read_entry(self._entry_path(key))
+
+    def get_or_create(self, image_path: str):
+        """
+        캐시된 썸네일을 반환하고, 없으면 원본을 축소 디코딩해 캐시에 저장한 뒤 반환합니다.
+        원본을 읽을 수 없으면 None을 반환합니다.
+        """
+        key = self.cache_key(image_path)
+        if key is None:
+            return None
+        entry_path = self._entry_path(key)
+        image = self._read_entry(entry_path)
+        if image is not None:
+            return image
+
+        image = self.decode_thumbnail(image_path, self.size)
+        if image is None:
+            return None
+        self._store(entry_path, image)
+        return image
+
+    @staticmethod
+    def _read_entry(entry_path: str):
+        image = QImage(entry_path)
+        if image.isNull():
+            return None
+        try:
+            os.utime(entry_path) # LRU 순서를 위해 사용 시각 갱신
+        except OSError:
+            pass
+        return image
+
+    @staticmethod
+    def decode_thumbnail(image_path: str, size: int = THUMBNAIL_SIZE):
+        """원본을 전체 해상도로 풀지 않고 size×size 안에 맞게 축소 디코딩합니다."""
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        original_size = reader.size()
+        if original_size.isValid():
+            reader.setScaledSize(original_size.scaled(QSize(size, size),
+                                                      Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            print(f"썸네일 생성 실패 ({os.path.basename(image_path)}): {reader.errorString()}")
+            return None
+
+        if image.hasAlphaChannel():
+            # JPEG는 투명도를 지원하지 않으므로 흰 배경 위에 합성
+            background = QImage(image.size(), QImage.Format.Format_RGB32)
+            background.fill(Qt.GlobalColor.white)
+            painter = QPainter(background)
+            painter.drawImage(0, 0, image)
+            painter.end()
+            image = background
+        return image
+
+    def _store(self, entry_path: str, image: QImage):
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{threading.get_ident()}.tmp"
+        if not image.save(tmp_path, "JPG", 85):
+            return
+        os.replace(tmp_path, entry_path) # 다른 스레드가 반쯤 쓴 파일을 읽지 않도록 원자적 교체
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._compute_total_bytes()
+            else:
+                self._total_bytes += os.path.getsize(entry_path)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _iter_entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for file in files:
+                if file.endswith(THUMBNAIL_EXT):
+                    yield os.path.join(root, file)
+
+    def _compute_total_bytes(self) -> int:
+        total = 0
+        for entry_path in self._iter_entries():
+            try:
+                total += os.path.getsize(entry_path)
+            except OSError:
+                pass
+        return total
+
+    def _evict(self):
+        """가장 오래 사용되지 않은 썸네일부터 삭제해 용량을 상한의 80% 이하로 줄입니다."""
+        entries = []
+        for entry_path in self._iter_entries():
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_RATIO
+        for _, size, entry_path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(entry_path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def invalidate(self, image_path: str):
+        """특정 이미지의 현재 썸네일을 캐시에서 삭제합니다."""
+        key = self.cache_key(image_path)
+        if key is None:
+            return
+        entry_path = self._entry_path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(entry_path)
+                os.remove(entry_path)
+            except OSError:
+                return
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def clear(self) -> int:
+        """캐시된 모든 썸네일을 삭제하고 삭제한 파일 수를 반환합니다."""
+        removed = 0
+        with self._lock:
+            for entry_path in list(self._iter_entries()):
+                try:
+                    os.remove(entry_path)
+                    removed += 1
+                except OSError:
+                    pass
+            self._total_bytes = 0
+        return removed
+
+
+_shared_cache = None
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """앱 전체에서 공유하는 썸네일 캐시 인스턴스를 반환합니다."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ThumbnailCache()
+    return _shared_cache
@@ -0,0 +1,220 @@
+# src/prompt_classifier/ui/analytics_window.py
+
+from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QComboBox, QSpinBox, QCheckBox,
+                             QPushButton, QSplitter, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+
+from src.prompt_classifier.analytics import LORA_CATEGORY, get_tag_analytics
+from src.prompt_classifier.db_manager import close_db_connection
+from src.prompt_classifier.ui.favorites_store import get_favorites_store
+from src.prompt_classifier.ui.favorites_window import CATEGORY_NAMES
+
+REFRESH_DELAY_MS = 500 # 분류 결과가 연달아 바뀔 때 표를 한 번만 다시 그리도록 기다리는 시간
+
+# 콤보 상자 항목 (표시 이름, 카테고리)
+CATEGORY_CHOICES = [("모든 태그", None), ("🧩 LoRA", LORA_CATEGORY)] + [(name, key) for key, name in CATEGORY_NAMES.items()]
+
+
+class AnalyticsLoader(QThread):
+    """태그 통계를 별도 스레드에서 DB로부터 불러옵니다. (이미 불러왔으면 바로 끝남)"""
+    loaded = pyqtSignal(object)
+
+    def __init__(self, reload=False, parent=None):
+        super().__init__(parent)
+        self.reload = reload
+
+    def run(self):
+        analytics = None
+        try:
+            analytics = get_tag_analytics(reload=self.reload)
+        except Exception as e:
+            print(f"태그 통계를 불러오는 중 오류 발생: {e}")
+        finally:
+            close_db_connection() # 이 스레드에서 연 연결은 스레드와 함께 정리
+        self.loaded.emit(analytics)
+
+
+def _category_combo():
+    combo = QComboBox()
+    for name, key in CATEGORY_CHOICES:
+        combo.addItem(name, key)
+    return combo
+
+
+def _table(headers):
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+    table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+    return table
+
+
+def _fill_table(table, rows):
+    """rows의 각 행을 표에 채웁니다. 숫자는 오른쪽 정렬합니다."""
+    table.setRowCount(len(rows))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            item = QTableWidgetItem(value if isinstance(value, str) else f"{value:,}" if isinstance(value, int)
+                                    else f"{value:.2f}")
+            if not isinstance(value, str):
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(r, c, item)
+
+
+class AnalyticsWindow(QWidget):
+    """
+    라이브러리 전체의 태그 통계 창입니다.
+    왼쪽은 카테고리별로 가장 많이 쓰인 태그, 오른쪽은 선택한 태그와 함께 쓰인 태그를 향상도(lift) 순서로 보여줍니다.
+    통계는 메모리에 있어 조건을 바꿔도 DB를 다시 읽지 않으며, 분류 결과가 바뀌면 표를 다시 그립니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("태그 통계")
+        self.resize(1100, 700)
+        self.analytics = None
+        self.loader = None
+
+        # 위쪽: 많이 쓰인 태그 조건
+        self.category_combo = _category_combo()
+        self.classified_checkbox = QCheckBox("분류된 즐겨찾기만")
+        self.classified_checkbox.setToolTip("체크하면 분류 결과에서 그 카테고리로 분류된 횟수를 셉니다.\n"
+                                            "체크하지 않으면 인덱싱된 모든 이미지의 프롬프트에서 셉니다.")
+        self.top_k_spin = QSpinBox()
+        self.top_k_spin.setRange(10, 1000)
+        self.top_k_spin.setValue(100)
+        self.reload_button = QPushButton("DB에서 다시 불러오기")
+        self.reload_button.clicked.connect(lambda: self.load(reload=True))
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("카테고리"))
+        controls.addWidget(self.category_combo)
+        controls.addWidget(self.classified_checkbox)
+        controls.addWidget(QLabel("개수"))
+        controls.addWidget(self.top_k_spin)
+        controls.addStretch(1)
+        controls.addWidget(self.reload_button)
+
+        # 왼쪽: 많이 쓰인 태그
+        self.top_table = _table(["태그", "이미지 수", "비율 (%)"])
+        self.top_table.itemSelectionChanged.connect(self.refresh_associations)
+
+        # 오른쪽: 선택한 태그와 함께 쓰인 태그
+        self.association_label = QLabel("왼쪽에서 태그를 선택하세요.")
+        self.association_category_combo = _category_combo()
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("향상도순", 'lift')
+        self.order_combo.addItem("함께 쓰인 수순", 'count')
+        self.association_table = _table(["태그", "함께 쓰인 수", "신뢰도 (%)", "향상도", "카테고리"])
+
+        association_controls = QHBoxLayout()
+        association_controls.addWidget(QLabel("카테고리"))
+        association_controls.addWidget(self.association_category_combo)
+        association_controls.addWidget(self.order_combo)
+        association_controls.addStretch(1)
+
+        right_widget = QWidget()
+        right_layout = QVBoxLayout(right_widget)
+        right_layout.setContentsMargins(0, 0, 0, 0)
+        right_layout.addWidget(self.association_label)
+        right_layout.addLayout(association_controls)
+        right_layout.addWidget(self.association_table)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.top_table)
+        splitter.addWidget(right_widget)
+        splitter.setSizes([450, 650])
+
+        self.summary_label = QLabel("태그 통계를 불러오는 중...")
+
+        main_layout = QVBoxLayout(self)
+        main_layout.addLayout(controls)
+        main_layout.addWidget(splitter, 1)
+        main_layout.addWidget(self.summary_label)
+
+        self.category_combo.currentIndexChanged.connect(self.refresh)
+        self.classified_checkbox.toggled.connect(self.refresh)
+        self.top_k_spin.valueChanged.connect(self.refresh)
+        self.association_category_combo.currentIndexChanged.connect(self.refresh_associations)
+        self.order_combo.currentIndexChanged.connect(self.refresh_associations)
+
+        # 분류 결과가 바뀌면 메모리의 통계는 이미 갱신되어 있으므로 표만 다시 그림
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        favorites = get_favorites_store()
+        favorites.classification_changed.connect(self.refresh_timer.start)
+        favorites.favorite_removed.connect(self.refresh_timer.start)
+
+        self.load()
+
+    def load(self, reload=False):
+        """통계를 별도 스레드에서 불러옵니다."""
+        if self.loader is not None:
+            return
+        self.reload_button.setEnabled(False)
+        self.summary_label.setText("태그 통계를 불러오는 중...")
+        self.loader = AnalyticsLoader(reload=reload, parent=self)
+        self.loader.loaded.connect(self.on_loaded)
+        self.loader.start()
+
+    def on_loaded(self, analytics):
+        self.loader = None
+        self.reload_button.setEnabled(True)
+        if analytics is None:
+            self.summary_label.setText("태그 통계를 불러오지 못했습니다.")
+            return
+        self.analytics = analytics
+        self.refresh()
+
+    def selected_tag(self):
+        rows = self.top_table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.top_table.item(rows[0].row(), 0).text()
+
+    def refresh(self):
+        """현재 조건으로 많이 쓰인 태그 표를 다시 그립니다. 선택한 태그는 유지합니다."""
+        if self.analytics is None:
+            return
+        selected = self.selected_tag()
+        classified_only = self.classified_checkbox.isChecked()
+        top = self.analytics.top_tags(self.category_combo.currentData(), k=self.top_k_spin.value(),
+                                      classified_only=classified_only)
+        summary = self.analytics.summary()
+        total = summary["classified"] if classified_only else summary["images"]
+
+        self.top_table.blockSignals(True)
+        _fill_table(self.top_table, [(tag, count, count * 100 / total if total else 0.0) for tag, count in top])
+        for row, (tag, _) in enumerate(top):
+            if tag == selected:
+                self.top_table.selectRow(row)
+        self.top_table.blockSignals(False)
+
+        self.summary_label.setText(f"태그가 있는 이미지 {summary['images']:,}장, 서로 다른 태그 {summary['tags']:,}개, "
+                                   f"분류된 즐겨찾기 {summary['classified']:,}개")
+        self.refresh_associations()
+
+    def refresh_associations(self):
+        """선택한 태그와 함께 쓰인 태그 표를 다시 그립니다."""
+        tag = self.selected_tag()
+        if self.analytics is None or tag is None:
+            self.association_table.setRowCount(0)
+            self.association_label.setText("왼쪽에서 태그를 선택하세요.")
+            return
+        associations = self.analytics.associations(tag, category=self.association_category_combo.currentData(),
+                                                   k=self.top_k_spin.value(), order=self.order_combo.currentData())
+        category_names = dict((key, name) for name, key in CATEGORY_CHOICES)
+        _fill_table(self.association_table, [
+            (other, together, confidence * 100, lift, category_names.get(self.analytics.category_of(other), ""))
+            for other, together, confidence, lift in associations])
+        self.association_label.setText(f"'{tag}'와 함께 쓰인 태그 (이미지 {self.analytics.prompts.count(tag):,}장)")
+
+    def closeEvent(self, event):
+        if self.loader is not None:
+            self.loader.wait()
+        super().closeEvent(event)
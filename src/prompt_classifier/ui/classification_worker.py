@@ -0,0 +1,43 @@
+# src/prompt_classifier/ui/classification_worker.py
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.prompt_classifier.classification_queue import ClassificationQueue
+from src.prompt_classifier.classifier_backends import LocalBackend
+from src.prompt_classifier.db_manager import close_db_connection
+
+
+class ClassificationWorker(QThread):
+    """
+    분류 작업 큐의 asyncio 루프를 별도 스레드에서 돌리고 결과를 시그널로 하나씩 전달합니다.
+    build_local=True이고 local이 없으면 로컬 분류기(사전 로드와 모델 학습)도 이 스레드에서 만듭니다.
+    만든 분류기는 끝난 뒤 self.queue.local로 꺼내 다음 실행에 다시 쓸 수 있습니다.
+    """
+    job_finished = pyqtSignal(str, dict)
+    job_failed = pyqtSignal(str, str)
+    progress = pyqtSignal(int, int)
+    queue_finished = pyqtSignal(int, int)
+
+    def __init__(self, image_paths=None, local=None, parent=None, build_local=False, **queue_options):
+        super().__init__(parent)
+        self.image_paths = None if image_paths is None else list(image_paths)
+        self.build_local = build_local
+        self.queue = ClassificationQueue(local=local, **queue_options)
+
+    def cancel(self):
+        self.queue.stop()
+
+    def run(self):
+        try:
+            if self.build_local and self.queue.local is None:
+                self.queue.local = LocalBackend()
+            done, failed = self.queue.run(self.image_paths,
+                                          on_result=self.job_finished.emit,
+                                          on_error=self.job_failed.emit,
+                                          on_progress=self.progress.emit)
+        except Exception as e:
+            print(f"분류 작업 큐 실행 중 오류 발생: {e}")
+            done, failed = 0, 0
+        finally:
+            close_db_connection() # 이 스레드에서 연 연결은 스레드와 함께 정리
+        self.queue_finished.emit(done, failed)
@@ -0,0 +1,120 @@
+# src/prompt_classifier/ui/favorites_model.py
+
+from PyQt6.QtCore import Qt, QModelIndex
+
+from src.prompt_classifier import db_manager
+from src.prompt_classifier.ui.gallery_model import GalleryModel
+
+FAVORITES_PIXMAP_BUDGET = 64 * 1024 * 1024 # 즐겨찾기 창에서 메모리에 유지할 썸네일 픽스맵 최대 크기 (64MB)
+
+
+class FavoritesModel(GalleryModel):
+    """
+    즐겨찾기 목록 모델입니다. 최근에 추가한 순서로 DB에서 한 페이지씩 읽어
+    뷰가 끝까지 스크롤했을 때(fetchMore)만 다음 페이지를 불러오므로, 즐겨찾기가 많아도 창이 바로 열립니다.
+    썸네일은 갤러리와 같은 방식으로 보이는 행만 비동기로 요청하고,
+    추가/삭제/분류 변경은 해당 행만 고칩니다.
+    """
+
+    def __init__(self, thumbnail_loader, parent=None, pixmap_budget=FAVORITES_PIXMAP_BUDGET):
+        super().__init__(thumbnail_loader, parent, pixmap_budget)
+        self._favorites = {}  # 이미지 경로 -> 즐겨찾기 행 dict
+        self._cursor = None   # 마지막으로 읽은 행의 (favorited_at, id). 다음 페이지는 그 다음부터
+        self._exhausted = False
+
+    # --- QAbstractListModel 구현 ---
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        image_path = self._paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return image_path
+        if role == Qt.ItemDataRole.UserRole:
+            return dict(self._favorites[image_path])
+        return super().data(index, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        다음 페이지를 목록 끝에 붙입니다.
+        검색 중이면 일치하는 행이 한 페이지만큼 모이거나 끝에 닿을 때까지 계속 읽습니다.
+        """
+        if parent.isValid():
+            return
+        new_rows = []
+        while not self._exhausted and len(new_rows) < db_manager.FAVORITES_PAGE:
+            page = db_manager.get_favorites_page(self._cursor)
+            if len(page) < db_manager.FAVORITES_PAGE:
+                self._exhausted = True
+            if page:
+                self._cursor = (page[-1]['favorited_at'], page[-1]['id'])
+            new_rows.extend(dict(row) for row in page if row['image_path'] not in self._known
+                            and (self._filter is None or row['image_path'] in self._filter))
+        if not new_rows:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+        for offset, row in enumerate(new_rows):
+            image_path = row['image_path']
+            self._favorites[image_path] = row
+            self._known.add(image_path)
+            self._rows[image_path] = first + offset
+            self._paths.append(image_path)
+        self.endInsertRows()
+
+    # --- 목록 조작 ---
+    def reload(self, image_paths=None):
+        """
+        목록을 비우고 첫 페이지부터 다시 읽습니다.
+
+        Args:
+            image_paths: 이 경로들만 표시 (검색 결과). None이면 모든 즐겨찾기
+        """
+        self.thumbnail_loader.cancel()
+        self.beginResetModel()
+        self._filter = None if image_paths is None else set(image_paths)
+        self._favorites = {}
+        self._known = set()
+        self._paths = []
+        self._rows = {}
+        self._cursor = None
+        self._exhausted = False
+        self._requested.clear()
+        self._to_request = []
+        self.endResetModel()
+        self.fetchMore()
+
+    def insert_favorite(self, fav: dict):
+        """새로 추가된 즐겨찾기를 목록 맨 앞에 넣습니다."""
+        image_path = fav['image_path']
+        if image_path in self._known or (self._filter is not None and image_path not in self._filter):
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._favorites[image_path] = dict(fav)
+        self._known.add(image_path)
+        self._paths.insert(0, image_path)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self.endInsertRows()
+
+    def remove_paths(self, image_paths):
+        """주어진 경로들의 행만 삭제합니다."""
+        image_paths = [path for path in image_paths if path in self._known]
+        for image_path in image_paths:
+            self._favorites.pop(image_path, None)
+        super().remove_paths(image_paths)
+
+    def update_favorite(self, image_path: str, **changes):
+        """불러온 행의 값을 바꾸고 그 행만 다시 그리게 합니다."""
+        row = self._rows.get(image_path)
+        if row is None:
+            return
+        self._favorites[image_path].update(changes)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.UserRole])
+
+    def favorite(self, image_path: str):
+        """불러온 즐겨찾기 행 dict를 반환합니다. 아직 읽지 않았거나 없으면 None."""
+        fav = self._favorites.get(image_path)
+        return dict(fav) if fav is not None else None
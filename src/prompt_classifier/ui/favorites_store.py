@@ -0,0 +1,115 @@
+# src/prompt_classifier/ui/favorites_store.py
+
+import datetime
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.prompt_classifier import db_manager
+
+
+def now_timestamp() -> str:
+    """
+    메모리의 즐겨찾기 행에 기록하는 추가/분류 시각 문자열입니다.
+    DB의 CURRENT_TIMESTAMP와 같은 UTC 'YYYY-MM-DD HH:MM:SS' 형식이라 DB에서 읽은 값과 그대로 비교/정렬할 수 있습니다.
+    """
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class FavoritesStore(QObject):
+    """
+    즐겨찾기 목록을 메모리에 들고 있는 앱 공용 저장소입니다. GUI 스레드에서만 사용합니다.
+    조회(is_favorited, get 등)를 처음 할 때 DB에서 한 번 불러오고, 이후 변경은 DB에 바로 쓰면서(write-through)
+    시그널로 알리므로 뷰어와 즐겨찾기 창은 DB를 다시 조회하지 않고 바뀐 항목만 갱신합니다.
+    추가/삭제/분류 반영은 목록을 아직 불러오지 않았으면 전체를 읽지 않고 해당 행만 DB에서 확인합니다.
+    """
+    favorite_added = pyqtSignal(dict)              # 추가된 즐겨찾기 행
+    favorite_removed = pyqtSignal(str)             # 삭제된 이미지 경로
+    classification_changed = pyqtSignal(str, dict) # (이미지 경로, 분류 결과)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = None # 이미지 경로 -> 즐겨찾기 행 dict (추가한 순서, 오래된 것부터)
+
+    def _contains(self, image_path) -> bool:
+        # 목록을 불러오지 않았으면 그 경로만 DB에서 확인
+        if self._rows is None:
+            return db_manager.is_favorited(image_path)
+        return image_path in self._rows
+
+    def _ensure_loaded(self):
+        if self._rows is None:
+            self.reload()
+
+    def reload(self):
+        """DB에서 즐겨찾기 목록을 다시 불러옵니다. (다른 프로세스가 DB를 바꿨을 때)"""
+        self._rows = {row['image_path']: dict(row) for row in reversed(db_manager.get_all_favorites())}
+
+    def __contains__(self, image_path) -> bool:
+        return self.is_favorited(image_path)
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def is_favorited(self, image_path: str) -> bool:
+        self._ensure_loaded()
+        return image_path in self._rows
+
+    def get(self, image_path: str):
+        """즐겨찾기 행 dict를 반환합니다. 즐겨찾기가 아니면 None."""
+        self._ensure_loaded()
+        return self._rows.get(image_path)
+
+    def favorites(self) -> list:
+        """모든 즐겨찾기 행을 최근에 추가한 순서로 반환합니다."""
+        self._ensure_loaded()
+        return list(reversed(self._rows.values()))
+
+    def add(self, image_path: str, full_prompt: str) -> bool:
+        """즐겨찾기에 추가합니다. 이미 있으면 False를 반환합니다."""
+        if self._contains(image_path):
+            return False
+        db_manager.add_favorite(image_path, full_prompt)
+        row = {"image_path": image_path, "full_prompt": full_prompt, "favorited_at": now_timestamp(),
+               "classified_at": None}
+        if self._rows is not None:
+            self._rows[image_path] = row
+        self.favorite_added.emit(dict(row))
+        return True
+
+    def remove(self, image_path: str) -> bool:
+        """즐겨찾기에서 삭제합니다. 즐겨찾기가 아니었으면 False를 반환합니다."""
+        if self._rows is None:
+            if not db_manager.remove_favorite(image_path):
+                return False
+        elif self._rows.pop(image_path, None) is None:
+            return False
+        else:
+            db_manager.remove_favorite(image_path)
+        self.favorite_removed.emit(image_path)
+        return True
+
+    def set_classification(self, image_path: str, data: dict, save: bool = True):
+        """
+        분류 결과를 반영하고 알립니다.
+
+        Args:
+            save (bool): False면 DB에 쓰지 않음 (분류 작업 큐처럼 이미 저장한 결과를 알릴 때)
+        """
+        if not self._contains(image_path):
+            return
+        if save:
+            db_manager.update_classified_data(image_path, data)
+        if self._rows is not None:
+            self._rows[image_path]['classified_at'] = now_timestamp()
+        self.classification_changed.emit(image_path, data)
+
+
+_shared_store = None
+
+def get_favorites_store() -> FavoritesStore:
+    """앱 전체에서 공유하는 즐겨찾기 저장소를 반환합니다."""
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = FavoritesStore()
+    return _shared_store
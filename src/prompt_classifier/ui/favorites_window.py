@@ -1,14 +1,31 @@
 # src/prompt_classifier/ui/favorites_window.py
 
-import json
-from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QListWidget, 
+import os
+from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QListView, QAbstractItemView,
                              QLabel, QTextEdit, QPushButton, QSplitter, 
-                             QListWidgetItem, QMessageBox, QScrollArea, QMenu)
-from PyQt6.QtGui import QPixmap, QIcon, QAction
-from PyQt6.QtCore import Qt, QSize, QCoreApplication
+                             QMessageBox, QScrollArea, QMenu, QLineEdit, QApplication)
+from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QSize
 
 from src.prompt_classifier import db_manager
-from src.prompt_classifier.gemini_classifier import classify_prompt_with_gemini
+from src.prompt_classifier.classification_queue import enqueue_jobs
+from src.prompt_classifier.frame_cache import get_frame_cache
+from src.prompt_classifier.search import search_images
+from src.prompt_classifier.thumbnail_cache import get_thumbnail_cache
+from src.prompt_classifier.ui.classification_worker import ClassificationWorker
+from src.prompt_classifier.ui.favorites_model import FavoritesModel
+from src.prompt_classifier.ui.favorites_store import get_favorites_store, now_timestamp
+from src.prompt_classifier.ui.folder_scanner import IndexWorker
+from src.prompt_classifier.ui.frame_prefetcher import FramePrefetcher
+from src.prompt_classifier.ui.scaled_image_label import ScaledImageLabel
+from src.prompt_classifier.ui.thumbnail_loader import ThumbnailLoader
+
+# 분류 카테고리의 표시 이름 (표시 순서)
+CATEGORY_NAMES = {
+    "style_artist": "🎨 스타일 및 작가", "quality_rendering": "✨ 품질 및 렌더링", "subject": "👤 피사체",
+    "body_appearance": "👀 신체적 특징 및 외모", "pose_gaze": "🤸 포즈 및 시선", "clothing_accessories": "👕 의상 및 액세서리",
+    "action_situation": "🎬 행동 및 상황", "background_props": "🏞️ 배경 및 소품", "technical_elements": "🔧 기술적 요소"
+}
 
 class FavoritesWindow(QWidget):
     def __init__(self):
@@ -23,16 +40,37 @@ class FavoritesWindow(QWidget):
         left_widget = QWidget()
         left_layout = QVBoxLayout(left_widget)
         
-        self.favorites_list = QListWidget()
+        # DB에서 페이지 단위로 읽는 모델 + 공용 썸네일 캐시를 쓰는 비동기 로더
+        self.thumbnail_loader = ThumbnailLoader(self)
+        self.favorites_model = FavoritesModel(self.thumbnail_loader, self)
+        self.favorites_list = QListView()
+        self.favorites_list.setModel(self.favorites_model)
         self.favorites_list.setIconSize(QSize(150, 150))
-        self.favorites_list.itemClicked.connect(self.on_favorite_selected)
+        self.favorites_list.setUniformItemSizes(True) # 모든 행의 높이를 재지 않음
+        self.favorites_list.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.favorites_list.clicked.connect(self.on_favorite_selected)
         self.favorites_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.favorites_list.customContextMenuRequested.connect(self.show_context_menu)
         
-        self.image_viewer = QLabel("이미지를 선택하세요.")
-        self.image_viewer.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # 즐겨찾기 프롬프트 검색창
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("프롬프트 검색 (예: blue eyes, tag:1girl, lora:detail)")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.returnPressed.connect(self.run_search)
+        self.search_box.textChanged.connect(lambda text: text or self.run_search())
+        self.favorites_indexed = False
+        self.index_worker = None
+
+        self.image_viewer = ScaledImageLabel("이미지를 선택하세요.")
+        # 원본 디코딩은 스레드 풀에서 하고, 끝나면 frame_ready로 받아 표시 (목록 앞뒤 항목도 미리 읽음)
+        self.frame_prefetcher = FramePrefetcher(self, ahead=1, behind=1)
+        self.frame_prefetcher.frame_ready.connect(self.on_frame_ready)
+        self.frame_size = None
+        self.waiting_frame = False
         
-        left_layout.addWidget(QLabel("즐겨찾기 목록"))
+        self.count_label = QLabel("즐겨찾기 목록")
+        left_layout.addWidget(self.count_label)
+        left_layout.addWidget(self.search_box)
         left_layout.addWidget(self.favorites_list, 1)
         left_layout.addWidget(self.image_viewer, 4) # 이미지 뷰어 영역 확장
 
@@ -45,6 +83,10 @@ class FavoritesWindow(QWidget):
         
         self.classify_button = QPushButton("프롬프트 분류 실행 (Gemini API)")
         self.classify_button.clicked.connect(self.run_classification)
+
+        self.classify_all_button = QPushButton("미분류 즐겨찾기 모두 분류")
+        self.classify_all_button.clicked.connect(self.classify_all_unclassified)
+        self.classification_status = QLabel("")
         
         # 분류 결과를 표시할 스크롤 영역
         self.scroll_area = QScrollArea()
@@ -57,6 +99,8 @@ class FavoritesWindow(QWidget):
         right_layout.addWidget(QLabel("전체 프롬프트"))
         right_layout.addWidget(self.prompt_display, 1)
         right_layout.addWidget(self.classify_button)
+        right_layout.addWidget(self.classify_all_button)
+        right_layout.addWidget(self.classification_status)
         right_layout.addWidget(QLabel("분류 결과"))
         right_layout.addWidget(self.scroll_area, 3)
 
@@ -66,15 +110,22 @@ class FavoritesWindow(QWidget):
         main_layout.addWidget(splitter)
         
         self.current_item_data = None
+        self.local_classifier = None # 처음 분류할 때 작업 스레드에서 로컬 사전을 불러옴
+        self.classification_worker = None
+        self.single_classification_path = None # 버튼으로 한 장만 분류 중일 때의 경로
+        self.favorites = get_favorites_store()
+        self.favorites.favorite_added.connect(self.on_favorite_added)
+        self.favorites.favorite_removed.connect(self.on_favorite_removed)
+        self.favorites.classification_changed.connect(self.on_classification_changed)
         self.load_favorites()
         
         # 전체 화면으로 시작
         self.showMaximized()
 
     def show_context_menu(self, pos):
-        """리스트 위젯의 컨텍스트 메뉴를 표시합니다."""
-        item = self.favorites_list.itemAt(pos)
-        if not item:
+        """리스트의 컨텍스트 메뉴를 표시합니다."""
+        index = self.favorites_list.indexAt(pos)
+        if not index.isValid():
             return
 
         menu = QMenu()
@@ -88,11 +139,11 @@ class FavoritesWindow(QWidget):
         """선택된 항목을 즐겨찾기에서 삭제합니다."""
         if not self.current_item_data:
             # 현재 선택된 아이템이 없을 경우, 오른쪽 클릭된 아이템을 기준으로 삼는다.
-            selected_items = self.favorites_list.selectedItems()
-            if not selected_items:
+            selected = self.favorites_list.selectionModel().selectedIndexes()
+            if not selected:
                 QMessageBox.warning(self, "오류", "삭제할 항목을 선택하세요.")
                 return
-            self.current_item_data = selected_items[0].data(Qt.ItemDataRole.UserRole)
+            self.current_item_data = selected[0].data(Qt.ItemDataRole.UserRole)
 
 
         reply = QMessageBox.question(self, '삭제 확인', 
@@ -101,8 +152,8 @@ class FavoritesWindow(QWidget):
                                      QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            db_manager.remove_favorite(self.current_item_data['image_path'])
-            self.load_favorites()
+            # 목록에서는 저장소 시그널(on_favorite_removed)로 그 행만 삭제됨
+            self.favorites.remove(self.current_item_data['image_path'])
             self.clear_selection()
             QMessageBox.information(self, "완료", "즐겨찾기에서 삭제되었습니다.")
 
@@ -116,76 +167,201 @@ class FavoritesWindow(QWidget):
         self.results_layout.addWidget(QLabel("분류를 실행해 주세요."))
 
     def load_favorites(self):
-        """DB에서 즐겨찾기 목록을 불러와 리스트에 표시합니다."""
-        self.favorites_list.clear()
-        favorites = db_manager.get_all_favorites()
-        for fav in favorites:
-            item = QListWidgetItem(QIcon(fav['image_path']), fav['image_path'])
-            item.setData(Qt.ItemDataRole.UserRole, fav) # 모든 DB 데이터 저장
-            self.favorites_list.addItem(item)
-
-    def on_favorite_selected(self, item):
+        """즐겨찾기 목록을 첫 페이지부터 다시 표시합니다. 나머지는 스크롤할 때 읽습니다."""
+        if self.search_box.text().strip():
+            self.run_search()
+        else:
+            self.favorites_model.reload()
+        self.update_count_label()
+
+    def update_count_label(self):
+        self.count_label.setText(f"즐겨찾기 목록 ({db_manager.count_favorites():,}개)")
+
+    def on_favorite_added(self, fav):
+        """다른 창에서 추가된 즐겨찾기를 목록 맨 앞에 넣습니다."""
+        self.update_count_label()
+        if self.search_box.text().strip():
+            self.favorites_indexed = False # 새 항목도 검색되도록 다시 인덱싱
+            self.run_search()
+        else:
+            self.favorites_model.insert_favorite(fav)
+
+    def on_favorite_removed(self, image_path):
+        """삭제된 즐겨찾기 항목만 목록에서 뺍니다."""
+        self.favorites_model.remove_paths([image_path])
+        self.update_count_label()
+        if self.current_item_data and self.current_item_data['image_path'] == image_path:
+            self.clear_selection()
+
+    def run_search(self):
+        """검색식과 일치하는 즐겨찾기만 목록에 표시합니다."""
+        query = self.search_box.text().strip()
+        if query and not self.favorites_indexed:
+            self.start_indexing() # 인덱싱이 끝나면 다시 검색
+            return
+        try:
+            results = search_images(query) if query else None
+        except ValueError as e:
+            QMessageBox.warning(self, "검색 오류", str(e))
+            return
+
+        self.favorites_model.reload(results)
+
+    def start_indexing(self):
+        """
+        폴더 스캔 없이 추가된 즐겨찾기도 검색되도록 별도 스레드에서 한 번 인덱싱합니다. (변경 없는 파일은 건너뜀)
+        끝날 때까지 검색창을 잠급니다.
+        """
+        if self.index_worker is not None:
+            return
+        self.search_box.setEnabled(False)
+        self.count_label.setText("검색 인덱스 준비 중...")
+        self.index_worker = IndexWorker(db_manager.get_favorite_paths(), self, hashes=False)
+        self.index_worker.progress.connect(
+            lambda done, total: self.count_label.setText(f"검색 인덱스 준비 중... ({done}/{total})"))
+        self.index_worker.index_finished.connect(self.on_index_finished)
+        self.index_worker.start()
+
+    def on_index_finished(self, indexed, skipped):
+        self.index_worker = None
+        self.favorites_indexed = True
+        self.update_count_label()
+        self.search_box.setEnabled(True)
+        self.search_box.setFocus()
+        self.run_search()
+
+    def on_favorite_selected(self, index):
         """리스트에서 항목 선택 시 이미지와 정보를 업데이트합니다."""
-        self.current_item_data = item.data(Qt.ItemDataRole.UserRole)
+        self.current_item_data = index.data(Qt.ItemDataRole.UserRole)
         
-        # 이미지 표시
-        pixmap = QPixmap(self.current_item_data['image_path'])
-        scaled_pixmap = pixmap.scaled(self.image_viewer.size(), 
-                                      Qt.AspectRatioMode.KeepAspectRatio, 
-                                      Qt.TransformationMode.SmoothTransformation)
-        self.image_viewer.setPixmap(scaled_pixmap)
+        # 이미지 표시 (뷰어와 같은 캐시를 쓰므로 뷰어에서 본 이미지는 다시 디코딩하지 않음)
+        # 캐시에 없으면 썸네일을 먼저 보여 주고 원본은 스레드 풀에서 디코딩해 on_frame_ready에서 교체
+        image_path = self.current_item_data['image_path']
+        self.frame_size = (self.screen() or QApplication.primaryScreen()).availableGeometry().size()
+        frame = get_frame_cache().get(image_path, self.frame_size)
+        self.waiting_frame = frame is None
+        self.image_viewer.set_image(frame if frame is not None else get_thumbnail_cache().get(image_path))
+        self.frame_prefetcher.prefetch(self.favorites_model.image_paths(), index.row(), 1, self.frame_size)
         
         # 프롬프트 표시
         self.prompt_display.setText(self.current_item_data['full_prompt'])
         
         # 저장된 분류 데이터가 있으면 표시
-        if self.current_item_data['classified_data']:
-            self.display_classification_results(json.loads(self.current_item_data['classified_data']))
+        classified_data = None
+        if self.current_item_data['classified_at']:
+            classified_data = db_manager.get_classified_data(self.current_item_data['image_path'])
+        if classified_data is not None:
+            self.display_classification_results(classified_data)
         else:
             # 기존 결과 초기화
             self.clear_results_layout()
             self.results_layout.addWidget(QLabel("분류를 실행해 주세요."))
             
+    def on_frame_ready(self, image_path, max_size, image):
+        """스레드 풀에서 디코딩한 이미지가 지금 선택한 즐겨찾기면 표시합니다."""
+        if self.waiting_frame and self.current_item_data and self.current_item_data['image_path'] == image_path \
+                and max_size == self.frame_size:
+            self.waiting_frame = False
+            self.image_viewer.set_image(image)
+
     def run_classification(self):
-        """Gemini API를 호출하여 프롬프트를 분류합니다."""
+        """선택한 즐겨찾기 하나를 분류 작업 큐로 분류합니다. 결과는 시그널로 돌아옵니다."""
         if not self.current_item_data:
             QMessageBox.warning(self, "오류", "먼저 즐겨찾기 목록에서 이미지를 선택하세요.")
             return
 
         prompt_to_classify = self.current_item_data['full_prompt']
-        if not prompt_to_classify or prompt_to_classify == "프롬프트 정보 없음":
+        if not prompt_to_classify or prompt_to_classify == db_manager.NO_PROMPT:
             QMessageBox.information(self, "알림", "분류할 프롬프트 정보가 없습니다.")
             return
-            
+        if self.classification_worker is not None:
+            QMessageBox.information(self, "알림", "이미 분류 작업이 실행 중입니다.")
+            return
+
+        image_path = self.current_item_data['image_path']
+        enqueue_jobs([(image_path, prompt_to_classify)])
+        self.single_classification_path = image_path
         self.classify_button.setText("분류 중...")
         self.classify_button.setEnabled(False)
-        QCoreApplication.processEvents() # UI 갱신
+        self.start_classification_worker([image_path])
 
-        # API 호출
-        result = classify_prompt_with_gemini(prompt_to_classify)
-        
-        self.classify_button.setText("프롬프트 분류 실행 (Gemini API)")
-        self.classify_button.setEnabled(True)
+    def classify_all_unclassified(self):
+        """분류되지 않은 즐겨찾기를 모두 작업 큐에 넣고 실행합니다. 실행 중이면 중지합니다."""
+        if self.classification_worker is not None:
+            self.classification_worker.cancel()
+            self.classify_all_button.setEnabled(False)
+            self.classification_status.setText("진행 중인 요청이 끝나면 중지합니다...")
+            return
 
-        if "error" in result:
-            QMessageBox.critical(self, "API 오류", f"프롬프트 분류에 실패했습니다:\n{result['error']}")
-        else:
-            # 결과 표시 및 DB 업데이트
+        # 목록에 아직 읽지 않은 페이지까지 포함하도록 DB에서 조회
+        enqueue_jobs(db_manager.get_unclassified_favorites())
+
+        # 이전에 중단된 작업도 함께 이어서 처리
+        self.single_classification_path = None
+        self.classify_all_button.setText("분류 중지")
+        self.classify_button.setEnabled(False)
+        self.start_classification_worker(None)
+
+    def start_classification_worker(self, image_paths):
+        self.classification_worker = ClassificationWorker(image_paths, local=self.local_classifier, parent=self,
+                                                          build_local=True)
+        self.classification_worker.job_finished.connect(self.on_classification_finished)
+        self.classification_worker.job_failed.connect(self.on_classification_failed)
+        self.classification_worker.progress.connect(
+            lambda done, total: self.classification_status.setText(f"분류 중... {done}/{total}"))
+        self.classification_worker.queue_finished.connect(self.on_classification_queue_finished)
+        self.classification_worker.start()
+
+    def on_classification_finished(self, image_path, result):
+        """작업 큐가 이미 저장한 분류 결과를 저장소를 통해 알립니다."""
+        self.favorites.set_classification(image_path, result, save=False)
+
+    def on_classification_changed(self, image_path, result):
+        """분류 결과를 목록의 그 행과 화면에 반영합니다."""
+        self.favorites_model.update_favorite(image_path, classified_at=now_timestamp())
+        if self.current_item_data and self.current_item_data['image_path'] == image_path:
+            self.current_item_data = dict(self.current_item_data, classified_at=now_timestamp())
             self.display_classification_results(result)
-            db_manager.update_classified_data(self.current_item_data['image_path'], json.dumps(result))
+
+    def on_classification_failed(self, image_path, message):
+        if image_path == self.single_classification_path:
+            QMessageBox.critical(self, "API 오류", f"프롬프트 분류에 실패했습니다:\n{message}")
+        else:
+            self.classification_status.setText(f"분류 실패: {os.path.basename(image_path)} ({message})")
+
+    def on_classification_queue_finished(self, done, failed):
+        self.local_classifier = self.classification_worker.queue.local
+        self.classification_worker = None
+        self.classify_button.setText("프롬프트 분류 실행 (Gemini API)")
+        self.classify_button.setEnabled(True)
+        self.classify_all_button.setText("미분류 즐겨찾기 모두 분류")
+        self.classify_all_button.setEnabled(True)
+        self.classification_status.setText(f"분류 완료: 성공 {done}개, 실패 {failed}개")
+        if self.single_classification_path is not None and done:
             QMessageBox.information(self, "성공", "프롬프트 분류가 완료되었습니다.")
-            
+        self.single_classification_path = None
+
+    def closeEvent(self, event):
+        """창을 닫을 때 썸네일 로드와 분류 작업을 멈춥니다. 남은 분류 작업은 다음 실행 때 이어서 처리됩니다."""
+        self.thumbnail_loader.cancel()
+        self.frame_prefetcher.cancel()
+        if self.index_worker is not None:
+            # 창이 다시 열리면 이 객체는 버려지므로 남은 인덱싱은 취소하고 스레드가 끝날 때까지 기다림
+            self.index_worker.progress.disconnect()
+            self.index_worker.index_finished.disconnect()
+            self.index_worker.cancel()
+            self.index_worker.wait()
+            self.index_worker = None
+        if self.classification_worker is not None:
+            self.classification_worker.cancel()
+            self.classification_worker.wait()
+        super().closeEvent(event)
+
     def display_classification_results(self, data: dict):
         """분류된 결과를 UI에 보기 좋게 표시합니다."""
         self.clear_results_layout()
         
-        category_names = {
-            "style_artist": "🎨 스타일 및 작가", "quality_rendering": "✨ 품질 및 렌더링", "subject": "👤 피사체",
-            "body_appearance": "👀 신체적 특징 및 외모", "pose_gaze": "🤸 포즈 및 시선", "clothing_accessories": "👕 의상 및 액세서리",
-            "action_situation": "🎬 행동 및 상황", "background_props": "🏞️ 배경 및 소품", "technical_elements": "🔧 기술적 요소"
-        }
-        
-        for key, name in category_names.items():
+        for key, name in CATEGORY_NAMES.items():
             tags = data.get(key)
             if tags: # 태그가 있는 경우에만 표시
                 self.results_layout.addWidget(QLabel(f"<b>{name}</b>"))
@@ -201,13 +377,3 @@ class FavoritesWindow(QWidget):
             child = self.results_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
-                
-    def resizeEvent(self, event):
-        """창 크기 변경 시 이미지도 다시 스케일링합니다."""
-        if self.current_item_data:
-            pixmap = QPixmap(self.current_item_data['image_path'])
-            scaled_pixmap = pixmap.scaled(self.image_viewer.size(), 
-                                      Qt.AspectRatioMode.KeepAspectRatio, 
-                                      Qt.TransformationMode.SmoothTransformation)
-            self.image_viewer.setPixmap(scaled_pixmap)
-        super().resizeEvent(event)
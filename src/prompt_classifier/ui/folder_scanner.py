@@ -0,0 +1,126 @@
+# src/prompt_classifier/ui/folder_scanner.py
+
+import os
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from src.prompt_classifier.db_manager import close_db_connection
+from src.prompt_classifier.image_hash import index_hashes, remove_hashes
+from src.prompt_classifier.prompt_index import index_images, remove_images
+
+EMIT_INTERVAL_SEC = 0.1 # 작은 폴더가 많을 때 시그널이 너무 잦지 않도록 묶는 주기
+
+
+class ScanWorker(QThread):
+    """DirectoryScanner.scan()을 별도 스레드에서 실행하고 찾은 파일을 묶어서 전달합니다."""
+    images_found = pyqtSignal(list)
+    scan_finished = pyqtSignal(int)
+
+    def __init__(self, scanner, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+
+    def cancel(self):
+        self.scanner.cancel()
+
+    def run(self):
+        total = 0
+        pending = []
+        last_emit = time.monotonic()
+        for batch in self.scanner.scan():
+            pending.extend(batch)
+            now = time.monotonic()
+            if now - last_emit >= EMIT_INTERVAL_SEC:
+                total += len(pending)
+                self.images_found.emit(pending)
+                pending = []
+                last_emit = now
+        if pending:
+            total += len(pending)
+            self.images_found.emit(pending)
+        self.scan_finished.emit(total)
+
+
+class RescanWorker(QThread):
+    """
+    파일 감시로 바뀐 것이 확인된 폴더들을 별도 스레드에서 다시 읽어 스냅샷과 비교합니다.
+    새로 생긴 하위 폴더는 통째로 스캔하고, 끝나면 스냅샷을 저장합니다.
+    사라진 이미지는 검색 결과에 남지 않도록 프롬프트 인덱스와 해시에서도 지웁니다.
+    """
+    # (새 이미지 경로들, 사라진 이미지 경로들, 새 하위 폴더가 있었는지)
+    rescan_finished = pyqtSignal(list, list, bool)
+
+    def __init__(self, scanner, dir_paths, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self.dir_paths = list(dir_paths)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+        self.scanner.cancel()
+
+    def run(self):
+        added, removed, new_dirs = [], [], False
+        try:
+            for dir_path in self.dir_paths:
+                if self._cancelled:
+                    break
+                dir_added, dir_removed, new_subdirs = self.scanner.rescan_directory(dir_path)
+                for subdir in new_subdirs:
+                    for batch in self.scanner.scan(subdir):
+                        dir_added.extend(batch)
+                added.extend(dir_added)
+                removed.extend(dir_removed)
+                new_dirs = new_dirs or bool(new_subdirs)
+            self.scanner.save_snapshot()
+            deleted = [path for path in removed if not os.path.exists(path)]
+            if deleted:
+                remove_images(deleted)
+                remove_hashes(deleted)
+        except Exception as e:
+            print(f"바뀐 폴더를 다시 읽는 중 오류 발생: {e}")
+        finally:
+            close_db_connection() # 이 스레드에서 연 연결은 스레드와 함께 정리
+        self.rescan_finished.emit(added, removed, new_dirs)
+
+
+class IndexWorker(QThread):
+    """
+    스캔한 이미지들의 프롬프트를 별도 스레드에서 prompts 인덱스에 저장하고,
+    이어서 비슷한 이미지 찾기용 지각 해시를 계산합니다. 두 단계 모두 바뀌지 않은 파일은 건너뜁니다.
+    hashes=False면 프롬프트만 인덱싱합니다. (검색만 필요할 때)
+    """
+    progress = pyqtSignal(int, int)
+    hash_progress = pyqtSignal(int, int)
+    index_finished = pyqtSignal(int, int)
+
+    def __init__(self, image_paths, parent=None, hashes=True):
+        super().__init__(parent)
+        self.image_paths = list(image_paths)
+        self.hashes = hashes
+        self._cancelled = False
+
+    def cancel(self):
+        """아직 처리하지 않은 파일은 건너뛰고 멈춥니다. (이미 추출 중인 묶음은 끝까지 처리)"""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        try:
+            indexed, skipped = index_images(self.image_paths, progress_callback=self.progress.emit,
+                                            is_cancelled=self.is_cancelled)
+        except Exception as e:
+            print(f"프롬프트 인덱싱 중 오류 발생: {e}")
+            indexed, skipped = 0, 0
+        try:
+            if self.hashes and not self._cancelled:
+                index_hashes(self.image_paths, progress_callback=self.hash_progress.emit,
+                             is_cancelled=self.is_cancelled)
+        except Exception as e:
+            print(f"이미지 해시 계산 중 오류 발생: {e}")
+        finally:
+            close_db_connection() # 이 스레드에서 연 연결은 스레드와 함께 정리
+        self.index_finished.emit(indexed, skipped)
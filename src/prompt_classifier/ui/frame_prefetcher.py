@@ -0,0 +1,92 @@
+# src/prompt_classifier/ui/frame_prefetcher.py
+
+import threading
+from collections import deque
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.prompt_classifier.frame_cache import get_frame_cache
+
+PREFETCH_AHEAD = 3  # 진행 방향으로 미리 읽을 이미지 수
+PREFETCH_BEHIND = 1 # 반대 방향으로 남겨 둘 이미지 수
+
+
+class _FrameSignals(QObject):
+    # (이미지 경로, 축소 크기, 디코딩된 이미지. 읽을 수 없으면 빈 QImage)
+    frame_ready = pyqtSignal(str, QSize, QImage)
+
+
+class _PrefetchTask(QRunnable):
+    """대기열이 빌 때까지 이미지를 디코딩해 캐시에 넣습니다."""
+
+    def __init__(self, prefetcher, generation):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.signals = prefetcher.signals
+        self.generation = generation
+
+    def run(self):
+        while True:
+            job = self.prefetcher._next_job(self.generation)
+            if job is None:
+                return
+            image_path, max_size = job
+            image = self.prefetcher.cache.get_or_decode(image_path, max_size, record_stats=False)
+            self.signals.frame_ready.emit(image_path, max_size, image if image is not None else QImage())
+
+
+class FramePrefetcher(QObject):
+    """
+    뷰어에서 다음에 보여 줄 이미지를 백그라운드 스레드에서 미리 디코딩해 FrameCache에 넣습니다.
+    이동할 때마다 새 위치 기준으로 대기열을 다시 만들고, 지나간 위치의 대기 작업은 버립니다.
+    현재 이미지가 캐시에 없으면 그것부터 디코딩하므로, 화면에서는 GUI 스레드에서 디코딩하지 않고
+    frame_ready 시그널을 받아 표시하면 됩니다.
+    """
+
+    def __init__(self, parent=None, cache=None, ahead=PREFETCH_AHEAD, behind=PREFETCH_BEHIND):
+        super().__init__(parent)
+        self.cache = cache or get_frame_cache()
+        self.ahead = ahead
+        self.behind = behind
+        self.signals = _FrameSignals() # 부모 없이 두어 창이 닫혀도 작업이 끝날 때까지 살아 있게 함
+        self.frame_ready = self.signals.frame_ready
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2) # 현재 이미지 표시(GUI 스레드)와 CPU를 나눠 씀
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._queue = deque()
+
+    def prefetch(self, image_paths, index: int, direction: int, max_size):
+        """
+        index 위치의 이미지와, 거기서 direction(+1/-1) 방향으로 ahead개, 반대로 behind개를 가까운 순서대로 미리 읽습니다.
+        index 위치의 이미지는 이미 캐시에 있어도 frame_ready를 보냅니다.
+        """
+        direction = 1 if direction >= 0 else -1
+        order = [index]
+        for step in range(1, max(self.ahead, self.behind) + 1):
+            if step <= self.ahead:
+                order.append(index + direction * step)
+            if step <= self.behind:
+                order.append(index - direction * step)
+        jobs = [(image_paths[i], max_size) for i in order
+                if 0 <= i < len(image_paths) and (i == index or not self.cache.contains(image_paths[i], max_size))]
+
+        with self._lock:
+            self._generation += 1
+            self._queue = deque(jobs)
+            generation = self._generation
+        for _ in range(min(len(jobs), self.thread_pool.maxThreadCount())):
+            self.thread_pool.start(_PrefetchTask(self, generation))
+
+    def cancel(self):
+        """대기 중인 작업을 버립니다. 이미 디코딩 중인 이미지는 끝까지 읽어 캐시에 넣습니다."""
+        with self._lock:
+            self._generation += 1
+            self._queue.clear()
+
+    def _next_job(self, generation):
+        with self._lock:
+            if generation != self._generation or not self._queue:
+                return None
+            return self._queue.popleft()
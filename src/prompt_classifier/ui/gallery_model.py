@@ -0,0 +1,265 @@
+# src/prompt_classifier/ui/gallery_model.py
+
+import os
+from collections import OrderedDict
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QSize, QRect,
+                          QTimer, pyqtSignal)
+
+from src.prompt_classifier.thumbnail_cache import THUMBNAIL_SIZE
+
+DEFAULT_PIXMAP_BUDGET = 256 * 1024 * 1024 # 메모리에 유지할 썸네일 픽스맵 최대 크기 (256MB)
+CELL_PADDING = 10
+
+
+class PixmapCache:
+    """메모리 예산 안에서 최근에 사용한 썸네일 픽스맵만 유지하는 LRU 캐시입니다."""
+
+    def __init__(self, max_bytes=DEFAULT_PIXMAP_BUDGET):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._pixmaps = OrderedDict()
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * 4
+
+    def get(self, key):
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap: QPixmap):
+        """픽스맵을 저장하고, 예산을 넘겨 밀려난 키 목록을 반환합니다."""
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self.total_bytes -= self._cost(old)
+        self._pixmaps[key] = pixmap
+        self.total_bytes += self._cost(pixmap)
+
+        evicted = []
+        while self.total_bytes > self.max_bytes and len(self._pixmaps) > 1:
+            evicted_key, evicted_pixmap = self._pixmaps.popitem(last=False)
+            self.total_bytes -= self._cost(evicted_pixmap)
+            evicted.append(evicted_key)
+        return evicted
+
+    def clear(self):
+        self._pixmaps.clear()
+        self.total_bytes = 0
+
+
+class GalleryModel(QAbstractListModel):
+    """
+    갤러리 이미지 목록 모델입니다.
+    뷰가 실제로 그리는(화면에 보이는) 행에 대해서만 썸네일을 요청하고,
+    디코딩된 픽스맵은 메모리 예산을 넘으면 오래된 것부터 버립니다.
+    """
+    # 한 번에 도착한 썸네일 수 (진행 상황 표시용)
+    thumbnails_loaded = pyqtSignal(int)
+
+    def __init__(self, thumbnail_loader, parent=None, pixmap_budget=DEFAULT_PIXMAP_BUDGET):
+        super().__init__(parent)
+        self.thumbnail_loader = thumbnail_loader
+        self.thumbnail_loader.thumbnails_ready.connect(self.on_thumbnails_ready)
+        self.pixmap_cache = PixmapCache(pixmap_budget)
+
+        self._all_paths = []  # 필터와 관계없이 로드된 전체 경로
+        self._known = set()   # _all_paths의 중복 확인용
+        self._filter = None   # 검색 결과 경로 집합 (None이면 전체 표시)
+        self._paths = []      # 행 번호 -> 이미지 경로 (필터 적용 후)
+        self._rows = {}       # 이미지 경로 -> 행 번호
+        self._group_sizes = {} # 재생성 묶음 대표 경로 -> 묶음의 이미지 수 (묶어 보기일 때)
+        self._requested = set() # 로더에 이미 요청한 경로
+        self._to_request = [] # 다음 이벤트 루프에서 한꺼번에 요청할 경로
+
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(0)
+        self._request_timer.timeout.connect(self._flush_requests)
+
+        placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        placeholder.fill(Qt.GlobalColor.lightGray)
+        self.placeholder = placeholder
+
+    # --- QAbstractListModel 구현 ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        image_path = self._paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            group_size = self._group_sizes.get(image_path, 1)
+            if group_size > 1:
+                return f"{os.path.basename(image_path)} (×{group_size})"
+            return os.path.basename(image_path)
+        if role == Qt.ItemDataRole.DecorationRole:
+            pixmap = self.pixmap_cache.get(image_path)
+            if pixmap is not None:
+                return pixmap
+            self._request_thumbnail(image_path)
+            return self.placeholder
+        if role in (Qt.ItemDataRole.UserRole, Qt.ItemDataRole.ToolTipRole):
+            return image_path
+        return None
+
+    # --- 목록 조작 ---
+    def set_paths(self, image_paths):
+        """목록 전체를 교체합니다. 진행 중이던 썸네일 요청은 취소됩니다."""
+        self.thumbnail_loader.cancel()
+        self.beginResetModel()
+        self._all_paths = list(dict.fromkeys(image_paths))
+        self._known = set(self._all_paths)
+        self._filter = None
+        self._group_sizes = {}
+        self._paths = list(self._all_paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._requested.clear()
+        self._to_request = []
+        self.pixmap_cache.clear()
+        self.endResetModel()
+
+    def append_paths(self, image_paths):
+        """목록 끝에 경로들을 추가합니다. 이미 있는 경로는 무시합니다."""
+        new_paths = [path for path in dict.fromkeys(image_paths) if path not in self._known]
+        self._all_paths.extend(new_paths)
+        self._known.update(new_paths)
+        if self._filter is not None:
+            new_paths = [path for path in new_paths if path in self._filter]
+        if not new_paths:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_paths) - 1)
+        for offset, path in enumerate(new_paths):
+            self._rows[path] = first + offset
+        self._paths.extend(new_paths)
+        self.endInsertRows()
+
+    def remove_paths(self, image_paths):
+        """주어진 경로들의 행을 삭제합니다."""
+        removed = self._known.intersection(image_paths)
+        if removed:
+            self._known -= removed
+            self._all_paths = [path for path in self._all_paths if path not in removed]
+        rows = sorted((self._rows[path] for path in image_paths if path in self._rows), reverse=True)
+        if not rows:
+            return
+        # 뒤쪽 행부터 연속 구간 단위로 삭제
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self._paths[start:end + 1]
+            self.endRemoveRows()
+            if row is not None:
+                start = end = row
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+
+    def set_filter(self, image_paths, group_sizes=None):
+        """
+        주어진 경로들만 보이도록 목록을 거릅니다. None이면 필터를 해제합니다.
+
+        Args:
+            group_sizes (dict): 재생성 묶음 대표 경로 -> 묶음의 이미지 수. 파일 이름 옆에 표시됨
+        """
+        self.beginResetModel()
+        self._group_sizes = group_sizes or {}
+        if image_paths is None:
+            self._filter = None
+            self._paths = list(self._all_paths)
+        else:
+            self._filter = set(image_paths)
+            self._paths = [path for path in self._all_paths if path in self._filter]
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self.endResetModel()
+
+    def is_filtered(self) -> bool:
+        return self._filter is not None
+
+    def total_count(self) -> int:
+        return len(self._all_paths)
+
+    def image_paths(self):
+        return self._paths
+
+    def all_paths(self):
+        """필터와 관계없이 로드된 전체 경로"""
+        return self._all_paths
+
+    def path_at(self, row: int) -> str:
+        return self._paths[row]
+
+    def row_of(self, image_path: str) -> int:
+        return self._rows.get(image_path, -1)
+
+    # --- 지연 썸네일 로드 ---
+    def _request_thumbnail(self, image_path):
+        if image_path in self._requested:
+            return
+        self._requested.add(image_path)
+        self._to_request.append(image_path)
+        self._request_timer.start()
+
+    def _flush_requests(self):
+        # 한 번의 페인트에서 요청된 경로(= 현재 화면)를 가장 먼저 처리하도록 함
+        paths, self._to_request = self._to_request, []
+        if paths:
+            self.thumbnail_loader.enqueue(paths)
+            self.thumbnail_loader.prioritize(paths)
+
+    def on_thumbnails_ready(self, results):
+        for image_path, image in results:
+            row = self._rows.get(image_path)
+            if row is None:
+                continue
+            if image is None:
+                continue # 읽을 수 없는 파일은 자리표시 아이콘 유지 (다시 요청하지 않음)
+            for evicted_path in self.pixmap_cache.put(image_path, QPixmap.fromImage(image)):
+                # 밀려난 썸네일은 다시 화면에 보일 때 재요청 (디스크 캐시에서 빠르게 읽힘)
+                self._requested.discard(evicted_path)
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+        self.thumbnails_loaded.emit(len(results))
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """고정 크기 셀에 썸네일과 파일 이름을 그리는 델리게이트입니다."""
+
+    def __init__(self, parent=None, icon_size=THUMBNAIL_SIZE):
+        super().__init__(parent)
+        self.icon_size = icon_size
+
+    def sizeHint(self, option, index):
+        text_height = option.fontMetrics.height()
+        return QSize(self.icon_size + CELL_PADDING, self.icon_size + text_height + CELL_PADDING)
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else None
+        if style:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, widget)
+
+        rect = option.rect
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            x = rect.x() + (rect.width() - pixmap.width()) // 2
+            y = rect.y() + CELL_PADDING // 2 + (self.icon_size - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+
+        text_rect = QRect(rect.x(), rect.y() + self.icon_size + CELL_PADDING // 2,
+                          rect.width(), option.fontMetrics.height())
+        text = option.fontMetrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole) or "",
+                                             Qt.TextElideMode.ElideMiddle, text_rect.width())
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(option.palette.highlightedText().color())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
@@ -1,9 +1,15 @@
-import os
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QListWidget, QListWidgetItem, 
-                             QFileDialog, QApplication)
-from PyQt6.QtGui import QPixmap, QIcon
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListView, QFileDialog, QLineEdit, QCheckBox
+from PyQt6.QtCore import QFileSystemWatcher, QTimer, pyqtSignal
 from .image_viewer import ImageViewer # 이미지 뷰어 임포트
+from .thumbnail_loader import ThumbnailLoader
+from .gallery_model import GalleryModel, ThumbnailDelegate
+from .folder_scanner import ScanWorker, RescanWorker, IndexWorker
+from src.prompt_classifier.thumbnail_cache import get_thumbnail_cache
+from src.prompt_classifier.scanner import DirectoryScanner, find_image_files
+from src.prompt_classifier.search import search_images
+from src.prompt_classifier.dedup import collapse_duplicates
+
+MAX_WATCHED_DIRS = 4096 # OS의 감시 핸들 한도를 넘지 않도록 감시할 폴더 수 제한
 
 class GalleryWidget(QWidget):
     # 상태 메시지를 메인 윈도우로 보내기 위한 시그널
@@ -14,19 +20,70 @@ class GalleryWidget(QWidget):
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0,0,0,0) # 여백 제거
 
-        self.image_paths = [] # 현재 로드된 이미지 경로 리스트
+        self.thumbnail_cache = get_thumbnail_cache() # 디스크 썸네일 캐시
+        self.loaded_count = 0
+        self.scanner = None
+        self.scan_worker = None
+        self.rescan_worker = None
+        self.index_worker = None
+        self.pending_index_paths = [] # 인덱싱 중에 추가된 이미지
+        self.search_results = None # 현재 검색 결과 (None이면 검색하지 않음)
+
+        # 백그라운드 썸네일 로더와 목록 모델
+        self.thumbnail_loader = ThumbnailLoader(self, cache=self.thumbnail_cache)
+        self.gallery_model = GalleryModel(self.thumbnail_loader, self)
+        self.gallery_model.thumbnails_loaded.connect(self.on_thumbnails_loaded)
+
+        # 프롬프트 검색창
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText('프롬프트 검색 (예: blue eyes, "looking at viewer", tag:1girl, lora:detail*, NOT hat)')
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.returnPressed.connect(self.run_search)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300) # 입력이 멈추면 검색
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_box.textChanged.connect(self.search_timer.start)
+
+        # 같은 프롬프트(태그 집합)의 재생성을 하나로 묶어 보기
+        self.collapse_checkbox = QCheckBox("재생성 묶기")
+        self.collapse_checkbox.setToolTip("시드만 바꾸거나 태그 몇 개만 다른 재생성 이미지를 첫 이미지 하나로 묶어 표시합니다.")
+        self.collapse_checkbox.toggled.connect(self.apply_filters)
 
-        # QListWidget으로 갤러리 구현
-        self.gallery_list_widget = QListWidget()
-        self.gallery_list_widget.setViewMode(QListWidget.ViewMode.IconMode)
-        self.gallery_list_widget.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.gallery_list_widget.setMovement(QListWidget.Movement.Static)
-        self.gallery_list_widget.setIconSize(QSize(200, 200))
-        self.gallery_list_widget.setSpacing(10)
-        self.layout.addWidget(self.gallery_list_widget)
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.search_box, 1)
+        filter_layout.addWidget(self.collapse_checkbox)
+        self.layout.addLayout(filter_layout)
+
+        # QListView + 모델로 갤러리 구현 (화면에 보이는 행만 그리고 썸네일을 요청)
+        self.gallery_view = QListView()
+        self.gallery_view.setViewMode(QListView.ViewMode.IconMode)
+        self.gallery_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.gallery_view.setMovement(QListView.Movement.Static)
+        self.gallery_view.setUniformItemSizes(True) # 모든 행의 크기를 계산하지 않도록 함
+        self.gallery_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.gallery_view.setBatchSize(500)
+        self.gallery_view.setSpacing(10)
+        self.gallery_view.setItemDelegate(ThumbnailDelegate(self.gallery_view))
+        self.gallery_view.setModel(self.gallery_model)
+        self.layout.addWidget(self.gallery_view)
 
         # 썸네일 더블클릭 시 이미지 뷰어 열기
-        self.gallery_list_widget.itemDoubleClicked.connect(self.show_image_viewer)
+        self.gallery_view.doubleClicked.connect(self.show_image_viewer)
+
+        # 생성기가 새 이미지를 저장하면 전체 재로드 없이 목록에 추가
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.changed_dirs = set()
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(500) # 연속으로 저장되는 파일을 한 번에 처리
+        self.rescan_timer.timeout.connect(self.rescan_changed_directories)
+
+    @property
+    def image_paths(self):
+        """현재 로드된 이미지 경로 리스트"""
+        return self.gallery_model.image_paths()
 
     def open_folder_dialog(self):
         folder_path = QFileDialog.getExistingDirectory(self, "이미지 폴더 선택")
@@ -35,47 +92,176 @@ class GalleryWidget(QWidget):
 
     def load_images(self, folder_path):
         self.status_updated.emit(f"'{folder_path}' 폴더에서 이미지 스캔 중...")
-        QApplication.processEvents() # UI가 멈추지 않도록 이벤트 처리
+        self.stop_scan()
+        self.stop_indexing() # 이전 폴더의 인덱싱 결과가 새 폴더에 섞이지 않도록 함
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.changed_dirs.clear()
+
+        # 모델 교체 시 다른 폴더의 썸네일 로드는 취소됨
+        self.search_box.blockSignals(True)
+        self.search_box.clear()
+        self.search_box.blockSignals(False)
+        self.search_results = None
+        self.loaded_count = 0
+        self.gallery_model.set_paths([])
+
+        # 스캔 결과는 찾는 즉시 목록에 추가됨
+        self.scanner = DirectoryScanner(folder_path)
+        self.scan_worker = ScanWorker(self.scanner, self)
+        self.scan_worker.images_found.connect(self.on_images_found)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.scan_worker.start()
+
+    def stop_scan(self):
+        """진행 중인 폴더 스캔과 바뀐 폴더 재스캔을 취소합니다."""
+        if self.rescan_worker is not None:
+            self.rescan_worker.rescan_finished.disconnect(self.on_rescan_finished)
+            self.rescan_worker.cancel()
+            self.rescan_worker.wait()
+            self.rescan_worker = None
+        if self.scan_worker is None:
+            return
+        self.scan_worker.images_found.disconnect(self.on_images_found)
+        self.scan_worker.scan_finished.disconnect(self.on_scan_finished)
+        self.scan_worker.cancel()
+        self.scan_worker.wait()
+        self.scan_worker = None
+
+    def stop_indexing(self):
+        """진행 중인 인덱싱을 취소하고 대기 중인 인덱싱 요청을 버립니다."""
+        self.pending_index_paths = []
+        if self.index_worker is None:
+            return
+        for signal in (self.index_worker.progress, self.index_worker.hash_progress, self.index_worker.index_finished):
+            signal.disconnect()
+        self.index_worker.cancel()
+        self.index_worker.wait()
+        self.index_worker = None
+
+    def on_images_found(self, image_paths):
+        self.gallery_model.append_paths(image_paths)
+        self.status_updated.emit(f"이미지 스캔 중... ({len(self.image_paths)}개 발견)")
 
-        self.gallery_list_widget.clear()
-        self.image_paths = self.find_image_files_recursively(folder_path)
-        
-        total_images = len(self.image_paths)
+    def on_scan_finished(self, total_images):
+        self.scan_worker = None
         if total_images == 0:
             self.status_updated.emit("폴더에서 이미지를 찾을 수 없습니다.")
+        else:
+            self.status_updated.emit(f"총 {total_images}개의 이미지를 찾았습니다.")
+        self.watch_directories(self.scanner.directories())
+        self.start_indexing(list(self.image_paths))
+
+    def start_indexing(self, image_paths):
+        """이미지들의 프롬프트를 백그라운드에서 인덱싱합니다. 바뀌지 않은 파일은 건너뜁니다."""
+        if not image_paths:
+            return
+        if self.index_worker is not None:
+            self.pending_index_paths.extend(image_paths)
+            return
+        self.pending_index_paths = []
+        self.index_worker = IndexWorker(image_paths, self)
+        self.index_worker.progress.connect(
+            lambda done, total: self.status_updated.emit(f"프롬프트 인덱싱 중... ({done}/{total})"))
+        self.index_worker.hash_progress.connect(
+            lambda done, total: self.status_updated.emit(f"유사 이미지 검색용 해시 계산 중... ({done}/{total})"))
+        self.index_worker.index_finished.connect(self.on_index_finished)
+        self.index_worker.start()
+
+    def on_index_finished(self, indexed, skipped):
+        self.index_worker = None
+        if indexed:
+            self.status_updated.emit(f"프롬프트 인덱싱 완료: {indexed}개 갱신, {skipped}개는 변경 없음")
+            if self.collapse_checkbox.isChecked():
+                self.apply_filters() # 새로 인덱싱된 이미지도 묶음에 반영
+        if self.pending_index_paths:
+            self.start_indexing(self.pending_index_paths)
+
+    def watch_directories(self, dir_paths):
+        room = MAX_WATCHED_DIRS - len(self.watcher.directories())
+        if room > 0 and dir_paths:
+            self.watcher.addPaths(dir_paths[:room])
+
+    def on_directory_changed(self, dir_path):
+        self.changed_dirs.add(dir_path)
+        self.rescan_timer.start()
+
+    def rescan_changed_directories(self):
+        """변경된 폴더만 별도 스레드에서 다시 읽습니다. 결과는 on_rescan_finished에서 목록에 반영합니다."""
+        if self.scanner is None or self.scan_worker is not None:
+            return # 전체 스캔이 끝나면 어차피 최신 상태가 됨
+        if self.rescan_worker is not None or not self.changed_dirs:
+            return # 진행 중인 재스캔이 끝나면 이어서 처리
+        changed_dirs, self.changed_dirs = self.changed_dirs, set()
+        self.rescan_worker = RescanWorker(self.scanner, changed_dirs, self)
+        self.rescan_worker.rescan_finished.connect(self.on_rescan_finished)
+        self.rescan_worker.start()
+
+    def on_rescan_finished(self, added, removed, new_dirs):
+        """새 이미지는 추가하고 사라진 이미지는 목록에서 뺍니다."""
+        self.rescan_worker = None
+        if new_dirs:
+            watched = set(self.watcher.directories())
+            self.watch_directories([path for path in self.scanner.directories() if path not in watched])
+        self.gallery_model.remove_paths(removed) # 인덱스 행은 RescanWorker가 지움
+        self.gallery_model.append_paths(added)
+        self.start_indexing(added)
+        if added:
+            self.status_updated.emit(f"새 이미지 {len(added)}개를 추가했습니다. (총 {len(self.image_paths)}개)")
+        if self.changed_dirs:
+            self.rescan_timer.start() # 재스캔하는 동안 바뀐 폴더
+
+    def on_thumbnails_loaded(self, count):
+        self.loaded_count += count
+        if self.scan_worker is None and not self.thumbnail_loader.is_loading():
+            self.status_updated.emit(f"총 {len(self.image_paths)}개의 이미지 (썸네일 {self.loaded_count}개 로드됨)")
+
+    def run_search(self):
+        """검색창의 검색식으로 프롬프트 인덱스를 검색해 결과만 표시합니다."""
+        self.search_timer.stop()
+        query = self.search_box.text().strip()
+        try:
+            results = search_images(query) if query else None
+        except ValueError as e:
+            self.status_updated.emit(str(e))
             return
 
-        for idx, image_path in enumerate(self.image_paths):
-            self.status_updated.emit(f"이미지 로드 중... ({idx + 1}/{total_images})")
-            
-            item = QListWidgetItem()
-            icon = QIcon(image_path)
-            item.setIcon(icon)
-            item.setText(os.path.basename(image_path))
-            # 나중에 경로를 쉽게 찾기 위해 UserRole에 전체 경로 저장
-            item.setData(Qt.ItemDataRole.UserRole, image_path)
-            
-            self.gallery_list_widget.addItem(item)
-            if idx % 20 == 0: # 20개마다 UI 업데이트
-                QApplication.processEvents()
-
-        self.status_updated.emit(f"총 {total_images}개의 이미지를 로드했습니다.")
+        self.search_results = results
+        self.apply_filters()
+
+    def apply_filters(self):
+        """검색 결과와 재생성 묶기 설정을 목록에 적용합니다."""
+        results = self.search_results
+        if self.collapse_checkbox.isChecked():
+            visible = self.gallery_model.all_paths()
+            if results is not None:
+                matched = set(results)
+                visible = [path for path in visible if path in matched]
+            representatives, group_sizes = collapse_duplicates(visible)
+            self.gallery_model.set_filter(representatives, group_sizes)
+        else:
+            self.gallery_model.set_filter(results)
+
+        if results is None and not self.collapse_checkbox.isChecked():
+            self.status_updated.emit(f"총 {len(self.image_paths)}개의 이미지")
+        elif results is None:
+            self.status_updated.emit(
+                f"재생성 묶음 {len(self.image_paths)}개 (전체 {self.gallery_model.total_count()}개)")
+        else:
+            self.status_updated.emit(
+                f"검색 결과: {len(self.image_paths)}개 (전체 {self.gallery_model.total_count()}개 중)")
 
     def find_image_files_recursively(self, folder_path):
         """지정된 폴더와 모든 하위 폴더에서 이미지 파일을 찾습니다."""
-        supported_formats = ('.png', '.jpg', '.jpeg', '.bmp')
-        image_files = []
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith(supported_formats):
-                    image_files.append(os.path.join(root, file))
-        return sorted(image_files) # 이름순으로 정렬
-
-    def show_image_viewer(self, item):
+        return find_image_files(folder_path) # 이름순으로 정렬됨
+
+    def clear_thumbnail_cache(self):
+        """디스크 썸네일 캐시를 모두 비웁니다."""
+        removed = self.thumbnail_cache.clear()
+        self.status_updated.emit(f"썸네일 캐시 {removed}개를 삭제했습니다.")
+
+    def show_image_viewer(self, index):
         """이미지 뷰어 창을 띄웁니다."""
-        clicked_image_path = item.data(Qt.ItemDataRole.UserRole)
-        current_index = self.image_paths.index(clicked_image_path)
-        
         # 새 뷰어 창 생성 및 표시
-        self.viewer = ImageViewer(self.image_paths, current_index)
-        self.viewer.show()
\ No newline at end of file
+        self.viewer = ImageViewer(self.image_paths, index.row())
+        self.viewer.show()
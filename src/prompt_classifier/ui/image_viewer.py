@@ -1,14 +1,20 @@
 import os
 import subprocess
 import sys
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QApplication, QMenu, QStyle)
-from PyQt6.QtGui import QPixmap, QIcon, QKeySequence, QShortcut, QAction
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout,
+                             QPushButton, QApplication, QMenu, QMessageBox, QStyle)
+from PyQt6.QtGui import QKeySequence, QShortcut, QAction
 from PyQt6.QtCore import Qt, QUrl
 from PyQt6.QtGui import QDesktopServices
 
-from src.prompt_classifier import db_manager
-from src.prompt_classifier.prompt_extractor import get_positive_prompt_from_image
+from src.prompt_classifier.db_manager import NO_PROMPT
+from src.prompt_classifier.frame_cache import get_frame_cache
+from src.prompt_classifier.image_hash import find_similar_images
+from src.prompt_classifier.prompt_index import get_positive_prompt
+from src.prompt_classifier.thumbnail_cache import get_thumbnail_cache
+from src.prompt_classifier.ui.favorites_store import get_favorites_store
+from src.prompt_classifier.ui.frame_prefetcher import FramePrefetcher
+from src.prompt_classifier.ui.scaled_image_label import ScaledImageLabel
 
 
 class ImageViewer(QWidget):
@@ -16,12 +22,21 @@ class ImageViewer(QWidget):
         super().__init__()
         self.image_paths = image_paths
         self.current_index = current_index
+        self.direction = 1 # 마지막 이동 방향 (미리 읽을 쪽)
+        self.frame_cache = get_frame_cache()
+        self.prefetcher = FramePrefetcher(self, cache=self.frame_cache)
+        self.prefetcher.frame_ready.connect(self.on_frame_ready)
+        self.frame_size = None
+        self.waiting_frame = False # 현재 이미지를 미리 보기로 표시하고 디코딩을 기다리는 중
+        self.favorites = get_favorites_store()
+        # 다른 창에서 즐겨찾기를 바꿔도 버튼 상태를 맞춤
+        self.favorites.favorite_added.connect(self.on_favorites_changed)
+        self.favorites.favorite_removed.connect(self.on_favorites_changed)
 
         self.setWindowTitle("Image Viewer")
 
         main_layout = QVBoxLayout(self)
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label = ScaledImageLabel()
         main_layout.addWidget(self.image_label, 1)
 
         button_layout = QHBoxLayout()
@@ -55,23 +70,41 @@ class ImageViewer(QWidget):
         self.update_image()
         self.showMaximized()
 
+    def target_frame_size(self):
+        """이미지를 맞춰 넣을 크기 (창이 있는 화면의 사용 가능 영역)"""
+        screen = self.screen() or QApplication.primaryScreen()
+        return screen.availableGeometry().size()
+
     def update_image(self):
         image_path = self.image_paths[self.current_index]
-        pixmap = QPixmap(image_path)
-        screen_geometry = QApplication.primaryScreen().availableGeometry()
-        scaled_pixmap = pixmap.scaled(screen_geometry.size(),
-                                      Qt.AspectRatioMode.KeepAspectRatio,
-                                      Qt.TransformationMode.SmoothTransformation)
-        self.image_label.setPixmap(scaled_pixmap)
+        self.frame_size = self.target_frame_size()
+        # 미리 읽어 둔 이미지면 디코딩과 축소 없이 바로 표시. 없으면 썸네일 캐시에 있는 작은 이미지를 먼저 보여 주고
+        # 원본 디코딩은 미리 읽기 스레드에 맡김 (PNG는 축소 디코딩을 지원하지 않아 GUI 스레드에서 풀면 멈춤)
+        frame = self.frame_cache.get(image_path, self.frame_size)
+        self.waiting_frame = frame is None
+        self.image_label.set_image(frame if frame is not None else get_thumbnail_cache().get(image_path))
+        self.prefetcher.prefetch(self.image_paths, self.current_index, self.direction, self.frame_size)
         self.prev_button.setEnabled(self.current_index > 0)
         self.next_button.setEnabled(self.current_index < len(self.image_paths) - 1)
         # --- 이미지가 업데이트될 때마다 즐겨찾기 상태 확인 ---
         self.check_favorite_status()
 
+    def on_frame_ready(self, image_path, max_size, image):
+        """미리 읽기 스레드가 디코딩한 이미지가 지금 보고 있는 것이면 표시합니다."""
+        if self.waiting_frame and image_path == self.image_paths[self.current_index] and max_size == self.frame_size:
+            self.waiting_frame = False
+            self.image_label.set_image(image)
+
     def check_favorite_status(self):
         """현재 이미지의 즐겨찾기 상태를 확인하고 버튼 스타일을 업데이트합니다."""
         current_path = self.image_paths[self.current_index]
-        if db_manager.is_favorited(current_path):
+        self.update_favorite_button(self.favorites.is_favorited(current_path))
+
+    def on_favorites_changed(self, _):
+        self.check_favorite_status()
+
+    def update_favorite_button(self, favorited: bool):
+        if favorited:
             self.fav_button.setText("❤️ 즐겨찾기됨")
             self.fav_button.setStyleSheet("background-color: #fecaca; color: #991b1b;")
         else:
@@ -82,33 +115,32 @@ class ImageViewer(QWidget):
         """즐겨찾기 버튼 클릭 시 DB에 추가 또는 삭제를 수행합니다."""
         current_path = self.image_paths[self.current_index]
 
-        if db_manager.is_favorited(current_path):
+        if self.favorites.remove(current_path):
             # 이미 즐겨찾기 상태 -> 삭제
-            db_manager.remove_favorite(current_path)
             print(f"'{os.path.basename(current_path)}' 즐겨찾기에서 삭제됨.")
         else:
             # 즐겨찾기 상태 아님 -> 프롬프트 추출 후 추가
-            prompt = get_positive_prompt_from_image(current_path)
+            prompt = get_positive_prompt(current_path)
             if prompt:
-                db_manager.add_favorite(current_path, prompt)
+                self.favorites.add(current_path, prompt)
                 print(f"'{os.path.basename(current_path)}' 즐겨찾기에 추가됨.")
             else:
                 # 프롬프트가 없는 경우 즐겨찾기에 추가하지 않음 (또는 기본값으로 추가)
-                db_manager.add_favorite(current_path, "프롬프트 정보 없음")
+                self.favorites.add(current_path, NO_PROMPT)
                 print("프롬프트 정보를 찾을 수 없지만, 이미지만 즐겨찾기에 추가했습니다.")
-
-        # 버튼 상태 즉시 갱신
-        self.check_favorite_status()
+        # 버튼 상태는 저장소 시그널(on_favorites_changed)로 갱신됨
 
 
     def show_previous_image(self):
         if self.current_index > 0:
             self.current_index -= 1
+            self.direction = -1
             self.update_image()
 
     def show_next_image(self):
         if self.current_index < len(self.image_paths) - 1:
             self.current_index += 1
+            self.direction = 1
             self.update_image()
 
     def wheelEvent(self, event):
@@ -119,9 +151,15 @@ class ImageViewer(QWidget):
         event.accept()
 
     def resizeEvent(self, event):
-        self.update_image()
+        # 이미지는 창이 아니라 화면 크기에 맞춰 두므로, 다른 화면으로 옮겨 크기가 바뀐 경우에만 다시 만듦
+        if self.frame_size is not None and self.target_frame_size() != self.frame_size:
+            self.update_image()
         super().resizeEvent(event)
 
+    def closeEvent(self, event):
+        self.prefetcher.cancel()
+        super().closeEvent(event)
+
     def show_context_menu(self, pos):
         context_menu = QMenu(self)
         copy_path_action = QAction("이미지 경로 복사", self)
@@ -130,11 +168,27 @@ class ImageViewer(QWidget):
         open_folder_action.triggered.connect(self.open_containing_folder)
         copy_image_action = QAction("이미지를 클립보드에 복사", self)
         copy_image_action.triggered.connect(self.copy_image_to_clipboard)
+        find_similar_action = QAction("비슷한 이미지 찾기", self)
+        find_similar_action.triggered.connect(self.show_similar_images)
         context_menu.addAction(copy_path_action)
         context_menu.addAction(open_folder_action)
         context_menu.addAction(copy_image_action)
+        context_menu.addSeparator()
+        context_menu.addAction(find_similar_action)
         context_menu.exec(self.image_label.mapToGlobal(pos))
 
+    def show_similar_images(self):
+        """지각 해시가 가까운 이미지들을 현재 이미지와 함께 새 뷰어로 엽니다. (가까운 순서)"""
+        current_path = self.image_paths[self.current_index]
+        similar = find_similar_images(current_path)
+        if not similar:
+            QMessageBox.information(self, "비슷한 이미지", "비슷한 이미지를 찾지 못했습니다.\n"
+                                    "폴더를 연 뒤 해시 계산이 끝나야 다른 이미지와 비교할 수 있습니다.")
+            return
+        self.similar_viewer = ImageViewer([current_path] + [path for path, _ in similar], 0)
+        self.similar_viewer.setWindowTitle(f"비슷한 이미지 {len(similar)}개 - {os.path.basename(current_path)}")
+        self.similar_viewer.show()
+
     def copy_image_path(self):
         clipboard = QApplication.clipboard()
         clipboard.setText(self.image_paths[self.current_index])
@@ -146,4 +200,6 @@ class ImageViewer(QWidget):
 
     def copy_image_to_clipboard(self):
         clipboard = QApplication.clipboard()
-        clipboard.setPixmap(self.image_label.pixmap())
\ No newline at end of file
+        image = self.image_label.source_image()
+        if image is not None:
+            clipboard.setImage(image)
\ No newline at end of file
@@ -3,7 +3,9 @@
 from PyQt6.QtWidgets import QMainWindow
 from PyQt6.QtGui import QAction
 
+from src.prompt_classifier.tag_cache import invalidate_tag_cache
 from src.prompt_classifier.ui.gallery_widget import GalleryWidget
+from src.prompt_classifier.ui.analytics_window import AnalyticsWindow
 from src.prompt_classifier.ui.favorites_window import FavoritesWindow
 
 class MainWindow(QMainWindow):
@@ -22,11 +24,23 @@ class MainWindow(QMainWindow):
         open_folder_action = QAction("폴더 열기(&O)...", self)
         open_folder_action.triggered.connect(self.open_folder)
         file_menu.addAction(open_folder_action)
+
+        clear_cache_action = QAction("썸네일 캐시 비우기(&C)", self)
+        clear_cache_action.triggered.connect(self.clear_thumbnail_cache)
+        file_menu.addAction(clear_cache_action)
+
+        clear_tag_cache_action = QAction("태그 분류 캐시 비우기(&T)", self)
+        clear_tag_cache_action.triggered.connect(self.clear_tag_cache)
+        file_menu.addAction(clear_tag_cache_action)
         
         # --- 즐겨찾기 창 열기 액션 추가 ---
         open_favorites_action = QAction("즐겨찾기 보기(&F)...", self)
         open_favorites_action.triggered.connect(self.open_favorites_window)
         favorites_menu.addAction(open_favorites_action)
+
+        open_analytics_action = QAction("태그 통계 보기(&S)...", self)
+        open_analytics_action.triggered.connect(self.open_analytics_window)
+        favorites_menu.addAction(open_analytics_action)
         
         # --- 중앙 위젯 설정 ---
         self.gallery_widget = GalleryWidget(self)
@@ -39,15 +53,33 @@ class MainWindow(QMainWindow):
 
         # 즐겨찾기 창을 저장할 변수
         self.favorites_win = None
+        self.analytics_win = None
 
     def open_folder(self):
         """갤러리 위젯의 폴더 선택 함수를 호출합니다."""
         self.gallery_widget.open_folder_dialog()
 
+    def clear_thumbnail_cache(self):
+        """썸네일 캐시를 비웁니다. 다음에 폴더를 열 때 썸네일이 다시 만들어집니다."""
+        self.gallery_widget.clear_thumbnail_cache()
+
+    def clear_tag_cache(self):
+        """태그 분류 캐시를 비웁니다. 다음 분류부터 모든 태그를 다시 API로 분류합니다."""
+        removed = invalidate_tag_cache()
+        self.status_bar.showMessage(f"태그 분류 캐시 {removed}개 항목을 삭제했습니다.")
+
     def open_favorites_window(self):
         """즐겨찾기 뷰어 창을 엽니다."""
         if self.favorites_win is None or not self.favorites_win.isVisible():
             self.favorites_win = FavoritesWindow()
             self.favorites_win.show()
         else:
-            self.favorites_win.activateWindow()
\ No newline at end of file
+            self.favorites_win.activateWindow()
+
+    def open_analytics_window(self):
+        """태그 통계 창을 엽니다."""
+        if self.analytics_win is None or not self.analytics_win.isVisible():
+            self.analytics_win = AnalyticsWindow()
+            self.analytics_win.show()
+        else:
+            self.analytics_win.activateWindow()
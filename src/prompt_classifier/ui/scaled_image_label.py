@@ -0,0 +1,106 @@
+# src/prompt_classifier/ui/scaled_image_label.py
+
+from PyQt6.QtWidgets import QLabel, QSizePolicy
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtCore import QObject, QRunnable, QSize, QThreadPool, QTimer, Qt, pyqtSignal
+
+SMOOTH_DELAY_MS = 120 # 마지막 크기 변경/이미지 교체 후 이만큼 입력이 없으면 부드러운 축소로 교체
+
+
+class _ScaleSignals(QObject):
+    # (세대, 부드럽게 축소된 이미지)
+    finished = pyqtSignal(int, QImage)
+
+
+class _SmoothScaleTask(QRunnable):
+    """GUI 스레드 밖에서 SmoothTransformation으로 축소합니다. (QImage는 다른 스레드에서 다뤄도 안전)"""
+
+    def __init__(self, signals, generation, image, size):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.image = image
+        self.size = size
+
+    def run(self):
+        scaled = self.image.scaled(self.size, Qt.AspectRatioMode.KeepAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+        self.signals.finished.emit(self.generation, scaled)
+
+
+class ScaledImageLabel(QLabel):
+    """
+    이미지를 라벨 크기에 맞춰 표시하는 라벨입니다.
+    이미지를 바꾸거나 크기가 바뀌면 먼저 FastTransformation으로 바로 그리고,
+    입력이 SMOOTH_DELAY_MS 동안 멈추면 백그라운드 스레드에서 SmoothTransformation으로 다시 축소해 교체합니다.
+    창을 끌거나 휠로 빠르게 넘기는 동안에는 부드러운 축소를 하지 않습니다.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # 표시 중인 이미지 크기가 라벨 크기를 밀어 올리지 않도록
+        self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.setMinimumSize(1, 1)
+        self._source = None
+        self._generation = 0
+        self._signals = _ScaleSignals() # 부모 없이 두어 작업이 끝날 때까지 살아 있게 함
+        self._signals.finished.connect(self._on_smooth_scaled)
+        self._smooth_timer = QTimer(self)
+        self._smooth_timer.setSingleShot(True)
+        self._smooth_timer.setInterval(SMOOTH_DELAY_MS)
+        self._smooth_timer.timeout.connect(self._start_smooth_scale)
+
+    def source_image(self):
+        """원본(축소 전) 이미지. 없으면 None."""
+        return self._source
+
+    def set_image(self, image):
+        """QImage를 표시합니다. None이거나 빈 이미지면 지웁니다."""
+        if image is None or image.isNull():
+            self.clear()
+            return
+        self._source = image
+        self._render_fast()
+
+    def clear(self):
+        self._source = None
+        self._generation += 1
+        self._smooth_timer.stop()
+        super().clear()
+
+    def _target_size(self) -> QSize:
+        return self.contentsRect().size() * self.devicePixelRatioF()
+
+    def _show(self, image):
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+        self.setPixmap(pixmap)
+
+    def _render_fast(self):
+        self._generation += 1 # 진행 중인 부드러운 축소 결과는 버림
+        target = self._target_size()
+        if target.isEmpty():
+            return
+        if self._source.size().scaled(target, Qt.AspectRatioMode.KeepAspectRatio) == self._source.size():
+            self._show(self._source) # 이미 맞는 크기면 축소할 필요 없음
+            self._smooth_timer.stop()
+            return
+        self._show(self._source.scaled(target, Qt.AspectRatioMode.KeepAspectRatio,
+                                       Qt.TransformationMode.FastTransformation))
+        self._smooth_timer.start() # 연속 입력 중에는 타이머가 계속 미뤄짐
+
+    def _start_smooth_scale(self):
+        if self._source is None:
+            return
+        QThreadPool.globalInstance().start(
+            _SmoothScaleTask(self._signals, self._generation, self._source, self._target_size()))
+
+    def _on_smooth_scaled(self, generation, image):
+        if generation == self._generation and self._source is not None:
+            self._show(image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._source is not None:
+            self._render_fast()
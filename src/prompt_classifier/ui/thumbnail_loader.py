@@ -0,0 +1,128 @@
+# src/prompt_classifier/ui/thumbnail_loader.py
+
+import threading
+from collections import deque
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from src.prompt_classifier.thumbnail_cache import get_thumbnail_cache
+
+FLUSH_INTERVAL_MS = 50 # 완성된 썸네일을 GUI로 묶어 보내는 주기
+
+
+class _ThumbnailTask(QRunnable):
+    """스레드 풀에서 실행되며 로더의 대기열이 빌 때까지 썸네일을 디코딩합니다."""
+
+    def __init__(self, loader, generation):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+
+    def run(self):
+        while True:
+            image_path = self.loader._next_path(self.generation)
+            if image_path is None:
+                return
+            image = self.loader.cache.get_or_create(image_path)
+            self.loader._deliver(self.generation, image_path, image)
+
+
+class ThumbnailLoader(QObject):
+    """
+    GUI 스레드 밖에서 썸네일을 디코딩하는 로더입니다.
+    화면에 보이는 항목을 우선 처리하고, 완성된 썸네일은 일정 주기마다 묶어서
+    thumbnails_ready 시그널로 전달합니다. 새 폴더를 열면 cancel()로 이전 작업을 버립니다.
+    """
+    # [(image_path, QImage 또는 None), ...]
+    thumbnails_ready = pyqtSignal(list)
+
+    def __init__(self, parent=None, cache=None, max_workers=None):
+        super().__init__(parent)
+        self.cache = cache or get_thumbnail_cache()
+        self.thread_pool = QThreadPool(self)
+        if max_workers:
+            self.thread_pool.setMaxThreadCount(max_workers)
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending = set()     # 아직 디코딩되지 않은 경로
+        self._queue = deque()     # 기본 순서 대기열
+        self._urgent = deque()    # 화면에 보이는 항목 대기열 (먼저 처리)
+        self._results = []        # GUI로 보내기 전 완성된 결과
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def load(self, image_paths):
+        """이전 작업을 취소하고 주어진 경로들의 썸네일 로드를 시작합니다."""
+        self.cancel()
+        with self._lock:
+            self._pending = set(image_paths)
+            self._queue = deque(image_paths)
+            generation = self._generation
+        for _ in range(self.thread_pool.maxThreadCount()):
+            self.thread_pool.start(_ThumbnailTask(self, generation))
+        self._flush_timer.start()
+
+    def enqueue(self, image_paths):
+        """진행 중인 작업에 경로를 추가합니다. 작업이 끝난 상태라면 새로 시작합니다."""
+        with self._lock:
+            was_idle = not self._pending
+            for image_path in image_paths:
+                if image_path not in self._pending:
+                    self._pending.add(image_path)
+                    self._queue.append(image_path)
+            generation = self._generation
+        if was_idle:
+            for _ in range(self.thread_pool.maxThreadCount()):
+                self.thread_pool.start(_ThumbnailTask(self, generation))
+        self._flush_timer.start()
+
+    def prioritize(self, image_paths):
+        """화면에 보이는 경로들을 대기열 맨 앞으로 옮깁니다."""
+        with self._lock:
+            self._urgent = deque(path for path in image_paths if path in self._pending)
+
+    def cancel(self):
+        """진행 중인 로드를 취소합니다. 이미 디코딩 중인 결과는 버려집니다."""
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+            self._queue.clear()
+            self._urgent.clear()
+            self._results = []
+        self._flush_timer.stop()
+
+    def is_loading(self) -> bool:
+        with self._lock:
+            return bool(self._pending or self._results)
+
+    def _next_path(self, generation):
+        with self._lock:
+            if generation != self._generation:
+                return None
+            for queue in (self._urgent, self._queue):
+                while queue:
+                    image_path = queue.popleft()
+                    if image_path in self._pending:
+                        self._pending.discard(image_path)
+                        return image_path
+            return None
+
+    def _deliver(self, generation, image_path, image):
+        with self._lock:
+            if generation == self._generation:
+                self._results.append((image_path, image))
+
+    def _flush(self):
+        """워커가 모아 둔 결과를 GUI 스레드에서 한 번에 전달합니다."""
+        with self._lock:
+            results, self._results = self._results, []
+            finished = not self._pending
+        if results:
+            self.thumbnails_ready.emit(results)
+        if finished and self.thread_pool.activeThreadCount() == 0:
+            # 마지막 워커가 끝난 뒤 남은 결과까지 전달되면 타이머 정지
+            with self._lock:
+                if not self._results:
+                    self._flush_timer.stop()
@@ -8,3 +8,9 @@ def load_api_key() -> str:
     if not api_key:
         raise ValueError("GEMINI_API_KEY not found in .env file")
     return api_key
+
+def get_cache_dir(*parts: str) -> str:
+    """프로젝트 루트의 .cache 아래 하위 폴더 경로를 반환하고, 없으면 생성합니다."""
+    cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', '.cache', *parts)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir